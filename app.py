@@ -5,64 +5,77 @@ if sys.platform == 'darwin':
     os.environ['SDL_VIDEODRIVER'] = 'cocoa'  # Use native macOS window system
 os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
 
-import pygame
-from pygame.locals import *
-from OpenGL.GL import *
-from OpenGL.GLU import *
+from startup_profiler import profiler, LazySubsystem
+
+# Headless runs render offscreen, which has to be chosen before OpenGL is imported
+HEADLESS = "--headless" in sys.argv[1:] or os.getenv("GAME_HEADLESS") == "1"
+import offscreen
+if HEADLESS:
+    offscreen.configure()
+
+import argparse
+with profiler.measure("pygame", "import"):
+    import pygame
+    from pygame.locals import *
+with profiler.measure("OpenGL", "import"):
+    from OpenGL.GL import *
+    from OpenGL.GLU import *
 import math
 import numpy as np
-import sys
 import textwrap
-import openai
 from dotenv import load_dotenv
 import time
-from speech_system import SpeechSystem
-import asyncio
-
-# Load environment variables
-load_dotenv()
-# Ensure OpenAI API Key is loaded
-api_key = os.getenv('OPENAI_API_KEY')
-if not api_key:
-    print("[OpenAI] API key not found. Please set OPENAI_API_KEY in your .env file.")
-    sys.exit(1)
-openai.api_key = api_key
-print("[OpenAI] API key loaded successfully.")
-
-# Initialize Pygame with macOS specific settings
-pygame.init()
-display = (800, 600)
-pygame.display.gl_set_attribute(pygame.GL_CONTEXT_MAJOR_VERSION, 2)
-pygame.display.gl_set_attribute(pygame.GL_CONTEXT_MINOR_VERSION, 1)
-pygame.display.set_mode(display, DOUBLEBUF|OPENGL)
-screen = pygame.display.get_surface()
-
-# Set up the camera and perspective
-glEnable(GL_DEPTH_TEST)
-glMatrixMode(GL_PROJECTION)
-glLoadIdentity()
-gluPerspective(45, (display[0]/display[1]), 0.1, 50.0)
-glMatrixMode(GL_MODELVIEW)
-
-# Set up basic lighting
-glEnable(GL_LIGHTING)
-glEnable(GL_LIGHT0)
-glLightfv(GL_LIGHT0, GL_POSITION, [0, 5, 5, 1])
-glLightfv(GL_LIGHT0, GL_AMBIENT, [0.5, 0.5, 0.5, 1])
-glLightfv(GL_LIGHT0, GL_DIFFUSE, [1.0, 1.0, 1.0, 1])
-
-# Enable blending for transparency
-glEnable(GL_BLEND)
-glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-
-# Initial camera position
-glTranslatef(0.0, 0.0, -5)
+# Speech, audio and the OpenAI SDK load on first use or during the menu (see DialogueSystem.warm_up)
+from llm_client import NPC_SYSTEM_PROMPT
+from meshes import cube_mesh, sphere_mesh
+from npc_renderer import NPCRenderer
+from text_renderer import get_font, get_text_renderer
+from texture_manager import textures
+from frame_scheduler import FrameScheduler, FrameStats
+from request_executor import RequestExecutor
+from response_cache import responses
+import llm_client
+from conversation_memory import ConversationMemory
+from emotion_parser import EmotionTagParser
+from spatial_index import SpatialHash
+from level_loader import load_level
+from collision import CollisionGrid, box_around
+from culling import Frustum, LOD_DISTANCES, SPHERE_DETAIL
 
 # Constants
 WINDOW_WIDTH = 800
 WINDOW_HEIGHT = 600
 TILE_SIZE = 32
 FPS = 60
+FRAME_STATS_PATH = "frame_stats.json"  # Frame-time summary written on exit
+PLAYER_RADIUS = 0.3  # Half-size of the player's collision box
+NPC_RADIUS = 0.2
+
+# Collision footprint (half x, half z) of each kind of furniture, before its rotation
+FOOTPRINTS = {
+    'desks': (0.4, 0.3),
+    'chairs': (0.15, 0.15),
+    'plants': (0.15, 0.15),
+}
+
+# Bounding sphere (center offset, radius) of each kind of furniture, for frustum culling
+OBJECT_BOUNDS = {
+    'desks': ((0, 0.3, 0), 0.6),
+    'chairs': ((0, 0.25, 0), 0.35),
+    'partitions': ((0, 0, 0), 0.85),
+    'plants': ((0, 0.15, 0), 0.3),
+}
+
+# Voice (name, speed, pitch) and starting emotion of each NPC role
+NPC_VOICES = {
+    "HR": ("nova", 1.0, 1.0, "friendly"),
+    "CEO": ("onyx", 0.9, 0.9, "authoritative"),
+    "Employee": ("alloy", 1.0, 1.0, "calm"),  # Generic N tile NPCs
+}
+
+
+def npc_greeting(npc_role):
+    return f"Hello! I'm the {npc_role}. How can I help you today?"
 
 # Colors
 BLACK = (0, 0, 0)
@@ -73,21 +86,21 @@ BROWN = (139, 69, 19)
 RED = (255, 0, 0)
 GRAY = (128, 128, 128)
 
-# Game map
+# Game map: W wall, . floor, P player spawn, N an NPC, H/C the HR and CEO NPCs (each NPC
+# gets a desk, chair and booth partition), * plant. See level_loader for the full legend.
 GAME_MAP = [
-    "WWWWWWWWWWWWWWWWWWWW",
-    "W..................W",
-    "W..................W",
-    "W........N.........W",
-    "W..................W",
-    "W..................W",
-    "W..................W",
-    "W....P.............W",
-    "W..................W",
-    "W..................W",
-    "W..................W",
-    "W..................W",
-    "WWWWWWWWWWWWWWWWWWWW"
+    "WWWWWWWWWWWW",
+    "W*........*W",
+    "W..........W",
+    "W.H........W",
+    "W..........W",
+    "W..........W",
+    "W.....P..C.W",
+    "W..........W",
+    "W..........W",
+    "W..........W",
+    "W*........*W",
+    "WWWWWWWWWWWW",
 ]
 
 # Add these constants near the other constants
@@ -97,65 +110,126 @@ MENU_BG_COLOR = (0, 0, 0)  # Black background
 MENU_TEXT_COLOR = (0, 255, 0)  # Matrix-style green
 MENU_HIGHLIGHT_COLOR = (0, 200, 0)  # Slightly darker green for effects
 
+offscreen_context = None  # Set by init_display when rendering headless
+
+def load_api_key(required=True):
+    """Read OPENAI_API_KEY from the environment or .env; exits if it is required and missing"""
+    load_dotenv()
+    api_key = os.getenv('OPENAI_API_KEY')
+    if not api_key:
+        if required:
+            print("[OpenAI] API key not found. Please set OPENAI_API_KEY in your .env file.")
+            sys.exit(1)
+        print("[OpenAI] API key not found, NPC replies are disabled.")
+        return None
+    # The OpenAI client reads the key from the environment when it is first created
+    print("[OpenAI] API key loaded successfully.")
+    return api_key
+
+def init_display(headless=HEADLESS):
+    """Open the game window, or an offscreen GL context when headless, and set up GL state"""
+    if pygame.display.get_init() and (offscreen_context or pygame.display.get_surface()):
+        return  # Already open
+    with profiler.measure("display"):
+        _open_display(headless)
+
+def _open_display(headless):
+    global offscreen_context
+    pygame.init()
+    if headless:
+        offscreen_context = offscreen.create_context(WINDOW_WIDTH, WINDOW_HEIGHT)
+        # The dummy driver's surface only backs events and fonts, GL draws into the context above
+        pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    else:
+        # Initialize Pygame with macOS specific settings
+        pygame.display.gl_set_attribute(pygame.GL_CONTEXT_MAJOR_VERSION, 2)
+        pygame.display.gl_set_attribute(pygame.GL_CONTEXT_MINOR_VERSION, 1)
+        pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT), DOUBLEBUF|OPENGL)
+    setup_gl()
+
+def setup_gl():
+    """Camera, lighting and blending the game renders with"""
+    # Set up the camera and perspective
+    glEnable(GL_DEPTH_TEST)
+    glMatrixMode(GL_PROJECTION)
+    glLoadIdentity()
+    gluPerspective(45, (WINDOW_WIDTH / WINDOW_HEIGHT), 0.1, 50.0)
+    glMatrixMode(GL_MODELVIEW)
+
+    # Set up basic lighting
+    glEnable(GL_LIGHTING)
+    glEnable(GL_LIGHT0)
+    glLightfv(GL_LIGHT0, GL_POSITION, [0, 5, 5, 1])
+    glLightfv(GL_LIGHT0, GL_AMBIENT, [0.5, 0.5, 0.5, 1])
+    glLightfv(GL_LIGHT0, GL_DIFFUSE, [1.0, 1.0, 1.0, 1])
+    glEnable(GL_NORMALIZE)  # Meshes are scaled through the matrix, keep normals unit length
+
+    # Enable blending for transparency
+    glEnable(GL_BLEND)
+    glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+
+    # Initial camera position
+    glLoadIdentity()
+    glTranslatef(0.0, 0.0, -5)
+
+def present():
+    """Show the finished frame; offscreen there is nothing to swap, so wait for the GL work instead"""
+    if offscreen_context is not None:
+        glFinish()
+    else:
+        pygame.display.flip()
+
 def draw_cube():
-    vertices = [
-        # Front face
-        [-0.5, -0.5,  0.5],
-        [ 0.5, -0.5,  0.5],
-        [ 0.5,  0.5,  0.5],
-        [-0.5,  0.5,  0.5],
-        # Back face
-        [-0.5, -0.5, -0.5],
-        [-0.5,  0.5, -0.5],
-        [ 0.5,  0.5, -0.5],
-        [ 0.5, -0.5, -0.5],
-    ]
-    
-    surfaces = [
-        [0, 1, 2, 3],  # Front
-        [3, 2, 6, 5],  # Top
-        [0, 3, 5, 4],  # Left
-        [1, 7, 6, 2],  # Right
-        [4, 5, 6, 7],  # Back
-        [0, 4, 7, 1],  # Bottom
-    ]
-    
-    glBegin(GL_QUADS)
-    for surface in surfaces:
-        glNormal3f(0, 0, 1)  # Simple normal for lighting
-        for vertex in surface:
-            glVertex3fv(vertices[vertex])
-    glEnd()
+    cube_mesh().draw()
 
 def draw_sphere(radius, slices, stacks):
-    for i in range(stacks):
-        lat0 = math.pi * (-0.5 + float(i) / stacks)
-        z0 = math.sin(lat0)
-        zr0 = math.cos(lat0)
-        
-        lat1 = math.pi * (-0.5 + float(i + 1) / stacks)
-        z1 = math.sin(lat1)
-        zr1 = math.cos(lat1)
-        
-        glBegin(GL_QUAD_STRIP)
-        for j in range(slices + 1):
-            lng = 2 * math.pi * float(j) / slices
-            x = math.cos(lng)
-            y = math.sin(lng)
-            
-            glNormal3f(x * zr0, y * zr0, z0)
-            glVertex3f(x * zr0 * radius, y * zr0 * radius, z0 * radius)
-            glNormal3f(x * zr1, y * zr1, z1)
-            glVertex3f(x * zr1 * radius, y * zr1 * radius, z1 * radius)
-        glEnd()
+    # The cached mesh is a unit sphere, so the radius goes through the matrix
+    glPushMatrix()
+    glScalef(radius, radius, radius)
+    sphere_mesh(slices, stacks).draw()
+    glPopMatrix()
+
+def begin_2d():
+    """Switch to a y-down pixel projection for overlays, saving the current state"""
+    glPushAttrib(GL_ALL_ATTRIB_BITS)
+    glMatrixMode(GL_PROJECTION)
+    glPushMatrix()
+    glLoadIdentity()
+    glOrtho(0, WINDOW_WIDTH, WINDOW_HEIGHT, 0, -1, 1)
+    glMatrixMode(GL_MODELVIEW)
+    glPushMatrix()
+    glLoadIdentity()
+
+    glDisable(GL_DEPTH_TEST)
+    glDisable(GL_LIGHTING)
+    glEnable(GL_BLEND)
+    glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+
+def end_2d():
+    """Restore the state saved by begin_2d"""
+    glMatrixMode(GL_PROJECTION)
+    glPopMatrix()
+    glMatrixMode(GL_MODELVIEW)
+    glPopMatrix()
+    glPopAttrib()
+
+def draw_panel(x, y, width, height, color):
+    """Flat translucent rectangle for 2D overlays"""
+    glColor4ub(*color)
+    glBegin(GL_QUADS)
+    glVertex2f(x, y)
+    glVertex2f(x + width, y)
+    glVertex2f(x + width, y + height)
+    glVertex2f(x, y + height)
+    glEnd()
 
 class DialogueSystem:
     def __init__(self):
         self.active = False
         self.user_input = ""
         try:
-            pygame.font.init()
-            self.font = pygame.font.Font(None, 24)
+            self.font = get_font(24)
+            self.text = get_text_renderer(24)
             print("[DialogueSystem] Font loaded successfully")
         except Exception as e:
             print("[DialogueSystem] Font loading failed:", e)
@@ -164,15 +238,60 @@ class DialogueSystem:
         self.last_npc_text = ""
         self.last_input_text = ""
         self.conversation_history = []
-        self.speech_system = SpeechSystem()
+        self.memory = ConversationMemory()  # Per NPC, survives leaving the conversation
         self.speech_enabled = False
         self.current_npc = None
         self.initial_player_pos = None
         self.current_emotion = None
+        # Speech and audio are only needed once the player presses Shift+T, so they load then,
+        # or earlier on a background thread while the menu plays
+        self.speech = LazySubsystem("speech", self._create_speech_system)
+
+        # API calls and speech run in the background so the game loop never blocks
+        # A spoken reply alone holds five threads: the chat stream, the TextStream pump, two
+        # sentence fetches and audio playback. Leave room for the greeting prewarm and warm-up too,
+        # so playback never waits for a whole sentence to download.
+        self.executor = RequestExecutor("dialogue", max_workers=8)
+        self.conversation_id = 0  # Bumped on every start/exit so stale replies are dropped
+        self.thinking = False  # An NPC reply is pending
+        self.reply = None  # State of the reply currently streaming in
+        self.reply_id = 0  # Bumped for every message, so a newer reply drops the older one's tokens
+        self.speech_stream = None  # TextStream feeding the reply to the speech pipeline
 
         # Create a surface for the UI
         self.ui_surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA).convert_alpha()
-        self.ui_texture = glGenTextures(1)
+        self.ui_surface.fill((0, 0, 0, 0))
+        box_height = 200
+        self.box_rect = pygame.Rect(20, WINDOW_HEIGHT - box_height - 20, WINDOW_WIDTH - 40, box_height)
+
+        # Allocate the texture storage once; later frames only update the dialogue box
+        texture_data = pygame.image.tostring(self.ui_surface, "RGBA", True)
+        self.ui_texture = textures.allocate("dialogue_ui", WINDOW_WIDTH, WINDOW_HEIGHT, texture_data)
+        glBindTexture(GL_TEXTURE_2D, 0)
+        self.overlay_state = None  # State the texture was last drawn from
+
+    @property
+    def speech_system(self):
+        return self.speech.get()
+
+    def _create_speech_system(self):
+        from speech_system import SpeechSystem
+
+        speech_system = SpeechSystem()
+        speech_system.memory = self.memory  # Spoken turns are remembered like typed ones
+        # Spoken replies change the on-screen emotion too, handed over to the game thread
+        speech_system.on_emotion = lambda emotion: self.executor.call_soon(self._on_reply_emotion, emotion)
+        # Catch up on the conversation that may have started before it loaded
+        speech_system.npc_role = self.current_npc
+        if self.current_npc in NPC_VOICES:
+            voice, speed, pitch, _ = NPC_VOICES[self.current_npc]
+            speech_system.set_npc_voice(voice, speed=speed, pitch=pitch)
+        return speech_system
+
+    def warm_up(self):
+        """Load speech and the OpenAI client in the background, e.g. while the menu is showing"""
+        self.speech.warm_up()
+        self.executor.submit(llm_client.get_client, on_error=lambda e: print(f"[OpenAI] Client not ready: {e}"))
 
     def start_conversation(self, npc_role="HR", player_pos=None):
         """Start a new conversation with an NPC"""
@@ -180,24 +299,41 @@ class DialogueSystem:
         self.input_active = True
         self.initial_player_pos = player_pos
         self.current_npc = npc_role
+        self.conversation_id += 1
         
-        # Set initial voice based on NPC role
-        if npc_role == "HR":
-            self.speech_system.set_npc_voice("nova", speed=1.0, pitch=1.0)
-            self.current_emotion = "friendly"
-        elif npc_role == "CEO":
-            self.speech_system.set_npc_voice("onyx", speed=0.9, pitch=0.9)
-            self.current_emotion = "authoritative"
+        # Set initial voice based on NPC role (applied when speech loads if it hasn't yet)
+        if npc_role in NPC_VOICES:
+            voice, speed, pitch, emotion = NPC_VOICES[npc_role]
+            self.current_emotion = emotion
+            if self.speech.loaded:
+                self.speech_system.npc_role = npc_role
+                self.speech_system.set_npc_voice(voice, speed=speed, pitch=pitch)
+        elif self.speech.loaded:
+            self.speech_system.npc_role = npc_role
         
+        # Show what the NPC still remembers from earlier conversations
+        self.conversation_history = self.memory.recent(npc_role)
+
         # Add greeting message
-        greeting = f"Hello! I'm the {npc_role}. How can I help you today?"
+        greeting = npc_greeting(npc_role)
         self.npc_message = greeting
         self.last_npc_text = greeting
         self.conversation_history.append(("NPC", greeting))
         
         # Convert greeting to speech if speech is enabled
         if self.speech_enabled:
-            asyncio.run(self.speech_system._text_to_speech(greeting))
+            self.executor.submit(self.speech_system._text_to_speech, greeting)
+
+    def prewarm_greetings(self):
+        """Synthesize every NPC greeting into the TTS cache in the background"""
+        lines = [(npc_greeting(role), voice, speed) for role, (voice, speed, _, _) in NPC_VOICES.items()]
+        # Reaching speech_system in the worker thread waits for the warm-up instead of the game loop
+        self.executor.submit(lambda: self.speech_system.prewarm(lines))
+
+    def update(self):
+        """Deliver finished background requests; call once per frame"""
+        self.executor.poll()
+        self._refresh_reply()
 
     def handle_input(self, event):
         if event.type == pygame.KEYDOWN:
@@ -214,11 +350,13 @@ class DialogueSystem:
                 self.npc_message = ""
                 self.last_npc_text = ""
                 self.current_npc = None
+                self.conversation_id += 1
+                self.thinking = False
                 if self.speech_enabled:
                     self.speech_system.stop_listening()
-                    self.speech_system.interrupt_speech()  # Stop any ongoing speech
+                    self.interrupt_speech()  # Stop any ongoing speech
                     self.speech_enabled = False
-                # Clear conversation history
+                # Clear the dialogue box; the NPC's memory of the conversation is kept
                 self.conversation_history = []
                 print("Conversation exited and states reset")
             elif event.key == pygame.K_v and (pygame.key.get_mods() & pygame.KMOD_CTRL):
@@ -232,15 +370,20 @@ class DialogueSystem:
                 print("Shift+T detected - Toggle speech mode")
                 self.speech_enabled = not self.speech_enabled
                 print(f"Speech mode toggled: {self.speech_enabled}")
-                if self.speech_enabled:
+                if self.speech_enabled and not self.speech.available():
+                    # e.g. a speech dependency is missing; text chat still works
+                    print(f"[Speech] Unavailable: {self.speech.error}")
+                    self.speech_enabled = False
+                    self.conversation_history.append(("System", "Speech unavailable"))
+                elif self.speech_enabled:
                     self.speech_system.start_listening()
                 else:
                     self.speech_system.stop_listening()
-                    self.speech_system.interrupt_speech()  # Stop any ongoing speech
-            elif event.key == pygame.K_SPACE and self.speech_system.is_currently_speaking():
+                    self.interrupt_speech()  # Stop any ongoing speech
+            elif event.key == pygame.K_SPACE and self.speech.loaded and self.speech_system.is_currently_speaking():
                 # Interrupt NPC speech with spacebar
                 print("Interrupting NPC speech...")
-                self.speech_system.interrupt_speech()
+                self.interrupt_speech()
                 # Add interruption message to conversation
                 self.conversation_history.append(("System", "NPC speech interrupted"))
                 # Clear any pending input to ensure clean state
@@ -251,78 +394,94 @@ class DialogueSystem:
             if event.button == 1:  # Left click
                 self.input_active = True
 
+    def overlay_state_key(self):
+        """Everything the dialogue box depends on - the overlay is redrawn only when this changes"""
+        return (
+            tuple(self.conversation_history[-3:]),
+            self.user_input,
+            self.input_active,
+            self.speech_enabled,
+            self.current_emotion,
+            self.speech_system.partial_transcript if self.speech_enabled else "",
+            int(time.time() * 3) % 4 if self.thinking else None,  # Animates the thinking dots
+        )
+
+    def redraw_overlay(self):
+        """Rasterize the dialogue box into ui_surface"""
+        box_x, box_y, box_width, box_height = self.box_rect
+        self.ui_surface.set_clip(self.box_rect)
+        self.ui_surface.fill((0, 0, 0, 0), self.box_rect)
+
+        # Make the background MUCH darker - almost black with some transparency
+        box_color = (0, 0, 0, 230)  # Changed to very dark, mostly opaque background
+        pygame.draw.rect(self.ui_surface, box_color, self.box_rect)
+
+        # White border
+        pygame.draw.rect(self.ui_surface, (255, 255, 255, 255), self.box_rect, 2)
+
+        # Controls instruction
+        controls_text = "Press Shift+T to toggle speech mode | Press ESC to exit chat"
+        controls_surface = self.font.render(controls_text, True, (255, 255, 255))
+        self.ui_surface.blit(controls_surface, (40, box_y + 10))
+
+        # Display conversation history
+        y_offset = box_y + 40
+        for role, message in self.conversation_history[-3:]:  # Show last 3 messages
+            prefix = "NPC: " if role == "NPC" else "You: "
+            message_text = prefix + message
+            # Split long messages into multiple lines (layouts are cached by the text renderer)
+            lines = self.text.wrap(message_text, WINDOW_WIDTH - 80)  # Leave margin
+
+            # Render each line
+            for line in lines:
+                line_surface = self.font.render(line, True, (255, 255, 255))
+                self.ui_surface.blit(line_surface, (40, y_offset))
+                y_offset += 25  # Increased line spacing
+
+        # Input prompt in white
+        partial = self.speech_system.partial_transcript if self.speech_enabled else ""
+        if self.input_active and partial and not self.user_input:
+            # Live transcript of what the player is saying
+            input_surface = self.font.render(f'> "{partial}"', True, (180, 180, 180))
+            self.ui_surface.blit(input_surface, (40, box_y + box_height - 40))
+        elif self.input_active:
+            input_prompt = "> " + self.user_input + "_"
+            input_surface = self.font.render(input_prompt, True, (255, 255, 255))
+            self.ui_surface.blit(input_surface, (40, box_y + box_height - 40))
+
+        # Display speech mode and emotion indicators
+        indicators_y = box_y + box_height - 70
+        if self.speech_enabled:
+            speech_indicator = self.font.render("Speech Mode: ON", True, (0, 255, 0))
+            self.ui_surface.blit(speech_indicator, (40, indicators_y))
+
+        if self.current_emotion:
+            emotion_indicator = self.font.render(f"Emotion: {self.current_emotion.capitalize()}", True, (255, 255, 0))
+            self.ui_surface.blit(emotion_indicator, (200, indicators_y))
+
+        if self.thinking:
+            dots = "." * (int(time.time() * 3) % 4)
+            thinking_indicator = self.font.render(f"{self.current_npc} is thinking{dots}", True, (180, 180, 180))
+            self.ui_surface.blit(thinking_indicator, (400, indicators_y))
+
+        self.ui_surface.set_clip(None)
+
+    def upload_overlay_rect(self, rect):
+        """Copy one rectangle of ui_surface into the existing texture"""
+        texture_data = pygame.image.tostring(self.ui_surface.subsurface(rect), "RGBA", True)
+        # The texture is stored bottom-up, so flip the rectangle's y offset too
+        textures.update("dialogue_ui", rect.x, WINDOW_HEIGHT - rect.bottom, rect.width, rect.height, texture_data)
+
     def render(self):
         if not self.active:
             return
 
-        self.ui_surface.fill((0, 0, 0, 0))
-
-        if self.active:
-            box_height = 200
-            box_y = WINDOW_HEIGHT - box_height - 20
-            
-            # Make the background MUCH darker - almost black with some transparency
-            box_color = (0, 0, 0, 230)  # Changed to very dark, mostly opaque background
-            pygame.draw.rect(self.ui_surface, box_color, (20, box_y, WINDOW_WIDTH - 40, box_height))
-            
-            # White border
-            pygame.draw.rect(self.ui_surface, (255, 255, 255, 255), (20, box_y, WINDOW_WIDTH - 40, box_height), 2)
-
-            # Controls instruction
-            controls_text = "Press Shift+T to toggle speech mode | Press ESC to exit chat"
-            controls_surface = self.font.render(controls_text, True, (255, 255, 255))
-            self.ui_surface.blit(controls_surface, (40, box_y + 10))
-
-            # Display conversation history
-            y_offset = box_y + 40
-            for role, message in self.conversation_history[-3:]:  # Show last 3 messages
-                prefix = "NPC: " if role == "NPC" else "You: "
-                message_text = prefix + message
-                # Split long messages into multiple lines
-                words = message_text.split()
-                lines = []
-                current_line = []
-                current_width = 0
-                
-                for word in words:
-                    word_surface = self.font.render(word + ' ', True, (255, 255, 255))
-                    word_width = word_surface.get_width()
-                    
-                    if current_width + word_width <= WINDOW_WIDTH - 80:  # Leave margin
-                        current_line.append(word)
-                        current_width += word_width
-                    else:
-                        lines.append(' '.join(current_line))
-                        current_line = [word]
-                        current_width = word_width
-                
-                if current_line:
-                    lines.append(' '.join(current_line))
-                
-                # Render each line
-                for line in lines:
-                    line_surface = self.font.render(line, True, (255, 255, 255))
-                    self.ui_surface.blit(line_surface, (40, y_offset))
-                    y_offset += 25  # Increased line spacing
-
-            # Input prompt in white
-            if self.input_active:
-                input_prompt = "> " + self.user_input + "_"
-                input_surface = self.font.render(input_prompt, True, (255, 255, 255))
-                self.ui_surface.blit(input_surface, (40, box_y + box_height - 40))
-
-            # Display speech mode and emotion indicators
-            indicators_y = box_y + box_height - 70
-            if self.speech_enabled:
-                speech_indicator = self.font.render("Speech Mode: ON", True, (0, 255, 0))
-                self.ui_surface.blit(speech_indicator, (40, indicators_y))
-            
-            if self.current_emotion:
-                emotion_indicator = self.font.render(f"Emotion: {self.current_emotion.capitalize()}", True, (255, 255, 0))
-                self.ui_surface.blit(emotion_indicator, (200, indicators_y))
-
-        # Convert surface to OpenGL texture
-        texture_data = pygame.image.tostring(self.ui_surface, "RGBA", True)
+        # Only re-rasterize and re-upload the dialogue box when its contents changed
+        state = self.overlay_state_key()
+        if state != self.overlay_state:
+            self.redraw_overlay()
+            self.upload_overlay_rect(self.box_rect)
+            self.overlay_state = state
 
         # Save current OpenGL state
         glPushAttrib(GL_ALL_ATTRIB_BITS)
@@ -339,12 +498,7 @@ class DialogueSystem:
         glEnable(GL_BLEND)
         glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
         glEnable(GL_TEXTURE_2D)
-
-        # Bind and update texture
         glBindTexture(GL_TEXTURE_2D, self.ui_texture)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, WINDOW_WIDTH, WINDOW_HEIGHT, 0, GL_RGBA, GL_UNSIGNED_BYTE, texture_data)
 
         # Draw the UI texture
         glBegin(GL_QUADS)
@@ -366,65 +520,146 @@ class DialogueSystem:
             print(f"Sending message: {self.user_input}")
             self.last_input_text = self.user_input
             self.conversation_history.append(("Player", self.user_input))
-            
-            # Process speech if enabled
+
+            # In speech mode a new message interrupts the NPC's current reply
+            if self.speech_enabled and self.speech_system.is_currently_speaking():
+                self.interrupt_speech()
+                self.conversation_history.append(("System", "Previous response interrupted"))
+            self._end_speech_stream()
+
+            # In speech mode the reply is spoken sentence by sentence as it streams in
             if self.speech_enabled:
-                print("Speech mode enabled, processing speech input")
-                asyncio.run(self._process_speech_input(self.user_input))
-            else:
-                print("Speech mode disabled, processing text input")
-                # Regular text-based processing
-                self._process_text_input(self.user_input)
-            
+                from speech_system import TextStream  # Loaded already, speech is on
+
+                self.speech_stream = TextStream()
+                self.executor.submit(self.speech_system.speak_stream, self.speech_stream)
+
+            self.reply_id += 1
+            reply_id = self.reply_id
+            prompt = self.user_input
+            history = self.memory.recent(self.current_npc)
+            self.reply = {"parser": EmotionTagParser(self._set_emotion), "index": None, "id": reply_id,
+                          "conversation_id": self.conversation_id, "prompt": prompt, "history": history,
+                          "started": time.perf_counter()}
             self.user_input = ""
 
-    async def _process_speech_input(self, text):
-        try:
-            # Check if we should interrupt current speech
-            if self.speech_system.is_currently_speaking():
-                self.speech_system.interrupt_speech()
-                self.conversation_history.append(("System", "Previous response interrupted"))
-                # Add a small delay to ensure clean state
-                await asyncio.sleep(0.1)
-
-            # Get response from OpenAI with emotion detection
-            response = await self.speech_system._get_openai_response(text)
-            if response:
-                print(f"Speech response received: {response}")
-                # Update both text and voice
-                self.npc_message = response
-                self.last_npc_text = response
-                self.conversation_history.append(("NPC", response))
-                
-                # Convert response to speech
-                await self.speech_system._text_to_speech(response)
-        except Exception as e:
-            print(f"Error processing speech input: {e}")
-            error_msg = "Sorry, I couldn't process that."
-            self.npc_message = error_msg
-            self.last_npc_text = error_msg
-            self.conversation_history.append(("NPC", error_msg))
-
-    def _process_text_input(self, text):
-        # Existing text-based processing logic
-        try:
-            client = openai.OpenAI()
-            response = client.chat.completions.create(
-                model="gpt-4",
-                messages=[{"role": "user", "content": text}]
+            # Questions the NPC has already answered are replied to straight from the cache
+            cached = responses.get(self.current_npc, prompt, history)
+            if cached is not None:
+                self.reply["cached"] = True
+                self._on_reply_token(cached, reply_id)
+                self._on_reply_done(reply_id)
+                return
+
+            # The NPC remembers the conversation so far, within a fixed token budget. The player's
+            # turn is only remembered with the reply, so a failed request leaves no dangling question.
+            messages, prompt_tokens = self.memory.build_messages(self.current_npc, NPC_SYSTEM_PROMPT, prompt)
+            print(f"[Memory] {self.current_npc}: {prompt_tokens} prompt tokens")
+
+            # Stream the reply into the dialogue box as it is generated
+            self.executor.submit_stream(
+                self._stream_reply, messages,
+                on_item=lambda token: self._on_reply_token(token, reply_id),
+                on_done=lambda: self._on_reply_done(reply_id),
+                on_error=lambda error: self._is_current(reply_id) and self._on_request_error(error),
+                stop=lambda: not self._is_current(reply_id),
             )
-            npc_response = response.choices[0].message.content
-            print(f"OpenAI response: {npc_response}")
-            self.npc_message = npc_response
-            self.last_npc_text = npc_response
-            self.conversation_history.append(("NPC", npc_response))
-        except Exception as e:
-            print(f"Error processing text input: {e}")
-            self.npc_message = "Sorry, I couldn't process that."
+            self.thinking = True
+
+    def _is_current(self, reply_id):
+        """Whether reply_id is still the reply being shown: no newer message, same conversation"""
+        reply = self.reply
+        return reply is not None and reply["id"] == reply_id and reply["conversation_id"] == self.conversation_id
+
+    def _on_reply_token(self, token, reply_id):
+        """Append a streamed token to the NPC's entry (runs on the game thread from update())"""
+        if not self._is_current(reply_id):
+            return  # A newer message replaced this reply, or the player left the conversation
+        # Emotion tags are stripped as they stream and change the voice straight away
+        visible = self.reply["parser"].feed(token)
+        if visible:
+            self._show_reply(visible)
+
+    def _show_reply(self, visible):
+        reply = self.reply
+        if self.speech_stream is not None:
+            self.speech_stream.feed(visible)
+        self.thinking = False
+        reply["dirty"] = True
+
+    def _refresh_reply(self):
+        """Copy the reply text into its dialogue entry, once per frame rather than per token"""
+        reply = self.reply
+        if not reply or not reply.get("dirty") or not self._is_current(reply["id"]):
+            return
+        reply["dirty"] = False
+        text = reply["parser"].text()
+        if reply["index"] is None:
+            reply["index"] = len(self.conversation_history)
+            self.conversation_history.append(("NPC", text))
+        else:
+            self.conversation_history[reply["index"]] = ("NPC", text)
+
+    def _on_reply_done(self, reply_id):
+        if not self._is_current(reply_id):
+            return
+        parser = self.reply["parser"]
+        visible = parser.flush()
+        if visible:
+            self._show_reply(visible)
+        self._refresh_reply()
+        self.thinking = False
+        self._end_speech_stream()
+        response = parser.text().strip()
+        if not response:
+            self._on_request_error("empty response")
+            return
+        print(f"OpenAI response: {response}")
+        self.npc_message = response
+        self.last_npc_text = response
+        self.memory.add(self.current_npc, "Player", self.reply["prompt"])
+        self.memory.add(self.current_npc, "NPC", response)
+        if not self.reply.get("cached"):
+            latency = time.perf_counter() - self.reply["started"]
+            responses.put(self.current_npc, self.reply["prompt"], parser.raw(),
+                          history=self.reply["history"], latency=latency)
+
+    def _on_reply_emotion(self, emotion):
+        """Emotion tag of a spoken reply; its voice change has already been made by the speech system"""
+        self.current_emotion = emotion
+
+    def _set_emotion(self, emotion):
+        self.current_emotion = emotion
+        if self.speech_enabled and self.speech.loaded:
+            self.speech_system.adjust_voice_for_emotion(emotion)
+
+    def _end_speech_stream(self):
+        """Tell the speech pipeline no more reply text is coming"""
+        if self.speech_stream is not None:
+            self.speech_stream.close()
+            self.speech_stream = None
+
+    def interrupt_speech(self):
+        self._end_speech_stream()
+        if self.speech.loaded:
+            self.speech_system.interrupt_speech()
+
+    def _on_request_error(self, error):
+        print(f"Error processing input: {error}")
+        self.thinking = False
+        self._end_speech_stream()
+        error_msg = "Sorry, I couldn't process that."
+        self.npc_message = error_msg
+        self.last_npc_text = error_msg
+        self.conversation_history.append(("NPC", error_msg))
+
+    def _stream_reply(self, messages):
+        """Yield reply tokens as they arrive (runs in the executor's thread pool)"""
+        yield from llm_client.stream_chat(messages)
 
 class World:
-    def __init__(self):
-        self.size = 5
+    def __init__(self, level=None):
+        self.level = level or load_level(GAME_MAP)
         # Define office furniture colors
         self.colors = {
             'floor': (0.76, 0.6, 0.42),  # Light wood color
@@ -435,8 +670,82 @@ class World:
             'plant': (0.2, 0.5, 0.2),  # Green
             'partition': (0.3, 0.3, 0.3)  # Darker solid gray for booth walls
         }
-        
-    def draw_desk(self, x, z, rotation=0):
+
+        # Office layout from the map - everything here is baked into the static geometry
+        self.layout = {
+            'desks': list(self.level.desks),
+            'chairs': list(self.level.chairs),
+            'partitions': list(self.level.partitions),  # Booth walls around each NPC's desk
+            'plants': list(self.level.plants),
+        }
+
+        # Display lists: one for the room, one per piece of furniture and level of detail
+        self.display_list = None
+        self.object_lists = 0  # First of the furniture lists
+        self.object_list_count = 0
+        self.objects = []  # (kind, item) behind each furniture list
+        self.layout_dirty = True
+        self.drawn = 0  # Furniture drawn and culled last frame
+        self.culled = 0
+
+        # Bounding boxes of the walls and furniture, for player movement
+        self.collision = CollisionGrid()
+        for box in self.level.wall_rects:
+            self.collision.add(box, 'walls')
+        for kind, items in self.layout.items():
+            for item in items:
+                self.add_colliders(kind, *item)
+
+    def place(self, kind, *args):
+        """Add a piece of furniture to the layout ('desks', 'chairs', 'partitions' or 'plants')"""
+        self.layout[kind].append(args)
+        self.add_colliders(kind, *args)
+        self.invalidate()
+
+    def add_colliders(self, kind, x, z, rotation=0):
+        if kind == 'partitions':
+            # Back and side wall, matching draw_partition_walls
+            self.collision.add(box_around(x, z, 0.025, 0.5), kind)
+            self.collision.add(box_around(x, z + 0.5, 0.025, 0.4, 90), kind)
+        else:
+            half_x, half_z = FOOTPRINTS[kind]
+            self.collision.add(box_around(x, z, half_x, half_z, rotation), kind)
+
+    def invalidate(self):
+        """Mark the static geometry for rebuild on the next draw"""
+        self.layout_dirty = True
+
+    def build_static_geometry(self):
+        """Bake the room and furniture into display lists"""
+        # Display lists rather than VBOs: they capture the existing immediate-mode
+        # draw code as-is and are always available in the GL 2.1 context we request
+        if self.display_list is None:
+            self.display_list = glGenLists(1)
+        glNewList(self.display_list, GL_COMPILE)
+        self.draw_room()
+        glEndList()
+
+        # Each piece of furniture gets its own list per level of detail, so it can be culled
+        # on its own; list object_lists + lod * len(objects) + i draws object i at that LOD
+        if self.object_list_count:
+            glDeleteLists(self.object_lists, self.object_list_count)
+        self.objects = [(kind, item) for kind, items in self.layout.items() for item in items]
+        lods = len(LOD_DISTANCES) + 1
+        self.object_list_count = len(self.objects) * lods
+        self.object_lists = glGenLists(self.object_list_count) if self.object_list_count else 0
+        for lod in range(lods):
+            for i, (kind, item) in enumerate(self.objects):
+                glNewList(self.object_lists + lod * len(self.objects) + i, GL_COMPILE)
+                self.draw_object(kind, item, lod)
+                glEndList()
+
+        # Bounding spheres of the furniture
+        self.centers = np.array([(item[0] + OBJECT_BOUNDS[kind][0][0], OBJECT_BOUNDS[kind][0][1],
+                                  item[1] + OBJECT_BOUNDS[kind][0][2]) for kind, item in self.objects]).reshape(-1, 3)
+        self.radii = np.array([OBJECT_BOUNDS[kind][1] for kind, _ in self.objects])
+        self.layout_dirty = False
+
+    def draw_desk(self, x, z, rotation=0, lod=0):
         glPushMatrix()
         glTranslatef(x, 0, z)  # Start at floor level
         glRotatef(rotation, 0, 1, 0)
@@ -450,8 +759,9 @@ class World:
         glVertex3f(-0.4, 0.4, 0.3)
         glEnd()
         
-        # Desk legs (adjusted for new height)
-        for x_offset, z_offset in [(-0.35, -0.25), (0.35, -0.25), (-0.35, 0.25), (0.35, 0.25)]:
+        # Desk legs (adjusted for new height), too thin to make out from far away
+        legs = [(-0.35, -0.25), (0.35, -0.25), (-0.35, 0.25), (0.35, 0.25)] if lod == 0 else []
+        for x_offset, z_offset in legs:
             glBegin(GL_QUADS)
             glVertex3f(x_offset-0.02, 0, z_offset-0.02)
             glVertex3f(x_offset+0.02, 0, z_offset-0.02)
@@ -471,7 +781,7 @@ class World:
         
         glPopMatrix()
     
-    def draw_chair(self, x, z, rotation=0):
+    def draw_chair(self, x, z, rotation=0, lod=0):
         glPushMatrix()
         glTranslatef(x, 0, z)
         glRotatef(rotation, 0, 1, 0)
@@ -493,8 +803,9 @@ class World:
         glVertex3f(-0.15, 0.5, -0.15)
         glEnd()
         
-        # Chair legs (adjusted height)
-        for x_offset, z_offset in [(-0.12, -0.12), (0.12, -0.12), (-0.12, 0.12), (0.12, 0.12)]:
+        # Chair legs (adjusted height), left out when far away
+        legs = [(-0.12, -0.12), (0.12, -0.12), (-0.12, 0.12), (0.12, 0.12)] if lod == 0 else []
+        for x_offset, z_offset in legs:
             glBegin(GL_QUADS)
             glVertex3f(x_offset-0.02, 0, z_offset-0.02)
             glVertex3f(x_offset+0.02, 0, z_offset-0.02)
@@ -504,7 +815,7 @@ class World:
             
         glPopMatrix()
     
-    def draw_plant(self, x, z):
+    def draw_plant(self, x, z, lod=0):
         glPushMatrix()
         glTranslatef(x, 0, z)
         
@@ -512,7 +823,7 @@ class World:
         glColor3f(0.4, 0.2, 0.1)  # Brown pot
         pot_radius = 0.1
         pot_height = 0.15
-        segments = 8
+        segments = 8 if lod == 0 else 4
         
         # Draw the pot sides
         glBegin(GL_QUADS)
@@ -533,7 +844,7 @@ class World:
         glColor3f(*self.colors['plant'])
         glTranslatef(0, pot_height, 0)
         leaf_size = 0.15
-        num_leaves = 6
+        num_leaves = 6 if lod == 0 else 3
         for i in range(num_leaves):
             angle = (i / num_leaves) * 2 * math.pi
             x = math.cos(angle) * leaf_size
@@ -546,66 +857,53 @@ class World:
         
         glPopMatrix()
         
-    def draw(self):
+    def draw(self, frustum=None):
+        """Draw the office, recompiling the static geometry only if the layout changed
+
+        With a frustum, furniture outside it is skipped and distant pieces are drawn simplified.
+        """
+        if self.layout_dirty or self.display_list is None:
+            self.build_static_geometry()
+        glCallList(self.display_list)
+
+        count = len(self.objects)
+        lists = np.arange(count)
+        if frustum is not None and count:
+            visible = frustum.visible(self.centers, self.radii)
+            lists = (lists + frustum.lod(self.centers) * count)[visible]
+        self.drawn = len(lists)
+        self.culled = count - len(lists)
+        if len(lists):
+            glCallLists((lists + self.object_lists).astype(np.uint32))
+
+    def draw_immediate(self):
+        """Issue every room and furniture vertex directly, at full detail"""
+        self.draw_room()
+        for kind, items in self.layout.items():
+            for item in items:
+                self.draw_object(kind, item)
+
+    def draw_room(self):
         # Set material properties
         glEnable(GL_COLOR_MATERIAL)
         glColorMaterial(GL_FRONT_AND_BACK, GL_AMBIENT_AND_DIFFUSE)
         
-        # Draw floor at Y=0
-        glBegin(GL_QUADS)
+        # Floor and walls, greedy-meshed from the map into a few large quads
         glColor3f(*self.colors['floor'])
-        glNormal3f(0, 1, 0)
-        glVertex3f(-self.size, 0, -self.size)
-        glVertex3f(-self.size, 0, self.size)
-        glVertex3f(self.size, 0, self.size)
-        glVertex3f(self.size, 0, -self.size)
-        glEnd()
-        
-        # Draw walls starting from floor level
-        glBegin(GL_QUADS)
+        self.level.meshes['floor'].draw()
         glColor3f(*self.colors['walls'])
-        
-        # Front wall
-        glVertex3f(-self.size, 0, -self.size)
-        glVertex3f(self.size, 0, -self.size)
-        glVertex3f(self.size, 2, -self.size)
-        glVertex3f(-self.size, 2, -self.size)
-        
-        # Back wall
-        glVertex3f(-self.size, 0, self.size)
-        glVertex3f(self.size, 0, self.size)
-        glVertex3f(self.size, 2, self.size)
-        glVertex3f(-self.size, 2, self.size)
-        
-        # Left wall
-        glVertex3f(-self.size, 0, -self.size)
-        glVertex3f(-self.size, 0, self.size)
-        glVertex3f(-self.size, 2, self.size)
-        glVertex3f(-self.size, 2, -self.size)
-        
-        # Right wall
-        glVertex3f(self.size, 0, -self.size)
-        glVertex3f(self.size, 0, self.size)
-        glVertex3f(self.size, 2, self.size)
-        glVertex3f(self.size, 2, -self.size)
-        glEnd()
-        
-        # Draw office furniture in a more realistic arrangement
-        # HR Area (left side)
-        self.draw_desk(-4, -2, 90)
-        self.draw_chair(-3.5, -2, 90)
-        self.draw_partition_walls(-4, -2)  # Add booth walls for HR
-        
-        # CEO Area (right side)
-        self.draw_desk(4, 1, -90)
-        self.draw_chair(3.5, 1, -90)
-        self.draw_partition_walls(4, 1)  # Add booth walls for CEO
-        
-        # Plants in corners (moved closer to walls)
-        self.draw_plant(-4.5, -4.5)
-        self.draw_plant(4.5, -4.5)
-        self.draw_plant(-4.5, 4.5)
-        self.draw_plant(4.5, 4.5)
+        self.level.meshes['walls'].draw()
+
+    def draw_object(self, kind, item, lod=0):
+        """Draw one piece of furniture from the layout"""
+        if kind == 'desks':
+            self.draw_desk(*item, lod=lod)
+        elif kind == 'chairs':
+            self.draw_chair(*item, lod=lod)
+        elif kind == 'partitions':
+            self.draw_partition_walls(*item)
+        elif kind == 'plants':
+            self.draw_plant(*item, lod=lod)
 
     def draw_partition_walls(self, x, z):
         """Draw booth partition walls - all surfaces in solid gray"""
@@ -627,29 +925,39 @@ class World:
         glPopMatrix()
 
 class Player:
-    def __init__(self):
-        self.pos = [0, 0.5, 0]  # Lowered Y position to be just above floor
+    def __init__(self, spawn=(0, 0), bounds=None):
+        self.pos = [spawn[0], 0.5, spawn[1]]  # Lowered Y position to be just above floor
+        self.bounds = bounds  # (min_x, min_z, max_x, max_z) the player stays inside
+        self.collision = None  # CollisionGrid to slide along, if any
         self.rot = [0, 0, 0]
-        self.speed = 0.3
+        self.speed = 0.3 * FPS  # Units per second (0.3 per frame at the 60 FPS target)
         self.mouse_sensitivity = 0.5
         
-    def move(self, dx, dz):
+    def move(self, dx, dz, dt=1.0 / FPS):
         # Convert rotation to radians (negative because OpenGL uses clockwise rotation)
         angle = math.radians(-self.rot[1])
         
-        # Calculate movement vector
-        move_x = (dx * math.cos(angle) + dz * math.sin(angle)) * self.speed
-        move_z = (-dx * math.sin(angle) + dz * math.cos(angle)) * self.speed
+        # Calculate movement vector, scaled by the timestep so speed doesn't depend on frame rate
+        step = self.speed * dt
+        move_x = (dx * math.cos(angle) + dz * math.sin(angle)) * step
+        move_z = (-dx * math.sin(angle) + dz * math.cos(angle)) * step
         
+        # Slide along walls, furniture and NPCs
+        if self.collision is not None:
+            self.pos[0], self.pos[2] = self.collision.move_and_slide(
+                self.pos[0], self.pos[2], move_x, move_z, PLAYER_RADIUS)
+            return
+
         # Calculate new position
         new_x = self.pos[0] + move_x
         new_z = self.pos[2] + move_z
         
-        # Wall collision check (room is 10x10)
-        room_limit = 4.5  # Slightly less than room size/2 to prevent wall clipping
-        if abs(new_x) < room_limit:
+        # Wall collision check against the level's walkable area
+        margin = 0.5  # Keep the camera from clipping into the walls
+        min_x, min_z, max_x, max_z = self.bounds or (-5, -5, 5, 5)
+        if min_x + margin < new_x < max_x - margin:
             self.pos[0] = new_x
-        if abs(new_z) < room_limit:
+        if min_z + margin < new_z < max_z - margin:
             self.pos[2] = new_z
 
     def update_rotation(self, dx, dy):
@@ -673,24 +981,28 @@ class NPC:
         if role == "HR":
             self.clothes_primary = (0.8, 0.2, 0.2)    # Bright red
             self.clothes_secondary = (0.6, 0.15, 0.15) # Darker red
-        else:  # CEO
+        elif role == "CEO":
             self.clothes_primary = (0.2, 0.3, 0.8)    # Bright blue
             self.clothes_secondary = (0.15, 0.2, 0.6)  # Darker blue
+        else:  # Any other employee
+            self.clothes_primary = (0.2, 0.6, 0.3)    # Green
+            self.clothes_secondary = (0.15, 0.45, 0.2)  # Darker green
 
-    def draw(self):
+    def draw(self, lod=0):
+        slices, stacks = SPHERE_DETAIL[lod]
         glPushMatrix()
         glTranslatef(self.pos[0], self.pos[1], self.pos[2])
         glScalef(self.scale, self.scale, self.scale)
         
         # Head
         glColor3f(*self.skin_color)
-        draw_sphere(0.12, 16, 16)
+        draw_sphere(0.12, slices, stacks)
         
         # Hair (slightly larger than head)
         glColor3f(*self.hair_color)
         glPushMatrix()
         glTranslatef(0, 0.05, 0)  # Slightly above head
-        draw_sphere(0.13, 16, 16)
+        draw_sphere(0.13, slices, stacks)
         glPopMatrix()
         
         # Body (torso)
@@ -723,18 +1035,40 @@ class NPC:
 
 class MenuScreen:
     def __init__(self):
-        self.font_large = pygame.font.Font(None, 74)
-        self.font_medium = pygame.font.Font(None, 48)
-        self.font_small = pygame.font.Font(None, 36)
+        self.text_large = get_text_renderer(74)
+        self.text_medium = get_text_renderer(48)
+        self.text_small = get_text_renderer(36)
         self.active = True
         self.start_time = time.time()
-        
+
+        # Retro scanlines, one horizontal line every 4 pixels
+        self.scanlines = np.array(
+            [(x, y + 0.5) for y in range(0, WINDOW_HEIGHT, 4) for x in (0, WINDOW_WIDTH)],
+            dtype=np.float32,
+        )
+
+    def draw_scanlines(self):
+        glPushAttrib(GL_ENABLE_BIT | GL_CURRENT_BIT)
+        glPushClientAttrib(GL_CLIENT_VERTEX_ARRAY_BIT)
+        glDisable(GL_LIGHTING)
+        glDisable(GL_TEXTURE_2D)
+        glColor3ub(0, 50, 0)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glVertexPointer(2, GL_FLOAT, 0, self.scanlines)
+        glDrawArrays(GL_LINES, 0, len(self.scanlines))
+        glPopClientAttrib()
+        glPopAttrib()
+
     def render(self):
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
-        
-        # Create a surface for 2D rendering
-        surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
-        
+
+        # Set up orthographic projection for 2D rendering
+        glMatrixMode(GL_PROJECTION)
+        glLoadIdentity()
+        glOrtho(0, WINDOW_WIDTH, WINDOW_HEIGHT, 0, -1, 1)
+        glMatrixMode(GL_MODELVIEW)
+        glLoadIdentity()
+
         # Calculate vertical positions
         center_y = WINDOW_HEIGHT // 2
         title_y = center_y - 100
@@ -745,56 +1079,24 @@ class MenuScreen:
         elapsed_time = time.time() - self.start_time
         title_chars = int(min(len(TITLE), elapsed_time * 15))  # Type 15 chars per second
         partial_title = TITLE[:title_chars]
-        title_surface = self.font_large.render(partial_title, True, MENU_TEXT_COLOR)
-        title_x = (WINDOW_WIDTH - title_surface.get_width()) // 2
-        surface.blit(title_surface, (title_x, title_y))
+        title_x = (WINDOW_WIDTH - self.text_large.measure(partial_title)) // 2
+        self.text_large.draw(partial_title, title_x, title_y, MENU_TEXT_COLOR)
         
         # Render subtitle with fade-in effect
         if elapsed_time > len(TITLE) / 15:  # Start after title is typed
             subtitle_alpha = min(255, int((elapsed_time - len(TITLE) / 15) * 255))
-            subtitle_surface = self.font_medium.render(SUBTITLE, True, MENU_TEXT_COLOR)
-            subtitle_surface.set_alpha(subtitle_alpha)
-            subtitle_x = (WINDOW_WIDTH - subtitle_surface.get_width()) // 2
-            surface.blit(subtitle_surface, (subtitle_x, subtitle_y))
+            subtitle_x = (WINDOW_WIDTH - self.text_medium.measure(SUBTITLE)) // 2
+            self.text_medium.draw(SUBTITLE, subtitle_x, subtitle_y, MENU_TEXT_COLOR, subtitle_alpha)
         
         # Render "Press ENTER" with blinking effect
         if elapsed_time > (len(TITLE) / 15 + 1):  # Start after subtitle fade
             if int(elapsed_time * 2) % 2:  # Blink every 0.5 seconds
                 prompt_text = "Press ENTER to start"
-                prompt_surface = self.font_small.render(prompt_text, True, MENU_TEXT_COLOR)
-                prompt_x = (WINDOW_WIDTH - prompt_surface.get_width()) // 2
-                surface.blit(prompt_surface, (prompt_x, prompt_y))
+                prompt_x = (WINDOW_WIDTH - self.text_small.measure(prompt_text)) // 2
+                self.text_small.draw(prompt_text, prompt_x, prompt_y, MENU_TEXT_COLOR)
         
         # Add some retro effects (scanlines)
-        for y in range(0, WINDOW_HEIGHT, 4):
-            pygame.draw.line(surface, (0, 50, 0), (0, y), (WINDOW_WIDTH, y))
-        
-        # Convert surface to OpenGL texture
-        texture_data = pygame.image.tostring(surface, "RGBA", True)
-        
-        # Set up orthographic projection for 2D rendering
-        glMatrixMode(GL_PROJECTION)
-        glLoadIdentity()
-        glOrtho(0, WINDOW_WIDTH, WINDOW_HEIGHT, 0, -1, 1)
-        glMatrixMode(GL_MODELVIEW)
-        glLoadIdentity()
-
-        # Render the texture in OpenGL
-        texture = glGenTextures(1)
-        glBindTexture(GL_TEXTURE_2D, texture)
-        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, WINDOW_WIDTH, WINDOW_HEIGHT, 0, GL_RGBA, GL_UNSIGNED_BYTE, texture_data)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-        
-        # Draw the texture
-        glEnable(GL_TEXTURE_2D)
-        glBegin(GL_QUADS)
-        glTexCoord2f(0, 1); glVertex2f(0, 0)
-        glTexCoord2f(1, 1); glVertex2f(WINDOW_WIDTH, 0)
-        glTexCoord2f(1, 0); glVertex2f(WINDOW_WIDTH, WINDOW_HEIGHT)
-        glTexCoord2f(0, 0); glVertex2f(0, WINDOW_HEIGHT)
-        glEnd()
-        glDisable(GL_TEXTURE_2D)
+        self.draw_scanlines()
         
         # Reset OpenGL state for 3D rendering
         glMatrixMode(GL_PROJECTION)
@@ -804,41 +1106,60 @@ class MenuScreen:
         glLoadIdentity()
         glEnable(GL_DEPTH_TEST)
 
-        pygame.display.flip()
+        present()
 
 # Modify the Game3D class to include the menu
 class Game3D:
-    def __init__(self):
-        self.menu = MenuScreen()
-        self.player = Player()
-        self.world = World()
-        self.dialogue = DialogueSystem()
-        self.hr_npc = NPC(-3.3, 0, -2, "HR")  # Moved beside the desk
-        self.ceo_npc = NPC(3.3, 0, 1, "CEO")  # Moved beside the desk
+    def __init__(self, level=None):
+        with profiler.measure("menu"):
+            self.menu = MenuScreen()
+        # The map places the walls, furniture, player and NPCs
+        with profiler.measure("level"):
+            self.level = level or load_level(GAME_MAP)
+            self.player = Player(self.level.player_spawn, self.level.bounds())
+            self.world = World(self.level)
+        with profiler.measure("dialogue"):
+            self.dialogue = DialogueSystem()
+        self.npcs = [NPC(x, 0, z, role) for role, x, z in self.level.npcs]
+        # The player collides with the world and the NPCs standing in it
+        self.collision = self.world.collision
+        self.player.collision = self.collision
+        self.npc_colliders = {}
+        self.npc_renderer = NPCRenderer()
+        self.npc_renderer.set_npcs(self.npcs)
         self.interaction_distance = 2.0
+        # Proximity queries go through a grid of interaction-sized cells
+        self.npc_index = SpatialHash(cell_size=self.interaction_distance)
+        for npc in self.npcs:
+            self.index_npc(npc)
         self.last_interaction_time = 0
         self.current_npc = None
         self.nearby_npc = None  # Track which NPC is nearby
+        self.scheduler = FrameScheduler(FPS)
+        self.show_stats = False  # Frame-time overlay, toggled with F3
+
+    def add_npc(self, npc):
+        """Add an NPC to the office"""
+        self.npcs.append(npc)
+        self.npc_renderer.add_npc(npc)
+        self.index_npc(npc)
+
+    def index_npc(self, npc):
+        """Register an NPC for proximity queries and collision"""
+        self.npc_index.insert(npc, npc.pos[0], npc.pos[2])
+        self.npc_colliders[npc] = self.collision.add(box_around(npc.pos[0], npc.pos[2], NPC_RADIUS, NPC_RADIUS), npc)
+
+    def move_npc(self, npc, x, z):
+        """Move an NPC across the floor, keeping the renderer, proximity index and collision in step"""
+        npc.pos[0], npc.pos[2] = x, z
+        self.npc_renderer.move_npc(npc)
+        self.npc_index.move(npc, x, z)
+        self.collision.update(self.npc_colliders[npc], box_around(x, z, NPC_RADIUS, NPC_RADIUS))
 
     def check_nearby_npc(self):
         """Check which NPC is nearby without starting conversation"""
-        # Check distance to HR NPC
-        dx = self.player.pos[0] - self.hr_npc.pos[0]
-        dz = self.player.pos[2] - self.hr_npc.pos[2]
-        hr_distance = math.sqrt(dx*dx + dz*dz)
-        
-        # Check distance to CEO NPC
-        dx = self.player.pos[0] - self.ceo_npc.pos[0]
-        dz = self.player.pos[2] - self.ceo_npc.pos[2]
-        ceo_distance = math.sqrt(dx*dx + dz*dz)
-        
-        # Determine which NPC is nearby
-        if hr_distance < self.interaction_distance:
-            self.nearby_npc = "HR"
-        elif ceo_distance < self.interaction_distance:
-            self.nearby_npc = "CEO"
-        else:
-            self.nearby_npc = None
+        npc = self.npc_index.nearest(self.player.pos[0], self.player.pos[2], self.interaction_distance)
+        self.nearby_npc = npc.role if npc is not None else None
 
     def start_npc_conversation(self):
         """Start conversation with nearby NPC using TAB key"""
@@ -848,9 +1169,29 @@ class Game3D:
             self.current_npc = self.nearby_npc
             self.last_interaction_time = time.time()
 
-    def run(self):
+    def update(self, dt):
+        """Advance the simulation by one fixed timestep"""
+        # Handle keyboard input for movement
+        if not self.dialogue.active:
+            keys = pygame.key.get_pressed()
+            if keys[pygame.K_w]: self.player.move(0, -1, dt)
+            if keys[pygame.K_s]: self.player.move(0, 1, dt)
+            if keys[pygame.K_a]: self.player.move(-1, 0, dt)
+            if keys[pygame.K_d]: self.player.move(1, 0, dt)
+
+        # Check which NPC is nearby
+        self.check_nearby_npc()
+
+    def run(self, stats_path=FRAME_STATS_PATH):
         running = True
+        # Load speech and the OpenAI client while the title types out
+        self.dialogue.warm_up()
+        self.dialogue.prewarm_greetings()
+        self.scheduler.start()
         while running:
+            # Pace the frame and find out how much simulation time has passed
+            steps = self.scheduler.tick()
+
             if self.menu.active:
                 # Menu loop
                 for event in pygame.event.get():
@@ -867,6 +1208,7 @@ class Game3D:
                             running = False
                 
                 self.menu.render()
+                profiler.first_frame()
             else:
                 # Main game loop
                 for event in pygame.event.get():
@@ -886,6 +1228,8 @@ class Game3D:
                         elif event.key == pygame.K_TAB:
                             # Start conversation with nearby NPC
                             self.start_npc_conversation()
+                        elif event.key == pygame.K_F3:
+                            self.show_stats = not self.show_stats
                         
                         # Handle dialogue input
                         if self.dialogue.active:
@@ -894,115 +1238,146 @@ class Game3D:
                         x, y = event.rel
                         self.player.update_rotation(x, y)
 
-                # Handle keyboard input for movement
-                if not self.dialogue.active:
-                    keys = pygame.key.get_pressed()
-                    if keys[pygame.K_w]: self.player.move(0, -1)
-                    if keys[pygame.K_s]: self.player.move(0, 1)
-                    if keys[pygame.K_a]: self.player.move(-1, 0)
-                    if keys[pygame.K_d]: self.player.move(1, 0)
+                # Pick up NPC replies that finished in the background
+                self.dialogue.update()
 
-                # Check which NPC is nearby
-                self.check_nearby_npc()
+                # Fixed-timestep simulation, independent of the render rate
+                for _ in range(steps):
+                    self.update(self.scheduler.step)
 
-                # Clear the screen and depth buffer
-                glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+                self.render_frame()
+                present()
 
-                # Save the current matrix
-                glPushMatrix()
+        self.scheduler.stats.dump_json(stats_path)
+        print(f"[ResponseCache] {responses.stats()}")
+        print(f"[Memory] {self.dialogue.memory.stats()}")
+        if self.dialogue.speech.loaded:
+            print(f"[TTSCache] {self.dialogue.speech_system.tts_cache.stats()}")
+        pygame.quit()
+
+    def run_scripted(self, frames=300):
+        """Render a fixed walk through the office with no input, timing every frame
 
-                # Apply player rotation and position
-                glRotatef(self.player.rot[0], 1, 0, 0)
-                glRotatef(self.player.rot[1], 0, 1, 0)
-                glTranslatef(-self.player.pos[0], -self.player.pos[1], -self.player.pos[2])
+        The player turns a full circle while walking forward (sliding along whatever is in the
+        way), the frame-time overlay is on, and the dialogue box is open for the last third, so
+        the 3D scene and the 2D overlays are both in the timings. Returns the FrameStats.
+        """
+        stats = FrameStats(1000.0 / FPS, window=frames)
+        self.menu.active = False
+        self.show_stats = True
+        glLoadIdentity()  # The menu normally leaves the modelview clean for the game
+        for frame in range(frames):
+            start = time.perf_counter()
+            self.player.rot[1] = 360.0 * frame / frames
+            self.player.move(0, -1, 1.0 / FPS)
+            self.check_nearby_npc()
+            if frame == frames * 2 // 3:
+                self.dialogue.start_conversation(self.level.npcs[0][0] if self.level.npcs else "HR")
+            self.dialogue.update()
+            self.render_frame()
+            present()
+            profiler.first_frame()
+            stats.record((time.perf_counter() - start) * 1000)
+        self.dialogue.active = False
+        return stats
 
-                # Draw the world and NPCs
-                self.world.draw()
-                self.hr_npc.draw()
-                self.ceo_npc.draw()
+    def render_frame(self):
+        """Draw the 3D scene and the overlays on top of it"""
+        # Clear the screen and depth buffer
+        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
 
-                # Restore the matrix
-                glPopMatrix()
+        # Save the current matrix
+        glPushMatrix()
 
-                # Render dialogue system (if active)
-                self.dialogue.render()
+        # Apply player rotation and position
+        glRotatef(self.player.rot[0], 1, 0, 0)
+        glRotatef(self.player.rot[1], 0, 1, 0)
+        glTranslatef(-self.player.pos[0], -self.player.pos[1], -self.player.pos[2])
 
-                # Show interaction prompt if near an NPC
-                if self.nearby_npc and not self.dialogue.active:
-                    self.show_interaction_prompt()
+        # Draw the world and NPCs, skipping what the camera can't see
+        frustum = Frustum.from_camera(self.player.pos, self.player.rot, WINDOW_WIDTH / WINDOW_HEIGHT)
+        self.world.draw(frustum)
+        self.npc_renderer.draw(frustum)
 
-                # Swap the buffers
-                pygame.display.flip()
+        # Restore the matrix
+        glPopMatrix()
 
-                # Maintain 60 FPS
-                pygame.time.Clock().tick(60)
+        # Render dialogue system (if active)
+        self.dialogue.render()
 
-        pygame.quit()
+        # Show interaction prompt if near an NPC
+        if self.nearby_npc and not self.dialogue.active:
+            self.show_interaction_prompt()
+
+        if self.show_stats:
+            self.draw_stats_overlay()
+
+    def draw_stats_overlay(self):
+        """Frame-time statistics in the top-left corner (F3)"""
+        summary = self.scheduler.stats.summary()
+        fps = 1000.0 / summary["mean_ms"] if summary["mean_ms"] else 0.0
+        lines = [
+            f"FPS {fps:.0f}  mean {summary['mean_ms']:.1f} ms",
+            f"p50 {summary['p50_ms']:.1f}  p95 {summary['p95_ms']:.1f}  p99 {summary['p99_ms']:.1f} ms",
+            f"Dropped frames: {summary['dropped_frames']}",
+            f"Furniture drawn {self.world.drawn}  culled {self.world.culled}",
+            f"NPCs drawn {self.npc_renderer.drawn}  culled {self.npc_renderer.culled}",
+        ]
+        text = get_text_renderer(24)
+
+        begin_2d()
+        draw_panel(10, 10, 300, 10 + len(lines) * text.line_height, (0, 0, 0, 180))
+        for i, line in enumerate(lines):
+            text.draw(line, 20, 15 + i * text.line_height, (0, 255, 0))
+        end_2d()
 
     def show_interaction_prompt(self):
         """Show a prompt to press TAB when near an NPC"""
         if self.nearby_npc:
-            # Create a surface for the prompt
-            prompt_surface = pygame.Surface((WINDOW_WIDTH, 30), pygame.SRCALPHA)
-            prompt_surface.fill((0, 0, 0, 180))  # Semi-transparent black background
+            bar_height = 30
+            bar_y = WINDOW_HEIGHT - bar_height
+
+            begin_2d()
+
+            # Semi-transparent black bar at the bottom of the screen
+            draw_panel(0, bar_y, WINDOW_WIDTH, bar_height, (0, 0, 0, 180))
             
-            # Create the prompt text
-            font = pygame.font.Font(None, 24)
+            # Centered prompt text
+            text = get_text_renderer(24)
             prompt_text = f"Press TAB to talk to {self.nearby_npc}"
-            text_surface = font.render(prompt_text, True, (255, 255, 255))
-            
-            # Center the text
-            text_x = (WINDOW_WIDTH - text_surface.get_width()) // 2
-            text_y = (30 - text_surface.get_height()) // 2
-            
-            # Draw the text
-            prompt_surface.blit(text_surface, (text_x, text_y))
-            
-            # Convert to OpenGL texture and render
-            texture_data = pygame.image.tostring(prompt_surface, "RGBA", True)
-            
-            # Save current OpenGL state
-            glPushAttrib(GL_ALL_ATTRIB_BITS)
-            glMatrixMode(GL_PROJECTION)
-            glPushMatrix()
-            glLoadIdentity()
-            glOrtho(0, WINDOW_WIDTH, WINDOW_HEIGHT, 0, -1, 1)
-            glMatrixMode(GL_MODELVIEW)
-            glPushMatrix()
-            glLoadIdentity()
-            
-            # Setup for 2D rendering
-            glDisable(GL_DEPTH_TEST)
-            glEnable(GL_BLEND)
-            glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-            glEnable(GL_TEXTURE_2D)
-            
-            # Create and bind texture
-            texture = glGenTextures(1)
-            glBindTexture(GL_TEXTURE_2D, texture)
-            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-            glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, WINDOW_WIDTH, 30, 0, GL_RGBA, GL_UNSIGNED_BYTE, texture_data)
-            
-            # Draw the prompt at the bottom of the screen with corrected coordinates
-            glBegin(GL_QUADS)
-            glTexCoord2f(0, 1); glVertex2f(0, WINDOW_HEIGHT - 30)
-            glTexCoord2f(1, 1); glVertex2f(WINDOW_WIDTH, WINDOW_HEIGHT - 30)
-            glTexCoord2f(1, 0); glVertex2f(WINDOW_WIDTH, WINDOW_HEIGHT)
-            glTexCoord2f(0, 0); glVertex2f(0, WINDOW_HEIGHT)
-            glEnd()
-            
-            # Clean up
-            glDeleteTextures(1, [texture])
-            
-            # Restore OpenGL state
-            glMatrixMode(GL_PROJECTION)
-            glPopMatrix()
-            glMatrixMode(GL_MODELVIEW)
-            glPopMatrix()
-            glPopAttrib()
+            text_x = (WINDOW_WIDTH - text.measure(prompt_text)) // 2
+            text_y = bar_y + (bar_height - text.font.get_height()) // 2
+            text.draw(prompt_text, text_x, text_y, (255, 255, 255))
+
+            end_2d()
+
+def main(argv=None):
+    """Play the game, or with --headless render a scripted scene offscreen and report frame times"""
+    parser = argparse.ArgumentParser(description=TITLE)
+    parser.add_argument("--headless", action="store_true",
+                        help="render offscreen (EGL, or OSMesa with GAME_GL_BACKEND=osmesa) without a window")
+    parser.add_argument("--frames", type=int, default=300, help="frames of the scripted scene to render headless")
+    parser.add_argument("--level", help="tile map file to play instead of the built-in office")
+    parser.add_argument("--stats", default=FRAME_STATS_PATH, help="where to write the frame-time summary")
+    args = parser.parse_args(argv)
+    headless = args.headless or HEADLESS
+
+    load_api_key(required=not headless)
+    init_display(headless)
+    game = Game3D(load_level(args.level) if args.level else None)
+    if not headless:
+        game.run(args.stats)
+        return None
+
+    stats = game.run_scripted(args.frames)
+    summary = stats.summary()
+    print(f"[Headless] {summary['frames']} frames: mean {summary['mean_ms']:.2f} ms, p50 {summary['p50_ms']:.2f}, "
+          f"p95 {summary['p95_ms']:.2f}, p99 {summary['p99_ms']:.2f}, max {summary['max_ms']:.2f} ms")
+    stats.dump_json(args.stats)
+    pygame.quit()
+    return summary
 
 # Create and run game
-game = Game3D()
-game.run()
+if __name__ == "__main__":
+    main()
 
@@ -0,0 +1,52 @@
+# Shared setup for the benchmark scripts
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# Render offscreen unless GAME_HEADLESS=0 asks for a real window; the GL platform has to be
+# picked before any project module imports OpenGL
+HEADLESS = os.getenv('GAME_HEADLESS', '1') != '0'
+if HEADLESS:
+    os.environ['GAME_HEADLESS'] = '1'
+    import offscreen
+    offscreen.configure()
+
+
+def import_app():
+    """Import app.py and open its display (offscreen, see HEADLESS) without starting the game loop"""
+    os.environ.setdefault('OPENAI_API_KEY', 'benchmark')
+    import app
+    app.init_display(HEADLESS)
+    return app
+
+
+def time_frames(draw, frames=300, warmup=10):
+    """Call draw() once per frame and return the frame times in milliseconds"""
+    from OpenGL.GL import glClear, glFinish, GL_COLOR_BUFFER_BIT, GL_DEPTH_BUFFER_BIT
+
+    for _ in range(warmup):
+        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+        draw()
+    glFinish()
+
+    times = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+        draw()
+        glFinish()  # Include the GPU work, not just the Python-side submission
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def report(name, times):
+    """Print mean and percentile frame times for one benchmark case"""
+    ordered = sorted(times)
+    mean = sum(ordered) / len(ordered)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    print(f"{name:<32} mean {mean:8.3f} ms   p95 {p95:8.3f} ms   ({len(ordered)} frames)")
+    return mean
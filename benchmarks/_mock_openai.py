@@ -0,0 +1,149 @@
+# Local OpenAI-compatible HTTP server for benchmarks: no network, no API key,
+# and a configurable delay to stand in for a slow model
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+AUDIO_CHUNK_BYTES = 4800  # 100 ms of 24 kHz 16-bit mono PCM
+
+
+class MockOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real API
+    disable_nagle_algorithm = True  # Small streamed chunks go out immediately
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1  # One handler per TCP connection; keep-alive reuses it
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        with self.server.lock:
+            self.server.requests += 1
+            self.server.active += 1
+            self.server.peak_active = max(self.server.peak_active, self.server.active)
+            fail = self.server.fail_next > 0
+            if fail:
+                self.server.fail_next -= 1
+        try:
+            if fail:
+                self.send_unavailable()
+            else:
+                self.route(body)
+        finally:
+            with self.server.lock:
+                self.server.active -= 1
+
+    def send_unavailable(self):
+        payload = b'{"error": {"message": "overloaded", "type": "server_error"}}'
+        self.send_response(503)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def route(self, body):
+        if self.path.endswith("/chat/completions"):
+            self.chat_completion(body)
+        elif self.path.endswith("/audio/speech"):
+            self.speech(body)
+        else:
+            self.send_error(404)
+
+    def chat_completion(self, body):
+        if body.get("stream"):
+            self.stream_chat_completion(body)
+            return
+        time.sleep(self.server.delay)
+        reply = self.server.reply
+        payload = json.dumps({
+            "id": "chatcmpl-mock",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "mock"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": reply},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def stream_chat_completion(self, body):
+        """Server-sent events, one small token per chunk, after delay and token_delay"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        time.sleep(self.server.delay)
+        for token in tokenize(self.server.reply):
+            chunk = {
+                "id": "chatcmpl-mock",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": body.get("model", "mock"),
+                "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}],
+            }
+            self.write_chunk(f"data: {json.dumps(chunk)}\n\n".encode())
+            time.sleep(self.server.token_delay)
+        self.write_chunk(b"data: [DONE]\n\n")
+        self.write_chunk(b"")
+
+    def speech(self, body):
+        """The canned server.audio bytes, sent in chunks as if synthesized progressively"""
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        time.sleep(self.server.delay)
+        audio = self.server.audio
+        for i in range(0, len(audio), AUDIO_CHUNK_BYTES):
+            self.write_chunk(audio[i:i + AUDIO_CHUNK_BYTES])
+            time.sleep(self.server.audio_chunk_delay)
+        self.write_chunk(b"")
+
+    def write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+
+def tokenize(text):
+    """Split text roughly the way a model streams it, with the emotion tag spread over chunks"""
+    tokens = []
+    for i, word in enumerate(text.split(" ")):
+        word = word if i == 0 else " " + word
+        tokens += [word[j:j + 4] for j in range(0, len(word), 4)]
+    return tokens
+
+
+def start_mock_server(delay=0.0, reply="[EMOTION:friendly] Happy to help with that!", token_delay=0.0,
+                      audio=b"", audio_chunk_delay=0.0):
+    """Start the mock server on a free localhost port and return it (server.base_url)"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockOpenAIHandler)
+    server.daemon_threads = True
+    server.delay = delay
+    server.token_delay = token_delay
+    server.reply = reply
+    server.audio = audio  # Body of every /audio/speech response
+    server.audio_chunk_delay = audio_chunk_delay
+    server.requests = 0
+    server.connections = 0
+    server.active = 0  # Requests being handled right now
+    server.peak_active = 0
+    server.fail_next = 0  # Answer this many requests with 503 before succeeding again
+    server.lock = threading.Lock()
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,69 @@
+# Player collision against thousands of obstacles: sliding against every box in the level
+# vs only the boxes the grid broadphase finds around the move. Both must end in the same place.
+#
+#   python benchmarks/bench_collision.py [obstacles] [steps]
+import math
+import random
+import sys
+import time
+
+import _common  # noqa: F401 (puts the project root on sys.path)
+from bench_level_loader import office_map
+from collision import CollisionGrid, box_around, slide
+from level_loader import load_level
+
+RADIUS = 0.3
+STEP = 0.3  # Player movement per fixed step at full speed
+
+
+def build(obstacles, seed=5):
+    """Walls of a generated 128x128 office plus randomly placed desks, chairs and plants"""
+    rng = random.Random(seed)
+    level = load_level(office_map(128))
+    grid = CollisionGrid()
+    for box in level.wall_rects:
+        grid.add(box, "walls")
+    min_x, min_z, max_x, max_z = level.bounds()
+    for _ in range(obstacles):
+        half_x, half_z = rng.choice([(0.4, 0.3), (0.15, 0.15), (0.025, 0.5)])
+        grid.add(box_around(rng.uniform(min_x, max_x), rng.uniform(min_z, max_z), half_x, half_z,
+                            rng.choice([0, 90, -90])))
+    return level, grid
+
+
+def walk(move, start, steps, seed=6):
+    """Random walk with a new heading every 30 steps; returns the path"""
+    rng = random.Random(seed)
+    x, z = start
+    path = []
+    for i in range(steps):
+        if i % 30 == 0:
+            heading = rng.uniform(0, 2 * math.pi)
+        x, z = move(x, z, math.cos(heading) * STEP, math.sin(heading) * STEP)
+        path.append((x, z))
+    return path
+
+
+def main():
+    obstacles = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    steps = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    level, grid = build(obstacles)
+    all_boxes = list(grid.boxes.values())
+
+    start = time.perf_counter()
+    naive = walk(lambda x, z, dx, dz: slide(all_boxes, x, z, dx, dz, RADIUS), level.player_spawn, steps)
+    naive_us = (time.perf_counter() - start) * 1e6 / steps
+
+    start = time.perf_counter()
+    broad = walk(lambda x, z, dx, dz: grid.move_and_slide(x, z, dx, dz, RADIUS), level.player_spawn, steps)
+    grid_us = (time.perf_counter() - start) * 1e6 / steps
+
+    assert naive == broad, "broadphase and brute-force paths differ"
+    travelled = sum(math.dist(a, b) for a, b in zip(broad, broad[1:]))
+    print(f"{len(all_boxes)} boxes ({len(level.wall_rects)} walls), {steps} steps, {travelled:.0f} units walked")
+    print(f"Slide against every box   {naive_us:10.1f} us/step")
+    print(f"Grid broadphase           {grid_us:10.1f} us/step   ({naive_us / grid_us:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
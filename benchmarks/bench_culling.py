@@ -0,0 +1,49 @@
+# Frame time of a large office (generated map, furniture and NPCs in every room) drawn in
+# full every frame vs with frustum culling and distance LOD, from a camera turning on the spot.
+#
+#   python benchmarks/bench_culling.py [map_size] [frames]
+import sys
+
+from _common import import_app, time_frames, report
+from bench_level_loader import office_map
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 96
+    frames = int(sys.argv[2]) if len(sys.argv) > 2 else 120
+    app = import_app()
+    from OpenGL.GL import glLoadIdentity, glPushMatrix, glPopMatrix, glRotatef, glTranslatef
+    from culling import Frustum
+    from level_loader import load_level
+
+    game = app.Game3D(load_level(office_map(size)))
+    world, npcs, player = game.world, game.npc_renderer, game.player
+    # Crowd every room: one NPC per desk, plus a few standing around it
+    for x, z, _ in list(world.layout['desks']):
+        for dx, dz in ((1.5, 1.0), (1.5, -1.0), (2.5, 0.0)):
+            game.add_npc(app.NPC(x + dx, 0, z + dz, "HR"))
+    world.build_static_geometry()
+    print(f"{size}x{size} map: {len(world.objects)} pieces of furniture, {len(game.npcs)} NPCs")
+
+    def draw(culled):
+        def frame():
+            player.rot[1] = (player.rot[1] + 3) % 360  # Turn a full circle every 120 frames
+            glLoadIdentity()
+            glPushMatrix()
+            glRotatef(player.rot[0], 1, 0, 0)
+            glRotatef(player.rot[1], 0, 1, 0)
+            glTranslatef(-player.pos[0], -player.pos[1], -player.pos[2])
+            frustum = Frustum.from_camera(player.pos, player.rot, app.WINDOW_WIDTH / app.WINDOW_HEIGHT) if culled else None
+            world.draw(frustum)
+            npcs.draw(frustum)
+            glPopMatrix()
+        return frame
+
+    full = report("Everything, full detail", time_frames(draw(False), frames))
+    culled = report("Frustum culling + LOD", time_frames(draw(True), frames))
+    print(f"Last frame: furniture drawn {world.drawn} culled {world.culled}, NPCs drawn {npcs.drawn} culled {npcs.culled}")
+    print(f"Speedup: {full / culled:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
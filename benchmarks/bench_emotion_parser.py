@@ -0,0 +1,102 @@
+# Parsing emotion tags out of long streamed replies: rebuilding and rescanning the whole
+# reply on every chunk vs the incremental EmotionTagParser. Also checks where the tags fire.
+#
+#   python benchmarks/bench_emotion_parser.py [reply_chars]
+import random
+import sys
+import time
+
+import _common  # noqa: F401 (puts the project root on sys.path)
+from emotion_parser import EmotionTagParser
+
+EMOTIONS = ["happy", "sad", "angry", "excited", "calm", "friendly", "authoritative"]
+SENTENCE = "Our onboarding covers benefits, equipment and your first project. "
+
+
+def synthetic_reply(chars, tag_every=2000):
+    """A long reply opening with a tag, with another emotion change every tag_every characters"""
+    rng = random.Random(1)
+    parts = [f"[EMOTION:{rng.choice(EMOTIONS)}] "]
+    length = 0
+    while length < chars:
+        parts.append(SENTENCE)
+        length += len(SENTENCE)
+        if length % tag_every < len(SENTENCE):
+            parts.append(f"[EMOTION:{rng.choice(EMOTIONS)}] ")
+    return "".join(parts)
+
+
+def chunks(text, seed=2):
+    """Split text into 1-6 character pieces, the way a model streams tokens"""
+    rng = random.Random(seed)
+    pos = 0
+    while pos < len(text):
+        size = rng.randint(1, 6)
+        yield text[pos:pos + size]
+        pos += size
+
+
+def rescan(stream):
+    """The old approach: grow one string and look for the tag in all of it on every chunk"""
+    full_response = ""
+    emotion = None
+    text = ""
+    for content in stream:
+        full_response += content
+        if full_response.startswith("[EMOTION:"):
+            end_tag = full_response.find("]")
+            if end_tag != -1:
+                emotion = full_response[9:end_tag].lower()
+                text = full_response[end_tag + 1:].strip()
+        else:
+            text = full_response
+    return emotion, text
+
+
+def incremental(stream):
+    emotions = []
+    parser = EmotionTagParser(emotions.append)
+    for content in stream:
+        parser.feed(content)
+    parser.flush()
+    return emotions, parser.text()
+
+
+def timed(fn, pieces):
+    start = time.perf_counter()
+    result = fn(pieces)
+    return time.perf_counter() - start, result
+
+
+def main():
+    sizes = [int(sys.argv[1])] if len(sys.argv) > 1 else [2_000, 20_000, 200_000]
+
+    # Correctness: tags split at every possible point still fire, and never show as text
+    reply = "[EMOTION:happy] Welcome! [EMOTION:Calm] Take a seat.[EMOTION:sad] Bad [news] though."
+    for split in range(1, len(reply)):
+        emotions, text = incremental([reply[:split], reply[split:]])
+        assert emotions == ["happy", "calm", "sad"], (split, emotions)
+        assert text == "Welcome! Take a seat. Bad [news] though.", (split, text)
+    emotions, text = incremental(["[EMOTION:hap"])
+    assert emotions == [] and text == "[EMOTION:hap", text  # An unclosed tag is shown at the end
+
+    # Mid-stream: the first emotion is known after the tag's own chunks, not at the end
+    seen_at = []
+    parser = EmotionTagParser(lambda emotion: seen_at.append(len(parser.raw_parts)))
+    stream = list(chunks(synthetic_reply(20_000)))
+    for content in stream:
+        parser.feed(content)
+    print(f"First emotion after chunk {seen_at[0]} of {len(stream)}; {len(seen_at)} emotion changes in the reply")
+
+    print(f"{'reply chars':>12} {'chunks':>8} {'rescan ms':>10} {'parser ms':>10} {'speedup':>8}")
+    for size in sizes:
+        stream = list(chunks(synthetic_reply(size)))
+        old_time, _ = timed(rescan, stream)
+        new_time, (emotions, text) = timed(incremental, stream)
+        assert "[EMOTION:" not in text
+        print(f"{size:>12} {len(stream):>8} {old_time * 1000:>10.2f} {new_time * 1000:>10.2f} "
+              f"{old_time / new_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+# Render regression check: the game's scripted walk through the office, rendered offscreen
+# with no window or GPU required, failing if the p95 frame time goes over a budget.
+#
+#   python benchmarks/bench_headless.py [frames] [max_p95_ms] [level_file]
+import os
+import sys
+import tempfile
+
+import _common  # noqa: F401 (puts the project root on sys.path, picks the offscreen backend)
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    max_p95 = float(sys.argv[2]) if len(sys.argv) > 2 else None
+    stats_path = os.path.join(tempfile.gettempdir(), "frame_stats_headless.json")  # Keep the checkout clean
+    argv = ["--headless", "--frames", str(frames), "--stats", stats_path]
+    if len(sys.argv) > 3:
+        argv += ["--level", sys.argv[3]]
+    os.environ["GAME_HEADLESS"] = "1"
+    import app
+
+    summary = app.main(argv)
+    if max_p95 is not None and summary["p95_ms"] > max_p95:
+        print(f"FAIL: p95 {summary['p95_ms']:.2f} ms is over the {max_p95:.2f} ms budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# Level loading on large generated office maps: load time, and triangles drawn with
+# greedy-meshed walls and floor vs one quad per tile face.
+#
+#   python benchmarks/bench_level_loader.py [size ...]
+import random
+import sys
+import time
+
+import _common  # noqa: F401 (puts the project root on sys.path)
+from level_loader import WALL, load_level
+
+ROOM = 16  # Tiles per room side, including one wall
+
+
+def office_map(size, seed=4):
+    """A size x size floor plan: a grid of rooms with doorways, desks with NPCs and plants"""
+    rng = random.Random(seed)
+    grid = [["." for _ in range(size)] for _ in range(size)]
+    for r in range(size):
+        for c in range(size):
+            if r in (0, size - 1) or c in (0, size - 1) or r % ROOM == 0 or c % ROOM == 0:
+                grid[r][c] = WALL
+    # A two-tile doorway in every inner wall segment
+    for r in range(ROOM, size - 1, ROOM):
+        for c in range(ROOM // 2, size - 1, ROOM):
+            grid[r][c] = grid[r][c + 1] = "."
+    for c in range(ROOM, size - 1, ROOM):
+        for r in range(ROOM // 2, size - 1, ROOM):
+            grid[r][c] = grid[r + 1][c] = "."
+    for r0 in range(0, size - ROOM, ROOM):
+        for c0 in range(0, size - ROOM, ROOM):
+            grid[r0 + 3][c0 + 2] = rng.choice("HC")
+            grid[r0 + 1][c0 + 1] = "*"
+    grid[ROOM // 2][ROOM // 2] = "P"
+    return ["".join(row) for row in grid]
+
+
+def per_tile_triangles(rows):
+    """Triangles with one quad per floor tile, wall top and exposed wall side"""
+    depth, width = len(rows), len(rows[0])
+    quads = 0
+    for r in range(depth):
+        for c in range(width):
+            if rows[r][c] != WALL:
+                quads += 1
+                continue
+            quads += 1  # Top
+            for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+                rr, cc = r + dr, c + dc
+                if 0 <= rr < depth and 0 <= cc < width and rows[rr][cc] != WALL:
+                    quads += 1
+    return quads * 2
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [64, 128, 512]
+    print(f"{'map':>9} {'load ms':>9} {'per-tile tris':>14} {'greedy tris':>12} {'reduction':>10} {'NPCs':>6}")
+    for size in sizes:
+        rows = office_map(size)
+        start = time.perf_counter()
+        level = load_level(rows)
+        load_ms = (time.perf_counter() - start) * 1000
+        naive = per_tile_triangles(rows)
+        greedy = level.triangle_count()
+        print(f"{size:>4}x{size:<4} {load_ms:>9.1f} {naive:>14} {greedy:>12} {naive / greedy:>9.1f}x {len(level.npcs):>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# Integration check of the shared OpenAI client against the local mock API:
+# connections opened per request (a fresh client each call vs the pooled one),
+# the per-endpoint concurrency limit, and retries after server errors.
+#
+#   python benchmarks/bench_llm_client.py [requests]
+import os
+import sys
+import threading
+import time
+
+import _common  # noqa: F401 (puts the project root on sys.path)
+from _mock_openai import start_mock_server
+
+import openai
+import llm_client
+
+MESSAGES = [{"role": "user", "content": "Hello"}]
+
+
+def fresh_client_request():
+    """What every call used to do: build a client, then stream the reply"""
+    stream = openai.OpenAI().chat.completions.create(model="gpt-4", messages=MESSAGES, stream=True)
+    return "".join(chunk.choices[0].delta.content or "" for chunk in stream if chunk.choices)
+
+
+def pooled_request():
+    return "".join(llm_client.stream_chat(MESSAGES))
+
+
+def run(name, request, server, count):
+    connections_before = server.connections
+    start = time.perf_counter()
+    for _ in range(count):
+        request()
+    elapsed = (time.perf_counter() - start) * 1000
+    connections = server.connections - connections_before
+    print(f"{name:<14} {elapsed / count:7.2f} ms/request   {connections:3d} connections for {count} requests")
+    return connections
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    server = start_mock_server()
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    os.environ["OPENAI_API_KEY"] = "mock"
+
+    run("fresh client", fresh_client_request, server, count)
+    pooled = run("shared client", pooled_request, server, count)
+    assert pooled == 1, "keep-alive connection was not reused"
+
+    # A burst of concurrent streams is held to the chat endpoint's limit
+    server.token_delay = 0.005
+    server.peak_active = 0
+    threads = [threading.Thread(target=pooled_request) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    limit = llm_client.ENDPOINT_LIMITS["chat"]
+    print(f"16 concurrent streams: at most {server.peak_active} in flight (limit {limit})")
+    assert server.peak_active <= limit
+
+    # Two overloaded responses are retried with backoff before the reply comes through
+    server.token_delay = 0.0
+    server.fail_next = 2
+    requests_before = server.requests
+    start = time.perf_counter()
+    reply = pooled_request()
+    print(f"Retried after 2 x 503: {server.requests - requests_before} attempts, "
+          f"{(time.perf_counter() - start) * 1000:.0f} ms, reply {reply[:30]!r}")
+    assert reply and server.requests - requests_before == 3
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
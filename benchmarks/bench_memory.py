@@ -0,0 +1,56 @@
+# Prompt size per turn over a long conversation: sending the whole history
+# vs ConversationMemory's token-budgeted window with a rolling summary.
+#
+#   python benchmarks/bench_memory.py [turns]
+import sys
+import time
+
+import _common  # noqa: F401 (puts the project root on sys.path)
+from conversation_memory import ConversationMemory, MESSAGE_OVERHEAD, count_tokens, _encoding
+from llm_client import NPC_SYSTEM_PROMPT
+
+PLAYER_LINES = [
+    "What should I focus on during my first week here?",
+    "Who do I talk to about getting access to the code repositories?",
+    "Is there a budget for books or conference tickets?",
+    "How does the on-call rotation work for new engineers?",
+    "Can I work from home on Fridays?",
+]
+NPC_LINE = ("[EMOTION:friendly] Great question. Most people spend the first days setting up their "
+            "machine and meeting the team. After that you'll pair with a senior engineer on a small "
+            "ticket so you learn the deployment process end to end. Ask me anything else!")
+
+
+def naive_tokens(history, text):
+    messages = [NPC_SYSTEM_PROMPT] + [turn for _, turn in history] + [text]
+    return sum(count_tokens(message) + MESSAGE_OVERHEAD for message in messages)
+
+
+def main():
+    turns = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    memory = ConversationMemory()
+    history = []
+    checkpoints = {1, 5, 10, 25, 50, 100, 200, 500, turns}
+    build_times = []
+
+    print(f"Tokenizer: {'tiktoken' if _encoding is not None else 'about 4 characters per token'}, "
+          f"budget {memory.token_budget} tokens")
+    print(f"{'turn':>6}{'full history':>16}{'memory':>10}")
+    for turn in range(1, turns + 1):
+        text = PLAYER_LINES[turn % len(PLAYER_LINES)]
+        full = naive_tokens(history, text)
+        start = time.perf_counter()
+        _, tokens = memory.build_messages("HR", NPC_SYSTEM_PROMPT, text)
+        build_times.append((time.perf_counter() - start) * 1000)
+        memory.add("HR", "Player", text)
+        memory.add("HR", "NPC", NPC_LINE)
+        history += [("Player", text), ("NPC", NPC_LINE)]
+        if turn in checkpoints:
+            print(f"{turn:6d}{full:16d}{tokens:10d}")
+
+    print(f"Prompt assembly: mean {sum(build_times) / turns:.3f} ms, max {max(build_times):.3f} ms")
+    print(f"Stats: {memory.stats()['HR']}")
+
+
+if __name__ == "__main__":
+    main()
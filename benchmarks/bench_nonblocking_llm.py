@@ -0,0 +1,56 @@
+# Frame times while an NPC reply is pending, against a deliberately slow local
+# mock of the OpenAI API. Exits non-zero if the game loop stalls.
+#
+#   python benchmarks/bench_nonblocking_llm.py [delay_seconds]
+import os
+import sys
+import time
+
+from _common import import_app, report
+from _mock_openai import start_mock_server
+
+FRAME_BUDGET = 1 / 60
+MAX_FRAME_MS = 50  # Generous bound; a blocking request would stall for the whole delay
+
+
+def main():
+    delay = float(sys.argv[1]) if len(sys.argv) > 1 else 2.0
+    server = start_mock_server(delay=delay)
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    os.environ["OPENAI_API_KEY"] = "mock"
+
+    app = import_app()
+    from OpenGL.GL import glFinish
+
+    dialogue = app.DialogueSystem()
+    dialogue.start_conversation("HR")
+    dialogue.render()  # Warm up the overlay so the first measured frame isn't its initial draw
+    dialogue.user_input = "What are the office hours?"
+
+    start = time.perf_counter()
+    dialogue.send_message()
+    times = []
+    while dialogue.executor.is_busy() and time.perf_counter() - start < delay + 10:
+        frame_start = time.perf_counter()
+        dialogue.update()
+        dialogue.render()
+        glFinish()
+        frame = time.perf_counter() - frame_start
+        times.append(frame * 1000)
+        time.sleep(max(0.0, FRAME_BUDGET - frame))
+
+    elapsed = time.perf_counter() - start
+    report("Frames while NPC is thinking", times)
+    print(f"Reply after {elapsed:.2f} s: {dialogue.conversation_history[-1]}")
+
+    if dialogue.conversation_history[-1][0] != "NPC":
+        print("FAIL: no reply arrived")
+        sys.exit(1)
+    if max(times) > MAX_FRAME_MS:
+        print(f"FAIL: slowest frame took {max(times):.1f} ms")
+        sys.exit(1)
+    print(f"OK: slowest frame {max(times):.1f} ms during a {delay:.1f} s request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+# Frame-time benchmark: per-object NPC.draw loop vs the batched NPCRenderer
+#
+#   python benchmarks/bench_npcs.py [frames]
+import sys
+
+from _common import import_app, time_frames, report
+
+
+def make_crowd(app, count):
+    """Lay out count NPCs on a square grid in front of the camera"""
+    side = int(count ** 0.5) + 1
+    return [
+        app.NPC((i % side - side / 2) * 0.8, 0, -(i // side) * 0.8, "HR" if i % 2 else "CEO")
+        for i in range(count)
+    ]
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    app = import_app()
+    from OpenGL.GL import glLoadIdentity, glTranslatef, glEnable, GL_COLOR_MATERIAL
+
+    from npc_renderer import NPCRenderer
+
+    glEnable(GL_COLOR_MATERIAL)
+    for count in (10, 100, 1000):
+        npcs = make_crowd(app, count)
+        glLoadIdentity()
+        glTranslatef(0, -1.5, -8)
+
+        def draw_loop():
+            for npc in npcs:
+                npc.draw()
+
+        renderer = NPCRenderer()
+        renderer.set_npcs(npcs)
+
+        loop = report(f"NPC.draw loop ({count})", time_frames(draw_loop, frames))
+        batched = report(f"NPCRenderer ({count})", time_frames(renderer.draw, frames))
+        print(f"Speedup at {count} NPCs: {loop / batched:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
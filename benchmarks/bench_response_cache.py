@@ -0,0 +1,64 @@
+# Reply latency for a player asking the same few questions over a long conversation,
+# some of them paraphrased, with and without the response cache. Runs the dialogue
+# box against the local mock API.
+#
+#   python benchmarks/bench_response_cache.py [delay]
+import os
+import random
+import sys
+import time
+
+from _common import import_app
+from _mock_openai import start_mock_server
+
+from response_cache import ResponseCache
+
+QUESTIONS = [
+    ["What are the company benefits?", "what are the company benefits", "What are the benefits at the company?"],
+    ["When is payday?", "When is pay day?", "when is payday??"],
+    ["How do I request time off?", "How can I request time off?", "how do i request time-off"],
+    ["Who is my manager?", "Who's my manager?", "who is my manager"],
+    ["Where do I pick up my laptop?", "Where can I pick up my laptop?", "where do i pick up a laptop"],
+]
+
+
+def ask(dialogue, question):
+    """Ask one question and return the seconds until the full reply is shown
+
+    The NPC keeps its memory of the whole session, as in the game, so a hit has to come from
+    the question alone rather than from a conversation that happens to repeat.
+    """
+    dialogue.user_input = question
+    start = time.perf_counter()
+    dialogue.send_message()
+    while dialogue.executor.is_busy() or dialogue.thinking:
+        dialogue.update()
+        time.sleep(0.001)
+    return time.perf_counter() - start
+
+
+def main():
+    delay = float(sys.argv[1]) if len(sys.argv) > 1 else 0.5
+    server = start_mock_server(delay=delay, token_delay=0.005)
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    os.environ["OPENAI_API_KEY"] = "mock"
+
+    app = import_app()
+    random.seed(1)
+    session = [random.choice(random.choice(QUESTIONS)) for _ in range(40)]
+
+    for name, enabled, fuzzy in [("no cache", False, False), ("exact", True, False), ("exact + fuzzy", True, True)]:
+        cache = app.responses = ResponseCache(max_entries=256 if enabled else 0, fuzzy=fuzzy)
+        dialogue = app.DialogueSystem()
+        dialogue.start_conversation("HR")
+        requests_before = server.requests
+        times = [ask(dialogue, question) for question in session]
+        stats = cache.stats()
+        print(f"{name:<14} mean {sum(times) / len(times) * 1000:7.1f} ms   "
+              f"{server.requests - requests_before:2d} requests   "
+              f"exact {stats['exact_hit_rate']:5.1%}   fuzzy {stats['fuzzy_hit_rate']:5.1%}   "
+              f"saved {stats['latency_saved_s']:5.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# NPC proximity queries with 10k NPCs: the per-NPC distance loop check_nearby_npc used
+# vs the SpatialHash grid, plus the NumPy bulk query and the cost of moving NPCs.
+#
+#   python benchmarks/bench_spatial_index.py [npcs] [queries]
+import math
+import random
+import sys
+import time
+
+import _common  # noqa: F401 (puts the project root on sys.path)
+from spatial_index import SpatialHash
+
+INTERACTION_DISTANCE = 2.0
+
+
+class Agent:
+    def __init__(self, x, z):
+        self.pos = [x, 0.65, z]
+
+
+def linear_nearest(npcs, x, z, max_distance):
+    """Distance to every NPC with math.sqrt, as check_nearby_npc did per NPC"""
+    best, best_distance = None, max_distance
+    for npc in npcs:
+        dx = x - npc.pos[0]
+        dz = z - npc.pos[2]
+        distance = math.sqrt(dx * dx + dz * dz)
+        if distance < best_distance:
+            best, best_distance = npc, distance
+    return best
+
+
+def per_query_ms(fn, queries):
+    start = time.perf_counter()
+    results = [fn(x, z) for x, z in queries]
+    return (time.perf_counter() - start) * 1000 / len(queries), results
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    query_count = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+    rng = random.Random(3)
+    side = math.sqrt(count) * 1.5  # About one NPC per 2.25 square units of floor
+    npcs = [Agent(rng.uniform(0, side), rng.uniform(0, side)) for _ in range(count)]
+    queries = [(rng.uniform(0, side), rng.uniform(0, side)) for _ in range(query_count)]
+
+    start = time.perf_counter()
+    index = SpatialHash(cell_size=INTERACTION_DISTANCE)
+    for npc in npcs:
+        index.insert(npc, npc.pos[0], npc.pos[2])
+    build_ms = (time.perf_counter() - start) * 1000
+
+    linear, expected = per_query_ms(lambda x, z: linear_nearest(npcs, x, z, INTERACTION_DISTANCE), queries)
+    grid, found = per_query_ms(lambda x, z: index.nearest(x, z, INTERACTION_DISTANCE), queries)
+    assert found == expected, "grid and linear scan disagree"
+    radius, _ = per_query_ms(lambda x, z: index.query_radius(x, z, 5.0), queries)
+
+    start = time.perf_counter()
+    bulk = index.nearest_many(queries, INTERACTION_DISTANCE)
+    bulk_ms = (time.perf_counter() - start) * 1000 / len(queries)
+    assert bulk == expected, "bulk query and linear scan disagree"
+
+    moves = [(npc, npc.pos[0] + rng.uniform(-0.1, 0.1), npc.pos[2] + rng.uniform(-0.1, 0.1)) for npc in npcs]
+    start = time.perf_counter()
+    for npc, x, z in moves:
+        index.move(npc, x, z)
+    move_us = (time.perf_counter() - start) * 1e6 / len(moves)
+
+    print(f"{count} NPCs, {query_count} queries, index built in {build_ms:.1f} ms")
+    print(f"Linear scan nearest      {linear * 1000:10.1f} us/query")
+    print(f"SpatialHash.nearest      {grid * 1000:10.1f} us/query   ({linear / grid:.0f}x)")
+    print(f"SpatialHash radius 5.0   {radius * 1000:10.1f} us/query")
+    print(f"nearest_many (NumPy)     {bulk_ms * 1000:10.1f} us/query   ({linear / bulk_ms:.0f}x)")
+    print(f"SpatialHash.move         {move_us:10.2f} us/NPC")
+
+
+if __name__ == "__main__":
+    main()
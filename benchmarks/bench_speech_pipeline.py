@@ -0,0 +1,106 @@
+# Time to first spoken audio for a voice reply: the old sequential path (STT, full
+# completion, TTS of the whole reply, play) vs SpeechPipeline, which synthesizes
+# sentences while the completion is still streaming. All stages are mocked with
+# sleeps; times are scaled down by the optional argument to keep the run short.
+#
+#   python benchmarks/bench_speech_pipeline.py [time_scale]
+import asyncio
+import sys
+import threading
+import time
+
+import numpy as np
+
+import _common  # noqa: F401 (puts the project root on sys.path)
+from speech_system import SpeechPipeline
+
+REPLY = (
+    "Welcome to the company, it's great to have you here. "
+    "Your first week is mostly onboarding and meeting the team. "
+    "On Monday you will pick up your laptop and badge from IT. "
+    "Tuesday is benefits enrollment, so bring your questions. "
+    "After that you will shadow a senior engineer on a real project. "
+    "Let me know if anything is unclear!"
+)
+
+SAMPLERATE = 1000  # Mock audio only needs a length, not real fidelity
+STT_SECONDS = 0.3
+FIRST_TOKEN_SECONDS = 0.5
+TOKEN_SECONDS = 0.03  # Per 4-character token
+TTS_BASE_SECONDS = 0.25  # Per request
+TTS_CHAR_SECONDS = 0.003
+SPEECH_CHAR_SECONDS = 0.06  # Playback length of spoken text
+
+
+class MockPlayer:
+    """Tracks a real-time playback timeline instead of driving a sound device"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = None
+        self.end = None
+        self.gaps = 0.0  # Silence between segments while waiting on synthesis
+
+    def enqueue(self, data, samplerate):
+        now = time.perf_counter()
+        with self.lock:
+            if self.started is None:
+                self.started = now
+                self.end = now
+            elif now > self.end:
+                self.gaps += now - self.end
+            self.end = max(self.end, now) + len(data) / samplerate
+
+    def wait(self):
+        remaining = self.end - time.perf_counter()
+        if remaining > 0:
+            time.sleep(remaining)
+
+
+def main():
+    scale = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+
+    def stt():
+        time.sleep(STT_SECONDS * scale)
+        return "Tell me about my first week"
+
+    def llm_tokens():
+        time.sleep(FIRST_TOKEN_SECONDS * scale)
+        for i in range(0, len(REPLY), 4):
+            yield REPLY[i:i + 4]
+            time.sleep(TOKEN_SECONDS * scale)
+
+    def synthesize(text):
+        time.sleep((TTS_BASE_SECONDS + TTS_CHAR_SECONDS * len(text)) * scale)
+        yield np.zeros(int(len(text) * SPEECH_CHAR_SECONDS * scale * SAMPLERATE), dtype=np.float32), SAMPLERATE
+
+    # Sequential: every stage waits for the previous one to finish
+    player = MockPlayer()
+    start = time.perf_counter()
+    stt()
+    reply = "".join(llm_tokens())
+    for chunk in synthesize(reply):
+        player.enqueue(*chunk)
+    sequential_first = player.started - start
+    player.wait()
+    sequential_total = time.perf_counter() - start
+
+    # Pipelined: sentences are synthesized and queued while the reply streams in
+    player = MockPlayer()
+    start = time.perf_counter()
+    stt()
+    pipeline = SpeechPipeline(synthesize, player, max_parallel=2)
+    asyncio.run(pipeline.run(llm_tokens()))
+    pipelined_first = player.started - start
+    pipelined_total = time.perf_counter() - start
+
+    print(f"Sentences: {len(pipeline.sentences)}   time scale: {scale}")
+    print(f"{'':<12}{'first audio':>14}{'finished':>14}")
+    print(f"{'sequential':<12}{sequential_first * 1000:11.0f} ms{sequential_total * 1000:11.0f} ms")
+    print(f"{'pipelined':<12}{pipelined_first * 1000:11.0f} ms{pipelined_total * 1000:11.0f} ms")
+    print(f"Speedup to first audio: {sequential_first / pipelined_first:.1f}x   "
+          f"gaps between sentences: {player.gaps * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# Dispatch latency from the end of an utterance to the start of its processing:
+# the old 100 ms polling thread with asyncio.run per utterance vs the
+# long-lived speech worker. Also toggles listening on and off rapidly, and
+# back on while the stopped listener is closing the microphone, and asserts
+# exactly one listener thread is left. The microphone is replaced by a silent stand-in
+# and utterances are handed over at fixed intervals, as the listener does at
+# the end of speech.
+#
+#   python benchmarks/bench_speech_worker.py [utterances]
+import asyncio
+import queue
+import sys
+import threading
+import time
+import types
+
+import _common  # noqa: F401 (puts the project root on sys.path)
+from speech_system import SpeechSystem
+
+INTERVAL = 0.25  # Seconds between utterances
+CLOSE_DELAY = 0.3  # Seconds the stand-in microphone takes to close, like a real audio device
+
+
+class SilentInputStream:
+    """sounddevice.RawInputStream stand-in that never delivers a frame"""
+    closing = threading.Event()  # Set while a stream is closing
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        SilentInputStream.closing.set()
+        time.sleep(CLOSE_DELAY)
+        SilentInputStream.closing.clear()
+        return False
+
+
+class Utterance:
+    def __init__(self):
+        self.captured = time.perf_counter()
+
+
+def produce(submit, count):
+    """One finished utterance every INTERVAL"""
+    for _ in range(count):
+        time.sleep(INTERVAL)
+        submit(Utterance())
+
+
+def polling_dispatch(count):
+    """The previous design: poll the queue every 100 ms and asyncio.run each utterance"""
+    audio_queue = queue.Queue()
+    delays = []
+
+    async def process(audio):
+        delays.append(time.perf_counter() - audio.captured)
+
+    def poll():
+        while len(delays) < count:
+            if not audio_queue.empty():
+                asyncio.run(process(audio_queue.get()))
+            time.sleep(0.1)
+
+    thread = threading.Thread(target=poll)
+    thread.start()
+    produce(audio_queue.put, count)
+    thread.join()
+    return delays
+
+
+def worker_dispatch(count):
+    speech = SpeechSystem()
+    delays = []
+
+    async def process(audio):
+        delays.append(time.perf_counter() - audio.captured)
+    speech.process_speech = process
+
+    speech.start_listening()
+    produce(speech._submit_utterance, count)
+    while len(delays) < count:
+        time.sleep(0.01)
+    speech.stop_listening()
+    return speech, delays
+
+
+def report(name, delays):
+    delays = sorted(d * 1000 for d in delays)
+    print(f"{name:<10} mean {sum(delays) / len(delays):6.1f} ms   max {delays[-1]:6.1f} ms")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    # speech_system imports sounddevice when the microphone opens, so no PortAudio is needed
+    sys.modules["sounddevice"] = types.SimpleNamespace(RawInputStream=SilentInputStream)
+
+    print(f"Dispatch latency over {count} utterances")
+    report("polling", polling_dispatch(count))
+    speech, delays = worker_dispatch(count)
+    report("worker", delays)
+
+    # Shift+T mashed: listening toggled 50 times in quick succession
+    for _ in range(50):
+        speech.start_listening()
+        speech.stop_listening()
+    speech.start_listening()
+    time.sleep(0.1)
+    listeners = sum(thread.name == "speech-listener" for thread in threading.enumerate())
+    print(f"Listener threads after 50 toggles: {listeners}")
+
+    # Turned back on while the stopped listener is still closing the microphone: that
+    # listener has to carry on, leaving exactly one
+    speech.stop_listening()
+    SilentInputStream.closing.wait(timeout=2)  # It notices the stop within one 0.5 s frame timeout
+    speech.start_listening()
+    time.sleep(0.5 + 2 * CLOSE_DELAY)
+    listeners = sum(thread.name == "speech-listener" for thread in threading.enumerate())
+    print(f"Listener threads after restarting during shutdown: {listeners}")
+    assert speech.is_listening and listeners == 1, "listening is on but not exactly one listener is running"
+    speech.stop_listening()
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+# Time to first frame of a fresh game process, with speech, audio and OpenAI loaded lazily vs
+# eagerly at startup (GAME_EAGER_LOAD=1), plus the per-subsystem startup report of the last run.
+# Each run renders one headless frame, so no window or GPU is needed.
+#
+#   python benchmarks/bench_startup.py [runs]
+import os
+import re
+import subprocess
+import sys
+import time
+
+from _common import ROOT
+
+FIRST_FRAME = re.compile(r"\[Startup\] First frame after (\d+) ms")
+
+
+def launch(eager):
+    """Start app.py headless for one frame; returns (ms to first frame, wall ms, startup report)"""
+    env = dict(os.environ, GAME_HEADLESS="1", GAME_EAGER_LOAD="1" if eager else "0")
+    env.setdefault("OPENAI_API_KEY", "benchmark")
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, os.path.join(ROOT, "app.py"), "--headless", "--frames", "1",
+                             "--stats", os.devnull], cwd=ROOT, env=env, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - start) * 1000
+    match = FIRST_FRAME.search(result.stdout)
+    if result.returncode or not match:
+        print(result.stdout + result.stderr)
+        sys.exit(1)
+    report = [line for line in result.stdout.splitlines() if line.startswith("[Startup]")]
+    return int(match.group(1)), wall_ms, report
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    for name, eager in (("Eager (everything at startup)", True), ("Lazy (speech on first use)", False)):
+        results = [launch(eager) for _ in range(runs)]
+        first = sorted(r[0] for r in results)[runs // 2]
+        wall = sorted(r[1] for r in results)[runs // 2]
+        print(f"{name:<32} first frame {first:6d} ms   process {wall:7.0f} ms   (median of {runs})")
+        for line in results[-1][2]:
+            if "failed to load" in line:
+                print(f"  {line} (not included in the time)")
+    print("\n".join(results[-1][2]))
+
+
+if __name__ == "__main__":
+    main()
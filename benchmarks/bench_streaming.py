@@ -0,0 +1,52 @@
+# Time to first visible NPC token vs time to the full reply, against a local
+# mock of the OpenAI API that streams a long reply token by token.
+#
+#   python benchmarks/bench_streaming.py [first_token_delay] [token_delay]
+import os
+import sys
+import time
+
+from _common import import_app
+from _mock_openai import start_mock_server
+
+REPLY = "[EMOTION:happy] " + " ".join(
+    ["Welcome aboard! Our onboarding covers benefits, equipment and your first project."] * 6
+)
+
+
+def main():
+    first_token_delay = float(sys.argv[1]) if len(sys.argv) > 1 else 0.3
+    token_delay = float(sys.argv[2]) if len(sys.argv) > 2 else 0.02
+    server = start_mock_server(delay=first_token_delay, reply=REPLY, token_delay=token_delay)
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    os.environ["OPENAI_API_KEY"] = "mock"
+
+    app = import_app()
+    import llm_client
+    llm_client.get_client()  # Import openai and build the client first, as the menu warm-up does in game
+    dialogue = app.DialogueSystem()
+    dialogue.start_conversation("HR")
+    dialogue.user_input = "Tell me about onboarding"
+
+    start = time.perf_counter()
+    dialogue.send_message()
+    first_visible = None
+    while time.perf_counter() - start < 60:
+        dialogue.update()
+        dialogue.render()
+        role, text = dialogue.conversation_history[-1]
+        if first_visible is None and role == "NPC":
+            first_visible = time.perf_counter() - start
+        if not dialogue.executor.is_busy():
+            break
+        time.sleep(1 / 60)
+    total = time.perf_counter() - start
+
+    print(f"Time to first visible token: {first_visible * 1000:8.1f} ms")
+    print(f"Time to full reply:          {total * 1000:8.1f} ms")
+    print(f"Emotion parsed: {dialogue.current_emotion}")
+    print(f"Reply shown: {dialogue.conversation_history[-1][1][:60]}...")
+
+
+if __name__ == "__main__":
+    main()
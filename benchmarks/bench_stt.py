@@ -0,0 +1,73 @@
+# Speech-to-text backends on recorded WAV fixtures: real-time factor, time to the
+# first partial transcript and end-of-speech-to-text latency (the time final()
+# takes after the last frame). Vosk needs `pip install vosk` and a model in
+# VOSK_MODEL_PATH; Google needs network access.
+#
+#   python benchmarks/bench_stt.py [--backends vosk,google] [--realtime] file.wav [...]
+import argparse
+import time
+
+import _common  # noqa: F401 (puts the project root on sys.path)
+from stt_backends import BACKENDS, FRAME_MS, SAMPLE_RATE, iter_frames, read_wav
+
+
+def run(backend, pcm, realtime):
+    session = backend.session()
+    start = time.perf_counter()
+    first_partial = None
+    endpoint = None
+    for i, frame in enumerate(iter_frames(pcm)):
+        if realtime:
+            # Frames arrive no faster than a microphone delivers them
+            delay = start + i * FRAME_MS / 1000 - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        ended = session.accept(frame)
+        if first_partial is None and session.partial():
+            first_partial = time.perf_counter() - start
+        if ended and endpoint is None:
+            endpoint = time.perf_counter() - start
+    fed = time.perf_counter()
+    text = session.final()
+    done = time.perf_counter()
+    return {
+        "text": text,
+        "processing": fed - start,
+        "first_partial": first_partial,
+        "endpoint": endpoint,
+        "finalize": done - fed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("wavs", nargs="+")
+    parser.add_argument("--backends", default="vosk,google")
+    parser.add_argument("--realtime", action="store_true", help="feed frames at microphone speed")
+    args = parser.parse_args()
+
+    backends = []
+    for name in args.backends.split(","):
+        try:
+            backends.append(BACKENDS[name]())
+        except RuntimeError as e:
+            print(f"Skipping {name}: {e}")
+
+    for path in args.wavs:
+        pcm = read_wav(path)
+        seconds = len(pcm) / 2 / SAMPLE_RATE
+        print(f"\n{path} ({seconds:.1f} s)")
+        for backend in backends:
+            try:
+                result = run(backend, pcm, args.realtime)
+            except Exception as e:  # e.g. Google without network access
+                print(f"  {backend.name:<8} failed: {e}")
+                continue
+            partial = f"{result['first_partial'] * 1000:6.0f} ms" if result["first_partial"] is not None else "     -   "
+            print(f"  {backend.name:<8} RTF {result['processing'] / seconds:5.2f}   first partial {partial}   "
+                  f"end-of-speech to text {result['finalize'] * 1000:6.0f} ms")
+            print(f"  {'':<8} {result['text']!r}")
+
+
+if __name__ == "__main__":
+    main()
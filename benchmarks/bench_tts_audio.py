@@ -0,0 +1,87 @@
+# Time until the first audio of an utterance is ready to play: the old temp-file
+# round trip, in-memory decoding of the complete file, and streamed PCM chunks.
+# Canned audio is served by the local mock API, trickled out the way a TTS
+# service synthesizes it.
+#
+#   python benchmarks/bench_tts_audio.py [seconds_of_audio] [runs]
+import io
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import soundfile as sf
+
+import _common  # noqa: F401 (puts the project root on sys.path)
+from _mock_openai import start_mock_server
+
+import openai
+from speech_system import SpeechSystem, TTS_SAMPLERATE
+from tts_cache import TTSCache
+
+CHUNK_DELAY = 0.02  # Server time per 100 ms chunk, i.e. synthesis 5x faster than real time
+
+
+def canned_audio(seconds):
+    t = np.arange(int(seconds * TTS_SAMPLERATE)) / TTS_SAMPLERATE
+    samples = (np.sin(2 * np.pi * 220 * t) * 0.3 * 32767).astype("<i2")
+    wav = io.BytesIO()
+    sf.write(wav, samples, TTS_SAMPLERATE, format="WAV", subtype="PCM_16")
+    return samples.tobytes(), wav.getvalue()
+
+
+def temp_file_round_trip(text):
+    """The previous _text_to_speech path: download, write a temp file, read it back"""
+    response = openai.OpenAI().audio.speech.create(model="tts-1", voice="alloy", input=text)
+    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
+        temp_file.write(response.content)
+        temp_file_path = temp_file.name
+    data, samplerate = sf.read(temp_file_path)
+    os.unlink(temp_file_path)
+    yield data, samplerate
+
+
+def measure(synthesize, runs):
+    first, total = [], []
+    for run in range(runs):
+        start = time.perf_counter()
+        first_chunk = None
+        for _ in synthesize(f"Hello number {run}"):  # A new line each time, so nothing is cached
+            if first_chunk is None:
+                first_chunk = time.perf_counter() - start
+        first.append(first_chunk * 1000)
+        total.append((time.perf_counter() - start) * 1000)
+    return sum(first) / runs, sum(total) / runs
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 4.0
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    pcm, wav = canned_audio(seconds)
+
+    server = start_mock_server(audio_chunk_delay=CHUNK_DELAY)
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    os.environ["OPENAI_API_KEY"] = "mock"
+    speech = SpeechSystem()
+    speech.tts_cache = TTSCache(tempfile.mkdtemp())  # Keep the project's cache out of it
+
+    print(f"{seconds:.1f} s utterance, {runs} runs each")
+    print(f"{'':<22}{'first audio':>14}{'complete':>14}")
+
+    server.audio = wav
+    cases = [("temp file (wav)", temp_file_round_trip)]
+    speech.tts_format = "wav"
+    cases.append(("in-memory (wav)", speech._synthesize))
+    for name, synthesize in cases:
+        first, total = measure(synthesize, runs)
+        print(f"{name:<22}{first:11.1f} ms{total:11.1f} ms")
+
+    server.audio = pcm
+    speech.tts_format = "pcm"
+    first, total = measure(speech._synthesize, runs)
+    print(f"{'streamed (pcm)':<22}{first:11.1f} ms{total:11.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# Greeting playback with the TTS cache: cold requests vs cache hits, counted
+# against the local mock API, plus the LRU size cap holding under churn.
+#
+#   python benchmarks/bench_tts_cache.py [plays]
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import _common  # noqa: F401 (puts the project root on sys.path)
+from _mock_openai import start_mock_server
+
+from speech_system import SentenceSplitter, SpeechSystem
+from tts_cache import TTSCache
+
+GREETINGS = [
+    ("Hello! I'm the HR. How can I help you today?", "nova", 1.0),
+    ("Hello! I'm the CEO. How can I help you today?", "onyx", 0.9),
+]
+
+
+def play(speech, text, voice, speed):
+    """Fetch every chunk of a line, split into sentences the way SpeechPipeline does"""
+    start = time.perf_counter()
+    splitter = SentenceSplitter()
+    for sentence in filter(None, splitter.feed(text) + [splitter.flush()]):
+        for _ in speech._synthesize(sentence, voice, speed):
+            pass
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    plays = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    audio = (np.sin(np.arange(48000) / 10) * 8000).astype("<i2").tobytes()  # 2 s of 24 kHz PCM
+    server = start_mock_server(delay=0.2, audio=audio, audio_chunk_delay=0.01)
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    os.environ["OPENAI_API_KEY"] = "mock"
+
+    with tempfile.TemporaryDirectory() as directory:
+        speech = SpeechSystem()
+        speech.tts_cache = TTSCache(directory)
+
+        start = time.perf_counter()
+        speech.prewarm(GREETINGS)
+        print(f"Prewarm: {(time.perf_counter() - start) * 1000:.0f} ms, {server.requests} requests")
+        speech.prewarm(GREETINGS)
+        print(f"Second prewarm: {server.requests} requests in total")
+
+        requests_before = server.requests
+        times = [play(speech, *GREETINGS[i % len(GREETINGS)]) for i in range(plays)]
+        print(f"{plays} greetings from the cache: mean {sum(times) / plays:.2f} ms, "
+              f"{server.requests - requests_before} requests")
+
+        cold = play(speech, "A line nobody has said before.", "alloy", 1.0)
+        print(f"Uncached line: {cold:.0f} ms, 1 request")
+        print(f"Stats: {speech.tts_cache.stats()}")
+
+        # Churn through more audio than the cap allows
+        cache = TTSCache(os.path.join(directory, "churn"), max_bytes=10 * len(audio))
+        for i in range(50):
+            cache.put(TTSCache.key(f"line {i}", "alloy", 1.0, "tts-1", "pcm"), audio)
+        files = len(os.listdir(cache.directory))
+        print(f"LRU cap {cache.max_bytes} bytes: size {cache.size}, {files} files, {cache.evictions} evictions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# Replays audio through the VAD end-pointer and reports, per utterance, how long
+# after the speech really started/ended the START/END events fire. Without WAV
+# arguments it uses a synthetic fixture with known utterance boundaries; for WAV
+# files the boundaries are estimated offline from smoothed energy.
+#
+#   python benchmarks/bench_vad.py [file.wav ...]
+import sys
+
+import numpy as np
+
+import _common  # noqa: F401 (puts the project root on sys.path)
+from stt_backends import FRAME_BYTES, FRAME_MS, SAMPLE_RATE, iter_frames, read_wav
+from vad import Endpointer, EnergyVAD, WebRTCVAD, SPEECH_START, SPEECH_END
+
+PAUSE_THRESHOLD = 0.8  # speech_recognition's default silence before it ends a phrase
+
+
+def synthetic_fixture(seed=1):
+    """Voiced-speech stand-in (harmonics with a syllable envelope) over background noise"""
+    rng = np.random.default_rng(seed)
+    layout = [(0.6, "pause"), (1.4, "speech"), (0.9, "pause"), (2.2, "speech"), (0.6, "pause"),
+              (0.7, "speech"), (1.2, "pause")]
+    pieces, segments, position = [], [], 0.0
+    for seconds, kind in layout:
+        t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+        if kind == "speech":
+            f0 = rng.uniform(110, 210)
+            voice = sum(np.sin(2 * np.pi * f0 * k * t) / k for k in range(1, 8))
+            envelope = 0.55 + 0.45 * np.sin(2 * np.pi * 4 * t) ** 2  # ~4 syllables per second
+            pieces.append(voice * envelope * 1800)
+            segments.append((position, position + seconds))
+        else:
+            pieces.append(np.zeros(len(t)))
+        position += seconds
+    audio = np.concatenate(pieces)
+    audio += rng.normal(0, 60, len(audio))  # Room noise
+    return audio.astype("<i2").tobytes(), segments
+
+
+def reference_segments(pcm, min_gap=0.5):
+    """Estimate speech boundaries offline: frames well above the quiet level, short gaps merged"""
+    samples = np.frombuffer(pcm, dtype="<i2").astype(np.float32)
+    count = len(samples) // (FRAME_BYTES // 2)
+    rms = np.sqrt(np.mean(samples[:count * FRAME_BYTES // 2].reshape(count, -1) ** 2, axis=1))
+    quiet, loud = np.percentile(rms, 10), np.percentile(rms, 95)
+    active = rms > quiet + (loud - quiet) * 0.1
+    segments = []
+    for index in np.flatnonzero(active):
+        start, end = index * FRAME_MS / 1000, (index + 1) * FRAME_MS / 1000
+        if segments and start - segments[-1][1] < min_gap:
+            segments[-1] = (segments[-1][0], end)
+        else:
+            segments.append((start, end))
+    return segments
+
+
+def replay(endpointer, pcm):
+    """Feed every frame and return detected (start event time, end event time) in audio seconds"""
+    detected = []
+    for index, frame in enumerate(iter_frames(pcm)):
+        event = endpointer.process(frame)
+        now = (index + 1) * FRAME_MS / 1000  # The event is known once this frame has been captured
+        if event == SPEECH_START:
+            detected.append([now, None])
+        elif event == SPEECH_END:
+            detected[-1][1] = now
+    return detected
+
+
+def report(name, detected, reference):
+    onsets, endpoints, missed = [], [], 0
+    for ref_start, ref_end in reference:
+        match = next((d for d in detected if d[0] < ref_end + 0.5 and (d[1] or 1e9) > ref_start), None)
+        if match is None or match[1] is None:
+            missed += 1
+            continue
+        onsets.append((match[0] - ref_start) * 1000)
+        endpoints.append((match[1] - ref_end) * 1000)
+    extra = max(0, len(detected) - (len(reference) - missed))
+    if endpoints:
+        print(f"  {name:<8} onset {np.mean(onsets):6.0f} ms   end-point {np.mean(endpoints):6.0f} ms "
+              f"(max {np.max(endpoints):4.0f})   missed {missed}   spurious {extra}")
+    else:
+        print(f"  {name:<8} no utterances matched ({len(detected)} detected)")
+
+
+def main():
+    if len(sys.argv) > 1:
+        fixtures = [(path, read_wav(path), None) for path in sys.argv[1:]]
+    else:
+        pcm, segments = synthetic_fixture()
+        fixtures = [("synthetic fixture", pcm, segments)]
+
+    vads = [("energy", EnergyVAD)]
+    try:
+        WebRTCVAD()
+        vads.append(("webrtc", WebRTCVAD))
+    except ImportError:
+        print("webrtcvad not installed, testing the energy VAD only")
+
+    print(f"speech_recognition ends a phrase {PAUSE_THRESHOLD * 1000:.0f} ms after speech at the earliest")
+    for name, pcm, segments in fixtures:
+        reference = segments or reference_segments(pcm)
+        print(f"\n{name}: {len(pcm) / 2 / SAMPLE_RATE:.1f} s, {len(reference)} utterances")
+        for vad_name, vad_class in vads:
+            report(vad_name, replay(Endpointer(vad_class()), pcm), reference)
+
+
+if __name__ == "__main__":
+    main()
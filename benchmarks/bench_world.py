@@ -0,0 +1,21 @@
+# Frame-time benchmark: immediate-mode World drawing vs the compiled static geometry
+#
+#   python benchmarks/bench_world.py [frames]
+import sys
+
+from _common import import_app, time_frames, report
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    app = import_app()
+    world = app.World()
+
+    immediate = report("World.draw_immediate", time_frames(world.draw_immediate, frames))
+    world.build_static_geometry()
+    compiled = report("World.draw (display list)", time_frames(world.draw, frames))
+    print(f"Speedup: {immediate / compiled:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
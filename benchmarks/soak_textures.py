@@ -0,0 +1,55 @@
+# Soak test: render the menu and the interaction prompt for many frames and check
+# that GPU texture memory stays flat. Exits non-zero if textures leak.
+#
+#   python benchmarks/soak_textures.py [frames]
+import sys
+import time
+
+from _common import import_app
+
+
+def live_gl_textures(limit):
+    """Count texture names the driver still considers alive"""
+    from OpenGL.GL import glIsTexture
+    return sum(1 for name in range(1, limit) if glIsTexture(name))
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    app = import_app()
+    from texture_manager import textures
+
+    game = app.Game3D()
+    game.nearby_npc = "HR"
+
+    def frame():
+        game.menu.render()
+        game.show_interaction_prompt()
+
+    # Warm up so lazily created textures (glyph atlases) exist before the baseline:
+    # put the menu past its typing animation on a frame where the blinking prompt shows
+    game.menu.start_time = time.time() - 5.75
+    for _ in range(10):
+        frame()
+    baseline = textures.stats()
+    baseline_gl = live_gl_textures(4096)
+    print(f"Baseline: {baseline['textures']} textures, {baseline['bytes'] / 1e6:.1f} MB, {baseline_gl} GL names")
+
+    for i in range(1, frames + 1):
+        frame()
+        if i % 1000 == 0 or i == frames:
+            stats = textures.stats()
+            print(f"Frame {i}: {stats['textures']} textures, {stats['bytes'] / 1e6:.1f} MB")
+            if stats != baseline:
+                print("FAIL: texture memory grew")
+                sys.exit(1)
+
+    final_gl = live_gl_textures(4096)
+    if final_gl != baseline_gl:
+        print(f"FAIL: GL texture names grew from {baseline_gl} to {final_gl}")
+        sys.exit(1)
+    print("OK: texture memory stayed flat")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# Axis-aligned bounding boxes on the floor plane (x, z) in a uniform-grid broadphase, and
+# move-and-slide resolution that only looks at the boxes in the cells a move passes through
+import math
+
+CELL_SIZE = 1.0  # One level tile
+SKIN = 1e-4  # Gap kept between a mover and what it slid against, so it never starts a step overlapping
+
+
+def box_around(x, z, half_x, half_z, rotation=0):
+    """AABB (x0, z0, x1, z1) of a half_x by half_z footprint centred on (x, z), turned rotation degrees"""
+    angle = math.radians(rotation)
+    c, s = abs(math.cos(angle)), abs(math.sin(angle))
+    ex = c * half_x + s * half_z
+    ez = s * half_x + c * half_z
+    return (x - ex, z - ez, x + ex, z + ez)
+
+
+class CollisionGrid:
+    """Static and moving boxes bucketed by the grid cells they overlap"""
+
+    def __init__(self, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self.boxes = {}  # id -> (x0, z0, x1, z1)
+        self.owners = {}  # id -> what the box belongs to (a wall, desk, NPC...)
+        self.cells = {}  # (cx, cz) -> set of ids
+        self.next_id = 0
+
+    def __len__(self):
+        return len(self.boxes)
+
+    def _cell_range(self, x0, z0, x1, z1):
+        size = self.cell_size
+        for cx in range(math.floor(x0 / size), math.floor(x1 / size) + 1):
+            for cz in range(math.floor(z0 / size), math.floor(z1 / size) + 1):
+                yield (cx, cz)
+
+    def add(self, box, owner=None):
+        """Add a box; returns its id for update() and remove()"""
+        box_id = self.next_id
+        self.next_id += 1
+        self.boxes[box_id] = box
+        self.owners[box_id] = owner
+        for cell in self._cell_range(*box):
+            self.cells.setdefault(cell, set()).add(box_id)
+        return box_id
+
+    def remove(self, box_id):
+        box = self.boxes.pop(box_id)
+        del self.owners[box_id]
+        for cell in self._cell_range(*box):
+            bucket = self.cells[cell]
+            bucket.discard(box_id)
+            if not bucket:
+                del self.cells[cell]
+
+    def update(self, box_id, box):
+        """Move a box, e.g. when its NPC walks; only the cells it left or entered change"""
+        old_cells = set(self._cell_range(*self.boxes[box_id]))
+        new_cells = set(self._cell_range(*box))
+        self.boxes[box_id] = box
+        for cell in old_cells - new_cells:
+            bucket = self.cells[cell]
+            bucket.discard(box_id)
+            if not bucket:
+                del self.cells[cell]
+        for cell in new_cells - old_cells:
+            self.cells.setdefault(cell, set()).add(box_id)
+
+    def query(self, x0, z0, x1, z1):
+        """Ids of the boxes overlapping the area (x0, z0)-(x1, z1)"""
+        found = set()
+        for cell in self._cell_range(x0, z0, x1, z1):
+            bucket = self.cells.get(cell)
+            if bucket:
+                found.update(bucket)
+        return [box_id for box_id in found if _overlaps(self.boxes[box_id], x0, z0, x1, z1)]
+
+    def move_and_slide(self, x, z, dx, dz, radius):
+        """Move a square mover of half-size radius by (dx, dz), stopping at boxes and sliding along them
+
+        Each axis is swept separately, so thin walls can't be tunnelled through and a blocked
+        axis doesn't stop movement along the other one. Returns the new (x, z).
+        """
+        x0, z0, x1, z1 = x - radius, z - radius, x + radius, z + radius
+        boxes = [self.boxes[box_id] for box_id in self.query(min(x0, x0 + dx), min(z0, z0 + dz),
+                                                              max(x1, x1 + dx), max(z1, z1 + dz))]
+        return slide(boxes, x, z, dx, dz, radius)
+
+
+def slide(boxes, x, z, dx, dz, radius):
+    """Sweep along x, then z, clamping against the first box in the way on each axis"""
+    if dx:
+        for bx0, bz0, bx1, bz1 in boxes:
+            if bz0 < z + radius and z - radius < bz1:
+                if dx > 0 and x + radius <= bx0 + SKIN:
+                    dx = min(dx, bx0 - (x + radius) - SKIN)
+                elif dx < 0 and x - radius >= bx1 - SKIN:
+                    dx = max(dx, bx1 - (x - radius) + SKIN)
+        x += dx
+    if dz:
+        for bx0, bz0, bx1, bz1 in boxes:
+            if bx0 < x + radius and x - radius < bx1:
+                if dz > 0 and z + radius <= bz0 + SKIN:
+                    dz = min(dz, bz0 - (z + radius) - SKIN)
+                elif dz < 0 and z - radius >= bz1 - SKIN:
+                    dz = max(dz, bz1 - (z - radius) + SKIN)
+        z += dz
+    return x, z
+
+
+def _overlaps(box, x0, z0, x1, z1):
+    return box[0] < x1 and x0 < box[2] and box[1] < z1 and z0 < box[3]
@@ -0,0 +1,126 @@
+# Per-NPC conversation memory: recent turns kept verbatim, older turns folded into a
+# rolling summary, and every prompt assembled under a fixed token budget
+import re
+import threading
+
+try:
+    import tiktoken
+    _encoding = tiktoken.encoding_for_model("gpt-4")
+except Exception:  # Not installed, or no encoding data offline
+    _encoding = None
+
+TOKEN_BUDGET = 1000  # Prompt tokens per request, system prompt included
+RECENT_TURNS = 8  # Messages kept word for word
+SUMMARY_TOKENS = 250  # The rolling summary is trimmed to this
+MESSAGE_OVERHEAD = 4  # Tokens the chat format adds around each message
+
+SPEAKER_ROLES = {"Player": "user", "NPC": "assistant"}
+
+
+def count_tokens(text):
+    """Token count from tiktoken when available, otherwise about four characters per token"""
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return (len(text) + 3) // 4
+
+
+def first_sentence(text, max_chars=120):
+    match = re.match(r"(.+?[.!?])(\s|$)", text)
+    sentence = match.group(1) if match else text
+    if len(sentence) > max_chars:
+        sentence = sentence[:max_chars].rsplit(" ", 1)[0] + "..."
+    return sentence
+
+
+def summarize_turns(summary_lines, turns):
+    """Fold turns into the summary: one short line per message, the gist being its first sentence"""
+    for speaker, text in turns:
+        verb = "asked" if speaker == "Player" and text.rstrip().endswith("?") else "said"
+        summary_lines.append(f"{speaker} {verb}: {first_sentence(text)}")
+    return summary_lines
+
+
+class NPCMemory:
+    def __init__(self):
+        self.turns = []  # (speaker, text) said word for word, oldest first
+        self.summary_lines = []  # Gist of the turns that no longer fit, oldest first
+        self.prompt_tokens = []  # Prompt size of every request, for reporting
+
+    def summary(self):
+        return "\n".join(self.summary_lines)
+
+
+class ConversationMemory:
+    """What every NPC remembers of its conversations with the player, kept to a token budget"""
+
+    def __init__(self, token_budget=TOKEN_BUDGET, recent_turns=RECENT_TURNS, summary_tokens=SUMMARY_TOKENS):
+        self.token_budget = token_budget
+        self.recent_turns = recent_turns
+        self.summary_tokens = summary_tokens
+        self.npcs = {}
+        self.lock = threading.RLock()  # Typed replies use it from the game thread, spoken ones from the speech thread
+
+    def get(self, role):
+        with self.lock:
+            memory = self.npcs.get(role)
+            if memory is None:
+                memory = self.npcs[role] = NPCMemory()
+            return memory
+
+    def forget(self, role):
+        with self.lock:
+            self.npcs.pop(role, None)
+
+    def recent(self, role):
+        """Turns still held word for word, e.g. to show again when a conversation resumes"""
+        with self.lock:
+            return list(self.get(role).turns)
+
+    def add(self, role, speaker, text):
+        with self.lock:
+            memory = self.get(role)
+            memory.turns.append((speaker, text))
+            if len(memory.turns) > self.recent_turns:
+                self._compact(memory, len(memory.turns) - self.recent_turns)
+
+    def _compact(self, memory, count):
+        """Move the oldest count turns into the summary, dropping its oldest lines past the limit"""
+        old, memory.turns = memory.turns[:count], memory.turns[count:]
+        summarize_turns(memory.summary_lines, old)
+        while len(memory.summary_lines) > 1 and count_tokens(memory.summary()) > self.summary_tokens:
+            memory.summary_lines.pop(0)
+
+    def build_messages(self, role, system_prompt, text):
+        """Chat messages for the player's next line, within the token budget
+
+        Returns (messages, prompt tokens). Turns that don't fit are summarized, newest kept longest.
+        """
+        with self.lock:
+            memory = self.get(role)
+            while True:
+                messages = [{"role": "system", "content": system_prompt}]
+                if memory.summary_lines:
+                    messages.append({"role": "system", "content": "Earlier in this conversation:\n" + memory.summary()})
+                for speaker, turn in memory.turns:
+                    messages.append({"role": SPEAKER_ROLES.get(speaker, "user"), "content": turn})
+                messages.append({"role": "user", "content": text})
+
+                tokens = sum(count_tokens(message["content"]) + MESSAGE_OVERHEAD for message in messages)
+                if tokens <= self.token_budget or not memory.turns:
+                    break
+                self._compact(memory, 1)
+
+            memory.prompt_tokens.append(tokens)
+            return messages, tokens
+
+    def stats(self):
+        return {
+            role: {
+                "turns": len(memory.turns),
+                "summary_tokens": count_tokens(memory.summary()),
+                "requests": len(memory.prompt_tokens),
+                "mean_prompt_tokens": sum(memory.prompt_tokens) / len(memory.prompt_tokens) if memory.prompt_tokens else 0,
+                "max_prompt_tokens": max(memory.prompt_tokens, default=0),
+            }
+            for role, memory in self.npcs.items()
+        }
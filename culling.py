@@ -0,0 +1,77 @@
+# View-frustum culling of bounding spheres and distance-based level of detail
+import math
+
+import numpy as np
+
+FOV_Y = 45.0  # Matches the gluPerspective call the game renders with
+NEAR = 0.1
+FAR = 50.0
+
+# Level of detail by distance from the camera: LOD 0 closer than the first entry, LOD 1 beyond
+LOD_DISTANCES = (8.0,)
+SPHERE_DETAIL = [(16, 16), (8, 6)]  # Sphere tessellation (slices, stacks) per LOD
+
+
+def perspective(fov_y, aspect, near, far):
+    """The matrix gluPerspective builds"""
+    f = 1.0 / math.tan(math.radians(fov_y) / 2)
+    return np.array([
+        [f / aspect, 0, 0, 0],
+        [0, f, 0, 0],
+        [0, 0, (far + near) / (near - far), 2 * far * near / (near - far)],
+        [0, 0, -1, 0],
+    ])
+
+
+def rotation(angle, x, y, z):
+    """The matrix glRotatef builds for a unit axis"""
+    c, s = math.cos(math.radians(angle)), math.sin(math.radians(angle))
+    t = 1 - c
+    return np.array([
+        [t * x * x + c, t * x * y - s * z, t * x * z + s * y, 0],
+        [t * x * y + s * z, t * y * y + c, t * y * z - s * x, 0],
+        [t * x * z - s * y, t * y * z + s * x, t * z * z + c, 0],
+        [0, 0, 0, 1],
+    ])
+
+
+def camera_view(pos, rot):
+    """Game3D's camera transform: pitch, then yaw, then move the world by -pos"""
+    translate = np.identity(4)
+    translate[:3, 3] = [-pos[0], -pos[1], -pos[2]]
+    return rotation(rot[0], 1, 0, 0) @ rotation(rot[1], 0, 1, 0) @ translate
+
+
+class Frustum:
+    """The six clipping planes of a camera, in world space"""
+
+    def __init__(self, clip, eye):
+        # Planes from the combined projection * view matrix (Gribb & Hartmann), as (a, b, c, d)
+        # with the normal pointing into the frustum
+        planes = np.array([
+            clip[3] + clip[0], clip[3] - clip[0],  # Left, right
+            clip[3] + clip[1], clip[3] - clip[1],  # Bottom, top
+            clip[3] + clip[2], clip[3] - clip[2],  # Near, far
+        ])
+        planes /= np.linalg.norm(planes[:, :3], axis=1)[:, None]
+        self.normals = planes[:, :3]
+        self.offsets = planes[:, 3]
+        self.eye = np.asarray(eye, dtype=np.float64)
+
+    @classmethod
+    def from_camera(cls, pos, rot, aspect, fov_y=FOV_Y, near=NEAR, far=FAR):
+        """Frustum of the player's camera"""
+        clip = perspective(fov_y, aspect, near, far) @ camera_view(pos, rot)
+        return cls(clip, pos)
+
+    def visible(self, centers, radii):
+        """Boolean mask of the bounding spheres that are at least partly inside"""
+        centers = np.asarray(centers, dtype=np.float64).reshape(-1, 3)
+        distances = centers @ self.normals.T + self.offsets
+        return (distances >= -np.asarray(radii, dtype=np.float64).reshape(-1, 1)).all(axis=1)
+
+    def lod(self, centers):
+        """Level of detail for each point from its distance to the camera"""
+        centers = np.asarray(centers, dtype=np.float64).reshape(-1, 3)
+        distance = np.linalg.norm(centers - self.eye, axis=1)
+        return np.searchsorted(LOD_DISTANCES, distance)
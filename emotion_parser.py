@@ -0,0 +1,98 @@
+# Incremental parser for the [EMOTION:name] tags NPCs put in their replies: streamed
+# chunks go in, visible text comes out, and every tag fires a callback the moment it closes
+TAG_PREFIX = "[EMOTION:"
+MAX_TAG_CHARS = 32  # A longer bracket is ordinary text, not a tag still arriving
+
+
+class EmotionTagParser:
+    """Strips emotion tags from a streamed reply, at the start or anywhere later in it
+
+    feed() returns the visible text each chunk adds. A possible tag split across chunks is held
+    back until it either closes (on_emotion is called with the lowercase name) or can no longer
+    be one. Text is kept as lists of parts, so a long reply costs linear time.
+    """
+
+    def __init__(self, on_emotion=None):
+        self.on_emotion = on_emotion
+        self.parts = []  # Visible text
+        self.raw_parts = []  # Everything fed in, tags included
+        self.emotions = []  # Emotion of every tag, in order
+        self.pending = ""  # The start of what may be a tag
+        self.skip_space = True  # Drop whitespace at the start and after a tag
+        self.ends_with_space = True
+        self._joined = ("", 0)  # Cached text() and the number of parts it joins
+
+    def feed(self, chunk):
+        """Parse the next chunk and return the visible text it adds"""
+        self.raw_parts.append(chunk)
+        data = self.pending + chunk if self.pending else chunk
+        self.pending = ""
+        out = []
+        pos = 0
+        while pos < len(data):
+            start = data.find("[", pos)
+            if start == -1:
+                self._emit(out, data[pos:])
+                break
+            self._emit(out, data[pos:start])
+            end = data.find("]", start, start + MAX_TAG_CHARS)
+            if end == -1:
+                head = data[start:]
+                if self._may_become_tag(head):
+                    self.pending = head  # Wait for the rest of the tag
+                    break
+                self._emit(out, "[")
+                pos = start + 1
+            elif data.startswith(TAG_PREFIX, start) and "\n" not in data[start:end]:
+                self._tag(data[start + len(TAG_PREFIX):end].strip().lower())
+                pos = end + 1
+            else:
+                self._emit(out, "[")
+                pos = start + 1
+        return self._commit(out)
+
+    def flush(self):
+        """End of the reply: a tag that never closed is shown as text"""
+        out = []
+        if self.pending:
+            self._emit(out, self.pending)
+            self.pending = ""
+        return self._commit(out)
+
+    def text(self):
+        """All visible text so far"""
+        text, count = self._joined
+        if count != len(self.parts):
+            text = "".join(self.parts)
+            self._joined = (text, len(self.parts))
+        return text
+
+    def raw(self):
+        return "".join(self.raw_parts)
+
+    @staticmethod
+    def _may_become_tag(head):
+        if len(head) >= MAX_TAG_CHARS or "\n" in head:
+            return False
+        return head.startswith(TAG_PREFIX) or TAG_PREFIX.startswith(head)
+
+    def _tag(self, emotion):
+        self.emotions.append(emotion)
+        # "fine. [EMOTION:sad] But" reads "fine. But"; "fine.[EMOTION:sad] But" keeps its space
+        self.skip_space = self.ends_with_space
+        if self.on_emotion is not None:
+            self.on_emotion(emotion)
+
+    def _emit(self, out, text):
+        if self.skip_space:
+            text = text.lstrip()
+        if text:
+            out.append(text)
+            self.skip_space = False
+            self.ends_with_space = text[-1].isspace()
+
+    def _commit(self, out):
+        text = "".join(out)
+        if text:
+            self.parts.append(text)
+        return text
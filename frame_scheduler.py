@@ -0,0 +1,81 @@
+# Frame pacing: a persistent clock, fixed-timestep updates and frame-time telemetry
+import json
+from collections import deque
+
+import pygame
+
+
+class FrameStats:
+    """Rolling window of frame times with percentiles and dropped-frame counts"""
+
+    def __init__(self, budget_ms, window=600):
+        self.budget_ms = budget_ms
+        self.frame_times = deque(maxlen=window)
+        self.total_frames = 0
+        self.dropped_frames = 0
+
+    def record(self, frame_ms):
+        self.frame_times.append(frame_ms)
+        self.total_frames += 1
+        # A frame that took two budgets long means one display refresh was missed
+        self.dropped_frames += max(0, int(frame_ms / self.budget_ms + 0.5) - 1)
+
+    def percentile(self, p):
+        if not self.frame_times:
+            return 0.0
+        ordered = sorted(self.frame_times)
+        index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def histogram(self, bucket_ms=4, buckets=10):
+        """Counts of recent frame times in bucket_ms wide buckets, the last one open-ended"""
+        counts = [0] * buckets
+        for frame_ms in self.frame_times:
+            counts[min(buckets - 1, int(frame_ms // bucket_ms))] += 1
+        return counts
+
+    def summary(self):
+        window = len(self.frame_times)
+        return {
+            "frames": self.total_frames,
+            "window": window,
+            "mean_ms": sum(self.frame_times) / window if window else 0.0,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": max(self.frame_times) if window else 0.0,
+            "dropped_frames": self.dropped_frames,
+            "budget_ms": self.budget_ms,
+        }
+
+    def dump_json(self, path):
+        data = self.summary()
+        data["histogram_bucket_ms"] = 4
+        data["histogram"] = self.histogram()
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+        print(f"[FrameStats] Frame times written to {path}")
+
+
+class FrameScheduler:
+    def __init__(self, fps=60, update_hz=60, max_updates=5):
+        self.clock = pygame.time.Clock()  # One clock for the whole run so tick() actually limits
+        self.fps = fps
+        self.step = 1.0 / update_hz  # Fixed simulation timestep in seconds
+        self.max_updates = max_updates  # Cap catch-up work after a long stall
+        self.accumulator = 0.0
+        self.stats = FrameStats(budget_ms=1000.0 / fps)
+
+    def start(self):
+        """Reset the clock so setup time isn't counted as a frame"""
+        self.clock.tick()
+        self.accumulator = 0.0
+
+    def tick(self):
+        """Wait for the next frame and return how many fixed updates to run"""
+        frame_ms = self.clock.tick(self.fps)
+        self.stats.record(frame_ms)
+        self.accumulator += min(frame_ms / 1000.0, self.step * self.max_updates)
+        steps = int(self.accumulator / self.step)
+        self.accumulator -= steps * self.step
+        return steps
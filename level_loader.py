@@ -0,0 +1,227 @@
+# Tile maps to world geometry: walls and floor greedy-meshed into as few quads as possible,
+# plus the player spawn, NPCs with their workstations and the plants the map places
+import numpy as np
+from OpenGL.GL import GL_QUADS
+
+from meshes import Mesh
+
+TILE_SIZE = 1.0  # World units per tile
+WALL_HEIGHT = 2.0
+
+# Map legend. NPC tiles and spawns stand on floor.
+WALL = "W"
+FLOOR = "."
+VOID = " "  # Outside the building: no floor, nothing drawn
+PLAYER = "P"
+PLANT = "*"
+DEFAULT_NPC_ROLE = "Employee"
+NPC_TILES = {"N": DEFAULT_NPC_ROLE, "H": "HR", "C": "CEO"}  # N is any NPC, H and C specific roles
+
+# Workstation around an NPC, along x towards the nearer wall
+DESK_OFFSET = 0.7
+CHAIR_OFFSET = 0.2
+
+
+class Level:
+    """A parsed tile map: geometry in world space and everything placed on it
+
+    Tile (row, col) covers x in [col, col + 1) and z in [row, row + 1) tiles, with the map
+    centred on the origin. Rows run along +z, columns along +x.
+    """
+
+    def __init__(self, rows, tile_size=TILE_SIZE, wall_height=WALL_HEIGHT):
+        self.rows = rows
+        self.depth = len(rows)
+        self.width = max((len(row) for row in rows), default=0)
+        self.tile_size = tile_size
+        self.wall_height = wall_height
+        self.origin = (-self.width * tile_size / 2, -self.depth * tile_size / 2)  # World x, z of tile (0, 0)
+
+        self.player_spawn = (0.0, 0.0)
+        self.npcs = []  # (role, x, z)
+        self.plants = []  # (x, z)
+        self.desks = []  # (x, z, rotation), as World.layout
+        self.chairs = []
+        self.partitions = []  # (x, z)
+        self.wall_rects = []  # (x0, z0, x1, z1) of the merged wall blocks
+        self.meshes = {}  # 'floor' / 'walls' -> Mesh of GL_QUADS
+
+    def tile(self, row, col):
+        if 0 <= row < self.depth and 0 <= col < len(self.rows[row]):
+            return self.rows[row][col]
+        return VOID
+
+    def is_wall(self, row, col):
+        return self.tile(row, col) == WALL
+
+    def to_world(self, row, col):
+        """World (x, z) of a tile corner"""
+        return self.origin[0] + col * self.tile_size, self.origin[1] + row * self.tile_size
+
+    def tile_center(self, row, col):
+        x, z = self.to_world(row, col)
+        return x + self.tile_size / 2, z + self.tile_size / 2
+
+    def bounds(self):
+        """(min_x, min_z, max_x, max_z) of the walkable tiles"""
+        walkable = [(r, c) for r, row in enumerate(self.rows) for c, ch in enumerate(row) if ch not in (WALL, VOID)]
+        if not walkable:
+            return (0.0, 0.0, 0.0, 0.0)
+        min_x, min_z = self.to_world(min(r for r, _ in walkable), min(c for _, c in walkable))
+        max_x, max_z = self.to_world(max(r for r, _ in walkable) + 1, max(c for _, c in walkable) + 1)
+        return (min_x, min_z, max_x, max_z)
+
+    def triangle_count(self):
+        return sum(len(mesh.vertices) // 4 * 2 for mesh in self.meshes.values())
+
+
+def load_level(source, **kwargs):
+    """Build a Level from a map given inline (list of row strings) or as a path to a text file"""
+    if isinstance(source, str):
+        with open(source, encoding="utf-8") as f:
+            rows = [line.rstrip("\r\n") for line in f]
+        while rows and not rows[-1].strip():
+            rows.pop()
+    else:
+        rows = list(source)
+    return parse_level(rows, **kwargs)
+
+
+def parse_level(rows, **kwargs):
+    level = Level(rows, **kwargs)
+    for r, row in enumerate(rows):
+        for c, ch in enumerate(row):
+            if ch in (WALL, FLOOR, VOID):
+                continue
+            x, z = level.tile_center(r, c)
+            if ch == PLAYER:
+                level.player_spawn = (x, z)
+            elif ch == PLANT:
+                level.plants.append((x, z))
+            elif ch in NPC_TILES:
+                level.npcs.append((NPC_TILES[ch], x, z))
+                place_workstation(level, r, c, x, z)
+            else:
+                raise ValueError(f"Unknown map tile {ch!r} at row {r}, column {c}")
+
+    padded = [row.ljust(level.width, VOID) for row in rows]
+    walls = [[ch == WALL for ch in row] for row in padded]
+    floors = [[ch != WALL and ch != VOID for ch in row] for row in padded]
+    level.wall_rects = [_rect_to_world(level, rect) for rect in greedy_rects(walls)]
+    level.meshes = {
+        "floor": _quads_mesh(_floor_quads(level, greedy_rects(floors))),
+        "walls": _quads_mesh(_wall_quads(level, walls)),
+    }
+    return level
+
+
+def place_workstation(level, row, col, x, z):
+    """Desk, chair and booth partition beside an NPC, on the side of the nearer wall"""
+    left = right = 1
+    while col - left >= 0 and not level.is_wall(row, col - left):
+        left += 1
+    while col + right < level.width and not level.is_wall(row, col + right):
+        right += 1
+    side = -1 if left <= right else 1
+    desk_x = x + side * DESK_OFFSET
+    rotation = 90 if side < 0 else -90  # The monitor faces the NPC
+    level.desks.append((desk_x, z, rotation))
+    level.chairs.append((x + side * CHAIR_OFFSET, z, rotation))
+    level.partitions.append((desk_x, z))
+
+
+def greedy_rects(mask):
+    """Cover the True cells of a 2D grid with few rectangles: grow right along a row, then down
+
+    Returns (row, col, height, width) tuples in tiles.
+    """
+    depth = len(mask)
+    width = len(mask[0]) if depth else 0
+    used = [[False] * width for _ in range(depth)]
+    rects = []
+    for r in range(depth):
+        row, row_used = mask[r], used[r]
+        c = 0
+        while c < width:
+            if not row[c] or row_used[c]:
+                c += 1
+                continue
+            w = 1
+            while c + w < width and row[c + w] and not row_used[c + w]:
+                w += 1
+            h = 1
+            while r + h < depth and all(mask[r + h][c:c + w]) and not any(used[r + h][c:c + w]):
+                h += 1
+            for rr in range(r, r + h):
+                used[rr][c:c + w] = [True] * w
+            rects.append((r, c, h, w))
+            c += w
+    return rects
+
+
+def _rect_to_world(level, rect):
+    r, c, h, w = rect
+    x0, z0 = level.to_world(r, c)
+    x1, z1 = level.to_world(r + h, c + w)
+    return (x0, z0, x1, z1)
+
+
+def _floor_quads(level, rects):
+    quads = []
+    for rect in rects:
+        x0, z0, x1, z1 = _rect_to_world(level, rect)
+        quads.append(((0, 1, 0), [(x0, 0, z0), (x0, 0, z1), (x1, 0, z1), (x1, 0, z0)]))
+    return quads
+
+
+def _wall_quads(level, walls):
+    """Tops of the merged wall blocks, and each exposed side merged into one quad per straight run
+
+    Sides facing another wall or the edge of the map are never visible and are left out.
+    """
+    top = level.wall_height
+    quads = []
+    for x0, z0, x1, z1 in level.wall_rects:
+        quads.append(((0, 1, 0), [(x0, top, z0), (x0, top, z1), (x1, top, z1), (x1, top, z0)]))
+
+    # A side is exposed where a wall tile borders a non-wall tile inside the map
+    walls = np.array(walls, dtype=bool).reshape(level.depth, level.width)
+    open_tiles = np.zeros((level.depth + 2, level.width + 2), dtype=bool)
+    open_tiles[1:-1, 1:-1] = ~walls
+    exposed = {
+        (0, 0, -1): walls & open_tiles[:-2, 1:-1],
+        (0, 0, 1): walls & open_tiles[2:, 1:-1],
+        (-1, 0, 0): walls & open_tiles[1:-1, :-2],
+        (1, 0, 0): walls & open_tiles[1:-1, 2:],
+    }
+
+    # North (-z) and south (+z) faces: one quad per run along a row
+    for normal in ((0, 0, -1), (0, 0, 1)):
+        for r, start, end in _runs(exposed[normal]):
+            x0, z = level.to_world(r + (normal[2] > 0), start)
+            x1, _ = level.to_world(r, end)
+            quads.append((normal, [(x0, 0, z), (x1, 0, z), (x1, top, z), (x0, top, z)]))
+
+    # West (-x) and east (+x) faces: one quad per run down a column
+    for normal in ((-1, 0, 0), (1, 0, 0)):
+        for c, start, end in _runs(exposed[normal].T):
+            x, z0 = level.to_world(start, c + (normal[0] > 0))
+            _, z1 = level.to_world(end, c)
+            quads.append((normal, [(x, 0, z0), (x, 0, z1), (x, top, z1), (x, top, z0)]))
+    return quads
+
+
+def _runs(mask):
+    """(row, start, end) of every run of True cells along the rows of a 2D array"""
+    edges = np.zeros((mask.shape[0], mask.shape[1] + 2), dtype=np.int8)
+    edges[:, 1:-1] = mask
+    steps = np.diff(edges, axis=1)
+    rows, starts = np.nonzero(steps == 1)
+    _, ends = np.nonzero(steps == -1)  # Row-major order pairs every end with its start
+    return zip(rows.tolist(), starts.tolist(), ends.tolist())
+
+
+def _quads_mesh(quads):
+    vertices = np.array([corner for _, corners in quads for corner in corners], dtype=np.float32).reshape(-1, 3)
+    normals = np.repeat(np.array([normal for normal, _ in quads], dtype=np.float32).reshape(-1, 3), 4, axis=0)
+    return Mesh(GL_QUADS, vertices, normals)
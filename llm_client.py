@@ -0,0 +1,114 @@
+# One OpenAI client for the whole game: a shared keep-alive connection pool,
+# retries with exponential backoff, request timeouts and per-endpoint concurrency limits
+import threading
+import time
+from contextlib import contextmanager
+
+from startup_profiler import profiler
+
+NPC_SYSTEM_PROMPT = "You are an NPC in a game. Respond naturally and include an emotion tag at the start of your response in the format [EMOTION:emotion_name]. Available emotions: happy, sad, angry, excited, calm, friendly, authoritative."
+
+MAX_CONNECTIONS = 16
+MAX_KEEPALIVE_CONNECTIONS = 8
+KEEPALIVE_EXPIRY = 60.0  # Seconds an idle connection is kept for the next request
+MAX_RETRIES = 3  # Connection errors, 408/409/429 and 5xx are retried with exponential backoff
+
+# Timeouts in seconds (each read/write/pool wait, connect, whole request): connecting fails fast,
+# reads allow for slow generation, and a stream that keeps trickling is still cut off at the total
+CHAT_TIMEOUT = (30.0, 5.0, 60.0)
+SPEECH_TIMEOUT = (20.0, 5.0, 30.0)
+
+# Requests allowed in flight at once per endpoint, so a burst of TTS can't starve the chat
+ENDPOINT_LIMITS = {
+    "chat": 4,
+    "speech": 4,
+}
+
+_client = None
+_client_lock = threading.Lock()
+_semaphores = {name: threading.BoundedSemaphore(limit) for name, limit in ENDPOINT_LIMITS.items()}
+
+
+def _timeout(seconds):
+    import httpx
+
+    operation, connect, _ = seconds
+    return httpx.Timeout(operation, connect=connect)
+
+
+def _until(chunks, start, seconds, endpoint):
+    """Yield from chunks, raising TimeoutError once the request has run longer than its total timeout"""
+    _, _, total = seconds
+    for chunk in chunks:
+        if time.monotonic() - start > total:
+            raise TimeoutError(f"{endpoint} request took longer than {total:g} s")
+        yield chunk
+
+
+def get_client():
+    """Return the process-wide OpenAI client, creating it on first use"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            # openai and httpx take a few hundred ms to import, so that waits for the first request
+            with profiler.measure("openai", "import"):
+                import httpx
+                import openai
+            http_client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=MAX_CONNECTIONS,
+                    max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=KEEPALIVE_EXPIRY,
+                ),
+                timeout=_timeout(CHAT_TIMEOUT),
+            )
+            _client = openai.OpenAI(http_client=http_client, max_retries=MAX_RETRIES, timeout=_timeout(CHAT_TIMEOUT))
+        return _client
+
+
+def reset_client():
+    """Close the shared client; the next get_client() builds a new one (e.g. after a base URL change)"""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+
+@contextmanager
+def limit(endpoint):
+    """Hold one of the endpoint's concurrency slots for the duration of the block"""
+    semaphore = _semaphores[endpoint]
+    with semaphore:
+        yield
+
+
+def stream_chat(messages, model="gpt-4"):
+    """Yield the content of a streamed chat completion as it arrives"""
+    with limit("chat"):
+        start = time.monotonic()
+        stream = get_client().chat.completions.create(
+            model=model,
+            messages=messages,
+            stream=True,
+            timeout=_timeout(CHAT_TIMEOUT),
+        )
+        with stream:  # Return the connection to the pool even if the caller stops early
+            for chunk in _until(stream, start, CHAT_TIMEOUT, "chat"):
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+
+def stream_speech(text, voice, speed, model, response_format, chunk_size):
+    """Yield synthesized audio bytes in chunk_size pieces as the response body arrives"""
+    with limit("speech"):
+        start = time.monotonic()
+        with get_client().audio.speech.with_streaming_response.create(
+            model=model,
+            voice=voice,
+            input=text,
+            speed=speed,
+            response_format=response_format,
+            timeout=_timeout(SPEECH_TIMEOUT),
+        ) as response:
+            yield from _until(response.iter_bytes(chunk_size), start, SPEECH_TIMEOUT, "speech")
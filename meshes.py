@@ -0,0 +1,86 @@
+# Cached unit meshes drawn with client-side vertex arrays
+import numpy as np
+from OpenGL.GL import *
+
+
+class Mesh:
+    def __init__(self, mode, vertices, normals, indices=None):
+        self.mode = mode
+        self.vertices = np.ascontiguousarray(vertices, dtype=np.float32)
+        self.normals = np.ascontiguousarray(normals, dtype=np.float32)
+        self.indices = None if indices is None else np.ascontiguousarray(indices, dtype=np.uint32)
+
+    def draw(self):
+        """Draw the mesh with one vertex-array call"""
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_NORMAL_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, self.vertices)
+        glNormalPointer(GL_FLOAT, 0, self.normals)
+        if self.indices is not None:
+            glDrawElements(self.mode, len(self.indices), GL_UNSIGNED_INT, self.indices)
+        else:
+            glDrawArrays(self.mode, 0, len(self.vertices))
+        glDisableClientState(GL_NORMAL_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+
+
+def build_sphere(slices, stacks):
+    """Tessellate a unit sphere into triangles (same layout as the old quad strips)"""
+    lat = np.pi * (-0.5 + np.arange(stacks + 1) / stacks)
+    lng = 2 * np.pi * np.arange(slices + 1) / slices
+    lat, lng = np.meshgrid(lat, lng, indexing='ij')
+
+    # On a unit sphere the vertex positions are also the normals
+    vertices = np.stack([
+        np.cos(lng) * np.cos(lat),
+        np.sin(lng) * np.cos(lat),
+        np.sin(lat),
+    ], axis=-1).reshape(-1, 3)
+
+    # Two triangles per grid cell, rows are stacks and columns are slices
+    row = np.arange(stacks)[:, None] * (slices + 1)
+    col = np.arange(slices)[None, :]
+    v00 = (row + col).ravel()
+    v10 = v00 + slices + 1
+    v01 = v00 + 1
+    v11 = v10 + 1
+    indices = np.stack([v00, v10, v01, v01, v10, v11], axis=-1).ravel()
+
+    return Mesh(GL_TRIANGLES, vertices, vertices, indices)
+
+
+def build_cube():
+    """Build a unit cube centred on the origin with one normal per face"""
+    faces = [
+        # (normal, four corners)
+        ((0, 0, 1), [(-0.5, -0.5, 0.5), (0.5, -0.5, 0.5), (0.5, 0.5, 0.5), (-0.5, 0.5, 0.5)]),  # Front
+        ((0, 1, 0), [(-0.5, 0.5, 0.5), (0.5, 0.5, 0.5), (0.5, 0.5, -0.5), (-0.5, 0.5, -0.5)]),  # Top
+        ((-1, 0, 0), [(-0.5, -0.5, 0.5), (-0.5, 0.5, 0.5), (-0.5, 0.5, -0.5), (-0.5, -0.5, -0.5)]),  # Left
+        ((1, 0, 0), [(0.5, -0.5, 0.5), (0.5, -0.5, -0.5), (0.5, 0.5, -0.5), (0.5, 0.5, 0.5)]),  # Right
+        ((0, 0, -1), [(-0.5, -0.5, -0.5), (-0.5, 0.5, -0.5), (0.5, 0.5, -0.5), (0.5, -0.5, -0.5)]),  # Back
+        ((0, -1, 0), [(-0.5, -0.5, 0.5), (-0.5, -0.5, -0.5), (0.5, -0.5, -0.5), (0.5, -0.5, 0.5)]),  # Bottom
+    ]
+    vertices = [corner for _, corners in faces for corner in corners]
+    normals = [normal for normal, corners in faces for _ in corners]
+    return Mesh(GL_QUADS, vertices, normals)
+
+
+_sphere_cache = {}
+_cube = None
+
+
+def sphere_mesh(slices, stacks):
+    """Return the cached unit sphere for this tessellation"""
+    key = (slices, stacks)
+    mesh = _sphere_cache.get(key)
+    if mesh is None:
+        mesh = _sphere_cache[key] = build_sphere(slices, stacks)
+    return mesh
+
+
+def cube_mesh():
+    """Return the cached unit cube"""
+    global _cube
+    if _cube is None:
+        _cube = build_cube()
+    return _cube
@@ -0,0 +1,200 @@
+# Batched NPC rendering: one draw call per body part for every NPC in the scene
+import ctypes
+
+import numpy as np
+from OpenGL.GL import *
+
+from culling import SPHERE_DETAIL
+from meshes import cube_mesh, sphere_mesh
+
+# Packed per-NPC instance data
+INSTANCE_DTYPE = np.dtype([
+    ('position', np.float32, 3),
+    ('scale', np.float32),
+    ('skin', np.float32, 3),
+    ('hair', np.float32, 3),
+    ('clothes_primary', np.float32, 3),
+    ('clothes_secondary', np.float32, 3),
+])
+
+# Body parts in NPC space (before the NPC scale), matching NPC.draw:
+# ([mesh per level of detail], [(offset, size), ...], palette field)
+SPHERE_LODS = [lambda detail=detail: sphere_mesh(*detail) for detail in SPHERE_DETAIL]
+BODY_PARTS = [
+    (SPHERE_LODS, [((0, 0, 0), (0.12, 0.12, 0.12))], 'skin'),  # Head
+    (SPHERE_LODS, [((0, 0.05, 0), (0.13, 0.13, 0.13))], 'hair'),  # Hair
+    ([cube_mesh], [((0, -0.3, 0), (0.3, 0.4, 0.2))], 'clothes_primary'),  # Torso
+    ([cube_mesh], [((-0.2, -0.3, 0), (0.1, 0.4, 0.1)), ((0.2, -0.3, 0), (0.1, 0.4, 0.1))], 'clothes_secondary'),  # Arms
+    ([cube_mesh], [((-0.1, -0.8, 0), (0.1, 0.5, 0.1)), ((0.1, -0.8, 0), (0.1, 0.5, 0.1))], 'clothes_secondary'),  # Legs
+]
+
+# Bounding sphere of an NPC in NPC space, from the top of the hair to the feet
+BOUNDS_CENTER = np.array([0, -0.45, 0], dtype=np.float32)
+BOUNDS_RADIUS = 0.7
+
+
+class PartBatch:
+    """All instances of one body part, stored in vertex buffers and drawn with one call"""
+
+    def __init__(self, mesh, placements, palette):
+        self.mode = mesh.mode
+        self.palette = palette
+
+        # Bake every copy of the part (e.g. both arms) into one template
+        indices = mesh.indices if mesh.indices is not None else np.arange(len(mesh.vertices), dtype=np.uint32)
+        vertices, normals, elements = [], [], []
+        for offset, size in placements:
+            elements.append(indices + sum(len(v) for v in vertices))
+            vertices.append(mesh.vertices * np.array(size, dtype=np.float32) + np.array(offset, dtype=np.float32))
+            normals.append(mesh.normals)  # Axis-aligned scaling keeps these directions
+        self.vertices = np.concatenate(vertices)
+        self.normals = np.concatenate(normals)
+        self.indices = np.concatenate(elements).astype(np.uint32)
+
+        self.buffers = None
+        self.count = 0
+        self.per_instance = len(self.indices)
+
+    def transform(self, instances):
+        """The template placed at each instance's position and scale"""
+        return (self.vertices[None] * instances['scale'][:, None, None]
+                + instances['position'][:, None, :]).reshape(-1, 3)
+
+    def upload(self, instances):
+        """Transform the template for every instance and upload the result"""
+        n = len(instances)
+        per_instance = len(self.vertices)
+        vertices = self.transform(instances)
+        normals = np.tile(self.normals, (n, 1))
+        colors = np.repeat(instances[self.palette], per_instance, axis=0)
+        indices = (self.indices[None, :] + (np.arange(n, dtype=np.uint32) * per_instance)[:, None]).ravel()
+
+        if self.buffers is None:
+            self.buffers = glGenBuffers(4)
+        for target, buffer, data in [
+            (GL_ARRAY_BUFFER, self.buffers[0], vertices),
+            (GL_ARRAY_BUFFER, self.buffers[1], normals),
+            (GL_ARRAY_BUFFER, self.buffers[2], colors),
+            (GL_ELEMENT_ARRAY_BUFFER, self.buffers[3], indices),
+        ]:
+            data = np.ascontiguousarray(data, dtype=np.uint32 if target == GL_ELEMENT_ARRAY_BUFFER else np.float32)
+            glBindBuffer(target, buffer)
+            glBufferData(target, data.nbytes, data, GL_STATIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        self.count = len(indices)
+
+    def upload_instance(self, instances, index):
+        """Re-upload the vertices of one moved instance; normals, colors and indices stay as they are"""
+        vertices = np.ascontiguousarray(self.transform(instances[index:index + 1]), dtype=np.float32)
+        glBindBuffer(GL_ARRAY_BUFFER, self.buffers[0])
+        glBufferSubData(GL_ARRAY_BUFFER, index * vertices.nbytes, vertices.nbytes, vertices)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def draw(self, mask=None):
+        """Draw every instance, or only those where mask is True"""
+        if not self.count:
+            return
+        if mask is not None and not mask.any():
+            return
+        glBindBuffer(GL_ARRAY_BUFFER, self.buffers[0])
+        glVertexPointer(3, GL_FLOAT, 0, None)
+        glBindBuffer(GL_ARRAY_BUFFER, self.buffers[1])
+        glNormalPointer(GL_FLOAT, 0, None)
+        glBindBuffer(GL_ARRAY_BUFFER, self.buffers[2])
+        glColorPointer(3, GL_FLOAT, 0, None)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.buffers[3])
+        if mask is None or mask.all():
+            glDrawElements(self.mode, self.count, GL_UNSIGNED_INT, None)
+        else:
+            # Each instance's indices are one contiguous range: draw the selected ranges in one call
+            first = np.nonzero(mask)[0]
+            counts = np.full(len(first), self.per_instance, dtype=np.int32)
+            offsets = (first * (self.per_instance * 4)).astype(np.uintp)
+            glMultiDrawElements(self.mode, counts, GL_UNSIGNED_INT,
+                                offsets.ctypes.data_as(ctypes.POINTER(ctypes.c_void_p)), len(first))
+
+
+class NPCRenderer:
+    def __init__(self):
+        self.npcs = []
+        self.slots = {}  # NPC -> its index in npcs and instances
+        self.instances = np.zeros(0, dtype=INSTANCE_DTYPE)
+        self.parts = None
+        self.dirty = True
+        self.drawn = 0  # NPCs drawn and culled last frame
+        self.culled = 0
+
+    def set_npcs(self, npcs):
+        """Replace the rendered NPCs and repack the instance buffer"""
+        self.npcs = list(npcs)
+        self.slots = {npc: i for i, npc in enumerate(self.npcs)}
+        self.instances = np.zeros(len(self.npcs), dtype=INSTANCE_DTYPE)
+        for i in range(len(self.npcs)):
+            self.update_npc(i)
+
+    def add_npc(self, npc):
+        self.set_npcs(self.npcs + [npc])
+
+    def update_npc(self, index):
+        """Copy one NPC's position, scale and palette into the instance buffer"""
+        npc = self.npcs[index]
+        instance = self.instances[index]
+        instance['position'] = npc.pos
+        instance['scale'] = npc.scale
+        instance['skin'] = npc.skin_color
+        instance['hair'] = npc.hair_color
+        instance['clothes_primary'] = npc.clothes_primary
+        instance['clothes_secondary'] = npc.clothes_secondary
+        self.dirty = True
+
+    def move_npc(self, npc):
+        """Update one NPC's position in place, uploading only its own vertices"""
+        index = self.slots[npc]
+        self.instances[index]['position'] = npc.pos
+        if self.dirty or self.parts is None:
+            return  # The next draw uploads everything anyway
+        for lods in self.parts:
+            for part in lods:
+                part.upload_instance(self.instances, index)
+
+    def draw(self, frustum=None):
+        """Draw every NPC with one call per body part
+
+        With a frustum, NPCs outside it are skipped and distant ones get lower-detail heads.
+        """
+        if self.parts is None:
+            self.parts = [[PartBatch(mesh(), placements, palette) for mesh in lods]
+                          for lods, placements, palette in BODY_PARTS]
+        if self.dirty:
+            for lods in self.parts:
+                for part in lods:
+                    part.upload(self.instances)
+            self.dirty = False
+
+        visible = lod = None
+        if frustum is not None and len(self.instances):
+            scale = self.instances['scale'][:, None]
+            centers = self.instances['position'] + BOUNDS_CENTER * scale
+            visible = frustum.visible(centers, BOUNDS_RADIUS * scale)
+            lod = frustum.lod(centers)
+        self.drawn = len(self.instances) if visible is None else int(visible.sum())
+        self.culled = len(self.instances) - self.drawn
+
+        glPushAttrib(GL_ENABLE_BIT)
+        glEnable(GL_COLOR_MATERIAL)
+        glPushClientAttrib(GL_CLIENT_VERTEX_ARRAY_BIT)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_NORMAL_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        for lods in self.parts:
+            if visible is None:
+                lods[0].draw()
+                continue
+            part_lod = np.minimum(lod, len(lods) - 1)
+            for level, part in enumerate(lods):
+                part.draw(visible & (part_lod == level))
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        glPopClientAttrib()
+        glPopAttrib()
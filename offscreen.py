@@ -0,0 +1,95 @@
+# Headless rendering: pygame on SDL's dummy video driver and an OpenGL context without a
+# window, from EGL (GPU, or Mesa's llvmpipe on CPU) or OSMesa
+import ctypes
+import os
+import sys
+
+BACKENDS = ("egl", "osmesa")
+
+
+def configure(backend=None):
+    """Point SDL and PyOpenGL at the offscreen backend; must run before OpenGL is imported"""
+    backend = backend or os.getenv("GAME_GL_BACKEND", "egl")
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown offscreen backend {backend!r}, expected one of {BACKENDS}")
+    if "OpenGL.GL" in sys.modules and os.environ.get("PYOPENGL_PLATFORM") != backend:
+        print(f"[Offscreen] OpenGL was imported before configure(), {backend} may not be used")
+    os.environ["PYOPENGL_PLATFORM"] = backend
+    if backend == "egl":
+        os.environ.setdefault("EGL_PLATFORM", "surfaceless")  # No X11 or Wayland needed
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    return backend
+
+
+def create_context(width, height):
+    """Create an offscreen GL context of the configured backend and make it current"""
+    backend = os.environ.get("PYOPENGL_PLATFORM")
+    if backend == "egl":
+        return EGLContext(width, height)
+    if backend == "osmesa":
+        return OSMesaContext(width, height)
+    raise RuntimeError("No offscreen backend configured: call offscreen.configure() before importing OpenGL "
+                       "(run with --headless or GAME_HEADLESS=1)")
+
+
+class EGLContext:
+    """Desktop GL context on an EGL pbuffer surface"""
+
+    def __init__(self, width, height):
+        from OpenGL import EGL
+
+        self.display = EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+        major, minor = EGL.EGLint(), EGL.EGLint()
+        if not EGL.eglInitialize(self.display, ctypes.pointer(major), ctypes.pointer(minor)):
+            raise RuntimeError("[Offscreen] eglInitialize failed")
+        attributes = _int_array(EGL.EGLint, [
+            EGL.EGL_SURFACE_TYPE, EGL.EGL_PBUFFER_BIT,
+            EGL.EGL_RED_SIZE, 8, EGL.EGL_GREEN_SIZE, 8, EGL.EGL_BLUE_SIZE, 8, EGL.EGL_ALPHA_SIZE, 8,
+            EGL.EGL_DEPTH_SIZE, 24,
+            EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT,
+            EGL.EGL_NONE,
+        ])
+        config, count = EGL.EGLConfig(), EGL.EGLint()
+        if not EGL.eglChooseConfig(self.display, attributes, ctypes.pointer(config), 1, ctypes.pointer(count)) \
+                or not count.value:
+            raise RuntimeError("[Offscreen] No EGL config with desktop OpenGL and a depth buffer")
+        size = _int_array(EGL.EGLint, [EGL.EGL_WIDTH, width, EGL.EGL_HEIGHT, height, EGL.EGL_NONE])
+        self.surface = EGL.eglCreatePbufferSurface(self.display, config, size)
+        EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+        self.context = EGL.eglCreateContext(self.display, config, EGL.EGL_NO_CONTEXT, None)
+        if not EGL.eglMakeCurrent(self.display, self.surface, self.surface, self.context):
+            raise RuntimeError("[Offscreen] eglMakeCurrent failed")
+        print(f"[Offscreen] EGL {major.value}.{minor.value} pbuffer {width}x{height}")
+
+    def destroy(self):
+        from OpenGL import EGL
+
+        EGL.eglMakeCurrent(self.display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, EGL.EGL_NO_CONTEXT)
+        EGL.eglDestroyContext(self.display, self.context)
+        EGL.eglDestroySurface(self.display, self.surface)
+        EGL.eglTerminate(self.display)
+
+
+class OSMesaContext:
+    """Mesa's software rasterizer drawing into a buffer in memory"""
+
+    def __init__(self, width, height):
+        from OpenGL import GL, arrays, osmesa
+
+        self.context = osmesa.OSMesaCreateContextExt(osmesa.OSMESA_RGBA, 24, 0, 0, None)
+        if not self.context:
+            raise RuntimeError("[Offscreen] OSMesaCreateContextExt failed")
+        self.buffer = arrays.GLubyteArray.zeros((height, width, 4))
+        if not osmesa.OSMesaMakeCurrent(self.context, self.buffer, GL.GL_UNSIGNED_BYTE, width, height):
+            raise RuntimeError("[Offscreen] OSMesaMakeCurrent failed")
+        print(f"[Offscreen] OSMesa buffer {width}x{height}")
+
+    def destroy(self):
+        from OpenGL import osmesa
+
+        osmesa.OSMesaDestroyContext(self.context)
+
+
+def _int_array(kind, values):
+    return (kind * len(values))(*values)
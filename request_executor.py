@@ -0,0 +1,90 @@
+# Background request execution: a persistent asyncio loop thread that runs slow work
+# (API calls, speech synthesis) and hands the results back to the game loop
+import asyncio
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class RequestExecutor:
+    def __init__(self, name="requests", max_workers=4):
+        self.name = name
+        self.loop = asyncio.new_event_loop()
+        # Blocking calls (e.g. the synchronous OpenAI client) go to this pool
+        self.loop.set_default_executor(ThreadPoolExecutor(max_workers, thread_name_prefix=name))
+        self.results = queue.Queue()  # (callback, args) waiting for poll() on the game thread
+        self.pending = 0
+        self.thread = threading.Thread(target=self._run_loop, name=name, daemon=True)
+        self.thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, fn, *args, on_done=None, on_error=None):
+        """Run fn(*args) in the background and call on_done(result) from poll() when it finishes
+
+        Coroutine functions run on the executor's event loop, plain functions in its thread pool.
+        """
+        if asyncio.iscoroutinefunction(fn):
+            coro = fn(*args)
+        else:
+            coro = self._call_in_pool(fn, *args)
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        self.pending += 1
+        future.add_done_callback(lambda f: self.results.put((self._finish, (f, on_done, on_error))))
+        return future
+
+    def submit_stream(self, generator_fn, *args, on_item=None, on_done=None, on_error=None, stop=None):
+        """Iterate generator_fn(*args) in the thread pool, delivering each item to on_item from poll()
+
+        stop is an optional predicate checked between items to abandon the stream early.
+        """
+        def consume():
+            for item in generator_fn(*args):
+                if stop is not None and stop():
+                    break
+                if on_item is not None:
+                    self.results.put((on_item, (item,)))
+
+        return self.submit(consume, on_done=on_done and (lambda _: on_done()), on_error=on_error)
+
+    def call_soon(self, callback, *args):
+        """Call callback(*args) from the next poll(), i.e. on the game thread; safe from any thread"""
+        self.results.put((callback, args))
+
+    async def _call_in_pool(self, fn, *args):
+        return await self.loop.run_in_executor(None, fn, *args)
+
+    def run_coroutine(self, coro):
+        """Schedule a coroutine on the loop without tracking it for poll()"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def poll(self):
+        """Deliver finished results and streamed items; call once per frame from the game loop"""
+        while True:
+            try:
+                callback, args = self.results.get_nowait()
+            except queue.Empty:
+                break
+            callback(*args)
+
+    def _finish(self, future, on_done, on_error):
+        self.pending -= 1
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            if on_error:
+                on_error(error)
+            else:
+                print(f"[{self.name}] Background request failed: {error}")
+        elif on_done:
+            on_done(future.result())
+
+    def is_busy(self):
+        return self.pending > 0
+
+    def shutdown(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=1)
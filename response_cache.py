@@ -0,0 +1,148 @@
+# Cache of NPC replies, so the questions players keep asking don't each cost a completion
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+
+MAX_ENTRIES = 256
+TTL_SECONDS = 60 * 60  # Replies go stale so NPCs don't repeat themselves forever
+FUZZY_THRESHOLD = 0.75  # Trigram similarity for a paraphrase to count as the same question
+TOPIC_TURNS = 2  # Recent messages a follow-up question is keyed on: the exchange it refers to
+
+# Words that make a question lean on what was said before ("tell me more about that"); other
+# questions mean the same whatever came earlier, so one cached reply serves every conversation
+FOLLOW_UP_WORDS = {"it", "its", "that", "this", "these", "those", "they", "them", "their", "he", "him",
+                   "his", "she", "her", "more", "else", "also", "again", "then", "there"}
+
+
+def normalize(prompt):
+    """Lowercase, drop punctuation and collapse whitespace"""
+    return " ".join(re.sub(r"[^a-z0-9' ]+", " ", prompt.lower()).split())
+
+
+def is_follow_up(prompt):
+    """Whether a prompt refers back to the conversation, by the FOLLOW_UP_WORDS it uses"""
+    return not FOLLOW_UP_WORDS.isdisjoint(normalize(prompt).split())
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(a, b):
+    """Jaccard similarity of two trigram sets"""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class ResponseCache:
+    """Replies keyed by (NPC role, normalized prompt, context), with TTL and LRU eviction
+
+    The context is empty for self-contained questions, so they hit however long the NPC's memory
+    of the conversation is; follow-ups are keyed on the exchange just before them. With fuzzy=True a miss falls back to the most similar cached prompt with the same role and
+    history, so paraphrased questions hit too.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, ttl=TTL_SECONDS, fuzzy=False, threshold=FUZZY_THRESHOLD):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.fuzzy = fuzzy
+        self.threshold = threshold
+        self.lock = threading.Lock()  # Dialogue and speech threads share the cache
+        self.entries = OrderedDict()  # key -> (reply, stored at, latency of the original request)
+        self.buckets = {}  # (role, context hash) -> {normalized prompt: trigrams}, for fuzzy lookups
+        self.exact_hits = 0
+        self.fuzzy_hits = 0
+        self.misses = 0
+        self.latency_saved = 0.0
+
+    @staticmethod
+    def context_hash(prompt, history):
+        """Hash of the conversation a prompt depends on: nothing, or its last TOPIC_TURNS messages"""
+        if not history or not is_follow_up(prompt):
+            return ""
+        data = "\0".join(f"{speaker}:{normalize(text)}" for speaker, text in history[-TOPIC_TURNS:])
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()[:16]
+
+    def get(self, role, prompt, history=None):
+        """Return a cached reply, or None on a miss"""
+        bucket = (role, self.context_hash(prompt, history))
+        text = normalize(prompt)
+        now = time.time()
+        with self.lock:
+            entry = self._lookup(bucket + (text,), now)
+            if entry is not None:
+                self.exact_hits += 1
+            elif self.fuzzy:
+                match = self._closest(bucket, text)
+                if match is not None:
+                    entry = self._lookup(bucket + (match,), now)
+                    if entry is not None:
+                        self.fuzzy_hits += 1
+            if entry is None:
+                self.misses += 1
+                return None
+            self.latency_saved += entry[2]
+            return entry[0]
+
+    def _lookup(self, key, now):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if now - entry[1] > self.ttl:
+            self._remove(key)
+            return None
+        self.entries.move_to_end(key)
+        return entry
+
+    def _closest(self, bucket, text):
+        prompts = self.buckets.get(bucket)
+        if not prompts:
+            return None
+        grams = trigrams(text)
+        best, best_score = None, self.threshold
+        for candidate, candidate_grams in prompts.items():
+            score = similarity(grams, candidate_grams)
+            if score >= best_score:
+                best, best_score = candidate, score
+        return best
+
+    def put(self, role, prompt, reply, history=None, latency=0.0):
+        """Store a reply along with how long the request for it took"""
+        bucket = (role, self.context_hash(prompt, history))
+        text = normalize(prompt)
+        key = bucket + (text,)
+        with self.lock:
+            self.entries[key] = (reply, time.time(), latency)
+            self.entries.move_to_end(key)
+            self.buckets.setdefault(bucket, {})[text] = trigrams(text)
+            while len(self.entries) > self.max_entries:
+                self._remove(next(iter(self.entries)))
+
+    def _remove(self, key):
+        del self.entries[key]
+        bucket, text = key[:2], key[2]
+        prompts = self.buckets.get(bucket)
+        if prompts is not None:
+            prompts.pop(text, None)
+            if not prompts:
+                del self.buckets[bucket]
+
+    def stats(self):
+        lookups = self.exact_hits + self.fuzzy_hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "lookups": lookups,
+            "exact_hits": self.exact_hits,
+            "fuzzy_hits": self.fuzzy_hits,
+            "misses": self.misses,
+            "exact_hit_rate": self.exact_hits / lookups if lookups else 0.0,
+            "fuzzy_hit_rate": self.fuzzy_hits / lookups if lookups else 0.0,
+            "latency_saved_s": self.latency_saved,
+        }
+
+
+responses = ResponseCache(fuzzy=True)  # Shared by the dialogue box and voice replies
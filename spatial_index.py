@@ -0,0 +1,164 @@
+# Uniform-grid spatial hash over the office floor (x, z), for "who is near the player"
+# queries that cost the same with two NPCs or ten thousand
+import math
+
+import numpy as np
+
+CELL_KEY_SPAN = 1 << 31  # Packs a (cx, cz) cell into one int64 sort key
+
+
+class SpatialHash:
+    """Items bucketed into square cells of cell_size; queries only visit the cells they overlap
+
+    A cell size close to the usual query radius keeps a query to the 3x3 cells around it.
+    Items are any hashable objects; move() re-buckets one item only when it changes cell.
+    """
+
+    def __init__(self, cell_size=2.0):
+        self.cell_size = cell_size
+        self.cells = {}  # (cx, cz) -> {item: (x, z)}
+        self.positions = {}  # item -> (x, z, cell)
+        self._arrays = None  # Packed copy for bulk queries, rebuilt after changes
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, item):
+        return item in self.positions
+
+    def cell(self, x, z):
+        return (math.floor(x / self.cell_size), math.floor(z / self.cell_size))
+
+    def insert(self, item, x, z):
+        if item in self.positions:
+            self.move(item, x, z)
+            return
+        cell = self.cell(x, z)
+        self.cells.setdefault(cell, {})[item] = (x, z)
+        self.positions[item] = (x, z, cell)
+        self._arrays = None
+
+    def remove(self, item):
+        x, z, cell = self.positions.pop(item)
+        bucket = self.cells[cell]
+        del bucket[item]
+        if not bucket:
+            del self.cells[cell]
+        self._arrays = None
+
+    def move(self, item, x, z):
+        """Update an item's position"""
+        _, _, old_cell = self.positions[item]
+        cell = self.cell(x, z)
+        if cell != old_cell:
+            bucket = self.cells[old_cell]
+            del bucket[item]
+            if not bucket:
+                del self.cells[old_cell]
+        self.cells.setdefault(cell, {})[item] = (x, z)
+        self.positions[item] = (x, z, cell)
+        self._arrays = None
+
+    def _candidates(self, x, z, radius):
+        """(item, x, z) in every cell the circle overlaps"""
+        x0, z0 = self.cell(x - radius, z - radius)
+        x1, z1 = self.cell(x + radius, z + radius)
+        if (x1 - x0 + 1) * (z1 - z0 + 1) > len(self.cells):
+            # The circle covers more cells than are occupied: walk the occupied ones instead
+            for (cx, cz), bucket in self.cells.items():
+                if x0 <= cx <= x1 and z0 <= cz <= z1:
+                    for item, (ix, iz) in bucket.items():
+                        yield item, ix, iz
+            return
+        for cx in range(x0, x1 + 1):
+            for cz in range(z0, z1 + 1):
+                bucket = self.cells.get((cx, cz))
+                if bucket:
+                    for item, (ix, iz) in bucket.items():
+                        yield item, ix, iz
+
+    def query_radius(self, x, z, radius):
+        """Items strictly within radius of (x, z), nearest first"""
+        radius_sq = radius * radius
+        found = []
+        for item, ix, iz in self._candidates(x, z, radius):
+            distance_sq = (ix - x) ** 2 + (iz - z) ** 2
+            if distance_sq < radius_sq:
+                found.append((distance_sq, item))
+        found.sort(key=lambda pair: pair[0])
+        return [item for _, item in found]
+
+    def nearest(self, x, z, max_distance):
+        """The closest item strictly within max_distance of (x, z), or None"""
+        best, best_sq = None, max_distance * max_distance
+        for item, ix, iz in self._candidates(x, z, max_distance):
+            distance_sq = (ix - x) ** 2 + (iz - z) ** 2
+            if distance_sq < best_sq:
+                best, best_sq = item, distance_sq
+        return best
+
+    def arrays(self):
+        """Items sorted by cell, their (n, 2) positions, and each occupied cell's key and item range
+
+        Cached until the next change, so a crowd that stands still is only packed once.
+        """
+        if self._arrays is None:
+            items = list(self.positions)
+            points = np.array([self.positions[item][:2] for item in items], dtype=np.float64).reshape(-1, 2)
+            keys = self._keys(np.floor(points / self.cell_size).astype(np.int64))
+            order = np.argsort(keys, kind="stable")
+            keys = keys[order]
+            cell_keys, starts, counts = np.unique(keys, return_index=True, return_counts=True)
+            self._arrays = ([items[i] for i in order], points[order], cell_keys, starts, counts)
+        return self._arrays
+
+    @staticmethod
+    def _keys(cells):
+        """One int64 per (cx, cz) cell, so cells can be sorted and binary searched"""
+        return cells[:, 0] * CELL_KEY_SPAN + (cells[:, 1] + CELL_KEY_SPAN // 2)
+
+    def nearest_many(self, queries, max_distance):
+        """Vectorized nearest() for many (x, z) query points at once, e.g. every agent in a crowd
+
+        The same grid search done in NumPy: each query's neighbouring cells are found by binary
+        search over the packed cells, then all candidate distances are computed in one pass.
+        Returns a list with the nearest item (or None) for each query.
+        """
+        items, points, cell_keys, starts, counts = self.arrays()
+        queries = np.asarray(queries, dtype=np.float64).reshape(-1, 2)
+        result = [None] * len(queries)
+        if not items or not len(queries):
+            return result
+
+        # Every (query, candidate item) pair in the cells around each query
+        query_cells = np.floor(queries / self.cell_size).astype(np.int64)
+        reach = math.ceil(max_distance / self.cell_size)
+        pair_queries, pair_items = [], []
+        for dx in range(-reach, reach + 1):
+            for dz in range(-reach, reach + 1):
+                keys = self._keys(query_cells + (dx, dz))
+                slots = np.minimum(np.searchsorted(cell_keys, keys), len(cell_keys) - 1)
+                hit = cell_keys[slots] == keys
+                if not hit.any():
+                    continue
+                cell_counts = counts[slots[hit]]
+                first = np.repeat(starts[slots[hit]] - (np.cumsum(cell_counts) - cell_counts), cell_counts)
+                pair_queries.append(np.repeat(np.nonzero(hit)[0], cell_counts))
+                pair_items.append(first + np.arange(cell_counts.sum()))
+        if not pair_queries:
+            return result
+        pair_queries = np.concatenate(pair_queries)
+        pair_items = np.concatenate(pair_items)
+
+        distance_sq = ((points[pair_items] - queries[pair_queries]) ** 2).sum(axis=1)
+        within = distance_sq < max_distance * max_distance
+        pair_queries, pair_items, distance_sq = pair_queries[within], pair_items[within], distance_sq[within]
+
+        # The closest candidate of each query comes first once sorted by (query, distance)
+        order = np.lexsort((distance_sq, pair_queries))
+        pair_queries, pair_items = pair_queries[order], pair_items[order]
+        first = np.ones(len(pair_queries), dtype=bool)
+        first[1:] = pair_queries[1:] != pair_queries[:-1]
+        for query, item in zip(pair_queries[first], pair_items[first]):
+            result[query] = items[item]
+        return result
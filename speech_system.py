@@ -2,27 +2,295 @@ import os
 import json
 import asyncio
 import websockets
-import sounddevice as sd
 import soundfile as sf
 import speech_recognition as sr
 import openai
 from dotenv import load_dotenv
 import numpy as np
-import tempfile
+import io
 import wave
 import threading
 import queue
 import time
+import re
+from collections import deque
+from tts_cache import TTSCache
+from response_cache import responses
+import llm_client
+from llm_client import NPC_SYSTEM_PROMPT
+from conversation_memory import ConversationMemory
+from request_executor import RequestExecutor
+from stt_backends import create_backend, SAMPLE_RATE as STT_SAMPLE_RATE, FRAME_BYTES as STT_FRAME_BYTES
+from emotion_parser import EmotionTagParser
+from vad import Endpointer, create_vad, SPEECH_START, SPEECH_END
+
+TTS_MODEL = "tts-1"
+TTS_SAMPLERATE = 24000  # OpenAI "pcm" speech is 24 kHz, 16-bit, mono
+PCM_CHUNK_BYTES = 4800  # 100 ms of audio per playback chunk
+
+SENTENCE_END = re.compile(r'[.!?]+["\')\]]*\s+')
+
+
+def pcm_to_float(data):
+    """16-bit little-endian PCM bytes to float32 samples"""
+    data = data[:len(data) // 2 * 2]
+    return np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0
+
+
+def decode_audio(data):
+    """Decode a complete audio file (wav, flac, ...) from memory"""
+    return sf.read(io.BytesIO(data), dtype="float32")
+
+
+class SentenceSplitter:
+    """Cuts streamed text into sentences as soon as each one is complete"""
+
+    def __init__(self, min_chars=20, max_chars=200):
+        self.min_chars = min_chars  # Shorter sentences ("Hi.") are joined to the next one
+        self.max_chars = max_chars  # Run-ons without punctuation are cut at a comma or space
+        self.buffer = ""
+
+    def feed(self, text):
+        """Add streamed text and return the sentences it completed"""
+        self.buffer += text
+        sentences = []
+        start = 0
+        for match in SENTENCE_END.finditer(self.buffer):
+            if match.end() - start >= self.min_chars:
+                sentences.append(self.buffer[start:match.end()].strip())
+                start = match.end()
+        self.buffer = self.buffer[start:]
+
+        while len(self.buffer) > self.max_chars:
+            cut = self.buffer.rfind(", ", 0, self.max_chars) + 1 or self.buffer.rfind(" ", 0, self.max_chars)
+            if cut <= 0:
+                cut = self.max_chars
+            sentences.append(self.buffer[:cut].strip())
+            self.buffer = self.buffer[cut:]
+        return sentences
+
+    def flush(self):
+        """Return whatever is left once the stream has ended"""
+        rest = self.buffer.strip()
+        self.buffer = ""
+        return rest
+
+
+class TextStream:
+    """Text fed from one thread and iterated from another; iteration ends at close()"""
+
+    def __init__(self):
+        self.queue = queue.Queue()
+
+    def feed(self, text):
+        self.queue.put(text)
+
+    def close(self):
+        self.queue.put(None)
+
+    def __iter__(self):
+        while True:
+            text = self.queue.get()
+            if text is None:
+                return
+            yield text
+
+
+class AudioPlayer:
+    """Plays queued audio segments back to back from one output stream, without gaps between them"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.segments = deque()
+        self.position = 0  # Frames of segments[0] already played
+        self.stream = None
+        self.samplerate = None
+        self.channels = None
+        self.idle = threading.Event()
+        self.idle.set()
+
+    def enqueue(self, data, samplerate):
+        """Queue a segment behind the ones already playing (blocks only if the format changes)"""
+        data = np.asarray(data, dtype=np.float32)
+        if data.ndim == 1:
+            data = data.reshape(-1, 1)
+        if self.stream is None or samplerate != self.samplerate or data.shape[1] != self.channels:
+            self.wait()  # Let the previous format finish before reopening the device
+            self._open(samplerate, data.shape[1])
+        with self.lock:
+            self.segments.append(data)
+            self.idle.clear()
+
+    def _open(self, samplerate, channels):
+        self.close()
+        self.samplerate = samplerate
+        self.channels = channels
+        import sounddevice as sd  # Imported on first playback: loading it needs PortAudio
+
+        self.stream = sd.OutputStream(samplerate=samplerate, channels=channels, dtype="float32",
+                                      callback=self._callback)
+        self.stream.start()
+
+    def _callback(self, outdata, frames, time_info, status):
+        filled = 0
+        with self.lock:
+            while filled < frames and self.segments:
+                segment = self.segments[0]
+                count = min(frames - filled, len(segment) - self.position)
+                outdata[filled:filled + count] = segment[self.position:self.position + count]
+                filled += count
+                self.position += count
+                if self.position >= len(segment):
+                    self.segments.popleft()
+                    self.position = 0
+            if not self.segments:
+                self.idle.set()
+        outdata[filled:] = 0  # Silence while idle keeps the stream warm for the next segment
+
+    def wait(self):
+        """Block until everything queued has been played"""
+        self.idle.wait()
+        if self.stream is not None:
+            time.sleep(self.stream.latency)  # The last block is still in the device buffer
+
+    def stop(self):
+        """Drop everything queued; the stream itself keeps running"""
+        with self.lock:
+            self.segments.clear()
+            self.position = 0
+            self.idle.set()
+
+    def close(self):
+        if self.stream is not None:
+            self.stream.stop()
+            self.stream.close()
+            self.stream = None
+
+
+class SpeechPipeline:
+    """Splits a streamed reply into sentences, synthesizes them concurrently and plays them in order
+
+    synthesize(text) is a blocking generator of (data, samplerate) chunks, iterated in the loop's
+    thread pool; player needs enqueue(data, samplerate) and wait(), like AudioPlayer.
+    """
+
+    def __init__(self, synthesize, player, max_parallel=2):
+        self.synthesize = synthesize
+        self.player = player
+        self.max_parallel = max_parallel  # TTS requests in flight at once
+        self.sentences = []
+        self.cancelled = threading.Event()
+        self.started_at = None
+        self.first_audio_at = None
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def text(self):
+        return " ".join(self.sentences)
+
+    async def run(self, tokens):
+        """Speak the text of tokens (any iterable of text chunks, consumed in a worker thread)"""
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.max_parallel)
+        sentences = asyncio.Queue()
+        segments = asyncio.Queue()  # (audio chunk queue, synthesis task) in sentence order, None at the end
+        self.started_at = time.perf_counter()
+
+        def pump():
+            splitter = SentenceSplitter()
+            try:
+                for token in tokens:
+                    if self.cancelled.is_set():
+                        return
+                    for sentence in splitter.feed(token):
+                        loop.call_soon_threadsafe(sentences.put_nowait, sentence)
+                rest = splitter.flush()
+                if rest:
+                    loop.call_soon_threadsafe(sentences.put_nowait, rest)
+            finally:
+                loop.call_soon_threadsafe(sentences.put_nowait, None)
+
+        async def synthesize(sentence, chunks):
+            def fetch():
+                try:
+                    for chunk in self.synthesize(sentence):
+                        if self.cancelled.is_set():
+                            return
+                        loop.call_soon_threadsafe(chunks.put_nowait, chunk)
+                finally:
+                    loop.call_soon_threadsafe(chunks.put_nowait, None)
+
+            async with semaphore:
+                if self.cancelled.is_set():
+                    chunks.put_nowait(None)
+                    return
+                await loop.run_in_executor(None, fetch)
+
+        pumping = loop.run_in_executor(None, pump)
+        playing = asyncio.ensure_future(self._play(segments))
+        try:
+            while True:
+                sentence = await sentences.get()
+                if sentence is None:
+                    break
+                self.sentences.append(sentence)
+                chunks = asyncio.Queue()
+                await segments.put((chunks, asyncio.ensure_future(synthesize(sentence, chunks))))
+            await segments.put(None)
+            await playing
+            await pumping  # Re-raise a failed text stream
+        except BaseException:
+            self.cancel()
+            playing.cancel()
+            raise
+
+    async def _play(self, segments):
+        loop = asyncio.get_running_loop()
+        while True:
+            segment = await segments.get()
+            if segment is None:
+                break
+            chunks, task = segment
+            # Chunks of a sentence play as they arrive, while later sentences buffer behind it
+            while True:
+                chunk = await chunks.get()
+                if chunk is None or self.cancelled.is_set():
+                    break
+                if self.first_audio_at is None:
+                    self.first_audio_at = time.perf_counter()
+                    print(f"[Speech] First audio after {(self.first_audio_at - self.started_at) * 1000:.0f} ms")
+                await loop.run_in_executor(None, self.player.enqueue, *chunk)
+            await task  # Re-raise a failed synthesis
+            if self.cancelled.is_set():
+                return
+        await loop.run_in_executor(None, self.player.wait)
+
 
 class SpeechSystem:
     def __init__(self):
         load_dotenv()
         openai.api_key = os.getenv('OPENAI_API_KEY')
-        self.recognizer = sr.Recognizer()
-        self.audio_queue = queue.Queue()
+        self.stt = create_backend()  # Offline Vosk when installed, Google otherwise
+        self.partial_transcript = ""  # What the player has said so far in the current utterance
+        self.barge_in = True  # Talking over the NPC interrupts it
+        self.worker = RequestExecutor("speech", max_workers=6)  # Long-lived loop for listening and replies
+        self.audio_queue = None  # Utterances from the listener, created and used only on the worker loop
+        self.worker_future = None  # The _speech_worker coroutine while listening
+        self.current_task = None  # Utterance being answered
         self.is_listening = False
+        self.listen_lock = threading.Lock()
+        self.listen_thread = None
         self.is_speaking = False
+        self.player = AudioPlayer()
+        self.pipeline = None  # SpeechPipeline currently speaking
+        self.tts_parallel = 2  # Sentences synthesized at once
+        self.tts_format = "pcm"  # Streamed raw audio; other formats are decoded in memory once complete
+        self.tts_cache = TTSCache()
         self.current_npc_voice = "alloy"  # Default voice
+        self.npc_role = None  # NPC being talked to, part of the response cache key
+        self.on_emotion = None  # Called with each emotion of a spoken reply, from the speech thread
+        self.memory = ConversationMemory()  # Replaced by the dialogue's, so spoken and typed turns share it
         self.voice_settings = {
             "alloy": {"speed": 1.0, "pitch": 1.0, "description": "Balanced, neutral voice"},
             "echo": {"speed": 1.0, "pitch": 1.0, "description": "Clear, articulate voice"},
@@ -66,56 +334,149 @@ class SpeechSystem:
             print(f"Unknown emotion: {emotion}, using default voice settings")
             
     def start_listening(self):
-        """Start listening for speech input"""
-        self.is_listening = True
-        threading.Thread(target=self._listen_loop, daemon=True).start()
-        threading.Thread(target=self._process_audio_queue, daemon=True).start()
+        """Start listening for speech input (calling it again while listening does nothing)"""
+        with self.listen_lock:
+            self.is_listening = True
+            # A listener that is still winding down just keeps going instead of getting a twin
+            if self.listen_thread is None:
+                self.listen_thread = threading.Thread(target=self._listen_loop, name="speech-listener", daemon=True)
+                self.listen_thread.start()
+        if self.worker_future is None or self.worker_future.done():
+            self.worker_future = self.worker.run_coroutine(self._speech_worker())
         
     def stop_listening(self):
-        """Stop listening for speech input"""
-        self.is_listening = False
+        """Stop listening for speech input and cancel the utterance being processed"""
+        with self.listen_lock:
+            self.is_listening = False
+        if self.worker_future is not None:
+            self.worker_future.cancel()
+            self.worker_future = None
         
     def _listen_loop(self):
         """Background thread for continuous speech recognition"""
         print("Starting speech recognition loop...")
-        with sr.Microphone() as source:
-            print("Microphone initialized")
-            self.recognizer.adjust_for_ambient_noise(source)
-            print("Ambient noise adjusted")
-            while self.is_listening:
+        while True:
+            try:
+                self._listen_stream()
+            except Exception as e:
+                print(f"Error in speech recognition: {e}")
+                with self.listen_lock:
+                    self.is_listening = False
+            with self.listen_lock:
+                if not self.is_listening:
+                    self.listen_thread = None
+                    return
+            # start_listening() ran while the stream was closing and left it to this thread,
+            # so listen again rather than leave is_listening set with no listener
+                
+    def _still_listening(self):
+        with self.listen_lock:
+            return self.is_listening
+                    
+    def _listen_stream(self):
+        """Segment the raw microphone stream with VAD and feed each utterance to the STT backend"""
+        frames = queue.Queue()
+        
+        def callback(indata, frame_count, time_info, status):
+            frames.put(bytes(indata))
+            
+        import sounddevice as sd  # Imported when the microphone opens: loading it needs PortAudio
+
+        endpointer = Endpointer(create_vad())
+        session = None
+        partial = ""
+        with sd.RawInputStream(samplerate=STT_SAMPLE_RATE, blocksize=STT_FRAME_BYTES // 2, channels=1,
+                               dtype="int16", callback=callback):
+            print(f"Microphone initialized, transcribing with {self.stt.name}")
+            while self._still_listening():
                 try:
-                    print("Listening for speech...")
-                    audio = self.recognizer.listen(source, timeout=1, phrase_time_limit=10)
-                    print("Audio captured, adding to queue")
-                    self.audio_queue.put(audio)
-                except sr.WaitTimeoutError:
+                    frame = frames.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                event = endpointer.process(frame)
+                if event == SPEECH_START:
+                    print("Speech started")
+                    if self.barge_in and self.is_speaking:
+                        print("Player is talking over the NPC, interrupting")
+                        self.interrupt_speech()
+                    session = self.stt.session()
+                    ended = any([session.accept(onset_frame) for onset_frame in endpointer.onset])
+                elif session is not None:
+                    ended = session.accept(frame)
+                else:
                     continue
-                except Exception as e:
-                    print(f"Error in speech recognition: {e}")
+                
+                if self.stt.streaming:
+                    text = session.partial()
+                    if text != partial:
+                        partial = self.partial_transcript = text
+                        print(f"[STT] ...{text}")
+                # Whichever notices first ends the utterance: the VAD or the STT engine
+                if event == SPEECH_END or ended:
+                    print("End of speech, adding to queue")
+                    self._submit_utterance(session)
+                    endpointer.reset()
+                    session = None
+                    partial = ""
                     
-    async def process_speech(self, audio_data):
-        """Process speech input and get response from OpenAI"""
+    def _submit_utterance(self, session):
+        self.partial_transcript = ""
+        self.worker.loop.call_soon_threadsafe(self._enqueue_utterance, session)
+
+    def _enqueue_utterance(self, session):
+        """Runs on the speech loop"""
+        self._utterances().put_nowait(session)
+
+    def _utterances(self):
+        """The utterance queue, created on the speech loop that is its only user"""
+        if self.audio_queue is None:
+            self.audio_queue = asyncio.Queue()
+        return self.audio_queue
+                    
+    async def _speech_worker(self):
+        """Answer utterances as they arrive; runs on the speech loop until stop_listening"""
+        print("Starting speech worker...")
+        utterances = self._utterances()
+        try:
+            while True:
+                audio = await utterances.get()
+                # Only the latest utterance matters, drop any that piled up meanwhile
+                while not utterances.empty():
+                    audio = utterances.get_nowait()
+                print("Processing audio from queue...")
+                task = self.current_task = asyncio.ensure_future(self.process_speech(audio))
+                try:
+                    await asyncio.wait([task])  # Unlike await task, interrupting the reply doesn't stop the worker
+                finally:
+                    task.cancel()  # Stopping the worker stops the reply too
+                    self.current_task = None
+                if task.cancelled():
+                    print("Utterance processing cancelled")
+        finally:
+            self.is_speaking = False
+                    
+    async def process_speech(self, session):
+        """Process a captured utterance (an STT session) and speak the reply"""
         try:
-            # Convert audio to text
+            # Finish the transcript; streaming backends already have it, Google makes its request now
             print("Converting speech to text...")
-            text = self.recognizer.recognize_google(audio_data)
+            loop = asyncio.get_running_loop()
+            text = await loop.run_in_executor(None, session.final)
             if not text:
                 print("No speech detected")
                 return None, None
             print(f"Recognized text: {text}")
             
-            # Get response from OpenAI
+            # Speak the reply sentence by sentence while it is still being generated
             print("Getting OpenAI response...")
-            response = await self._get_openai_response(text)
+            response = await self.speak_stream(self._stream_openai_response(text))
             if not response:
                 print("No response from OpenAI")
                 return None, None
             print(f"OpenAI response: {response}")
-            
-            # Convert response to speech
-            print("Converting response to speech...")
-            await self._text_to_speech(response)
-            print("Speech conversion complete")
+            # Both turns are remembered only once the reply is complete, not for a failed one
+            self.memory.add(self.npc_role, "Player", text)
+            self.memory.add(self.npc_role, "NPC", response)
             
             return text, response
         except sr.UnknownValueError:
@@ -128,41 +489,51 @@ class SpeechSystem:
             print(f"Error processing speech: {e}")
             return None, None
             
-    async def _get_openai_response(self, text):
-        """Get response from OpenAI API with emotion detection"""
-        try:
-            client = openai.OpenAI()
-            response = client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are an NPC in a game. Respond naturally and include an emotion tag at the start of your response in the format [EMOTION:emotion_name]. Available emotions: happy, sad, angry, excited, calm, friendly, authoritative."},
-                    {"role": "user", "content": text}
-                ],
-                stream=True
-            )
+    def _stream_openai_response(self, text):
+        """Yield the reply text as it streams in, changing the voice at each emotion tag"""
+        parser = EmotionTagParser(self._reply_emotion)
+        for content in self._reply_tokens(text):
+            visible = parser.feed(content)
+            if visible:
+                yield visible
+        visible = parser.flush()
+        if visible:
+            yield visible
             
-            full_response = ""
-            emotion = None
+    def _reply_emotion(self, emotion):
+        self.adjust_voice_for_emotion(emotion)
+        if self.on_emotion is not None:
+            self.on_emotion(emotion)
+
+    def _reply_tokens(self, text):
+        """Raw reply tokens, from the response cache when this question was answered before"""
+        history = self.memory.recent(self.npc_role)
+        cached = responses.get(self.npc_role, text, history)
+        if cached is not None:
+            yield cached
+            return
+        
+        # The NPC remembers the conversation so far, within a fixed token budget
+        messages, prompt_tokens = self.memory.build_messages(self.npc_role, NPC_SYSTEM_PROMPT, text)
+        print(f"[Memory] {self.npc_role}: {prompt_tokens} prompt tokens")
+        started = time.perf_counter()
+        raw = []
+        for content in llm_client.stream_chat(messages):
+            raw.append(content)
+            yield content
+        responses.put(self.npc_role, text, "".join(raw), history=history, latency=time.perf_counter() - started)
             
-            for chunk in response:
-                if chunk.choices[0].delta.content:
-                    content = chunk.choices[0].delta.content
-                    full_response += content
-                    
-                    # Check for emotion tag at the start
-                    if not emotion and full_response.startswith("[EMOTION:"):
-                        end_tag = full_response.find("]")
-                        if end_tag != -1:
-                            emotion = full_response[9:end_tag].lower()
-                            full_response = full_response[end_tag + 1:].strip()
-                            
-            if emotion:
-                self.adjust_voice_for_emotion(emotion)
-                
-            return full_response
-        except Exception as e:
-            print(f"Error getting OpenAI response: {e}")
-            return None
+    async def speak_stream(self, tokens):
+        """Speak streamed text as it arrives and return everything that was spoken"""
+        pipeline = self.pipeline = SpeechPipeline(self._synthesize, self.player, self.tts_parallel)
+        self.is_speaking = True
+        try:
+            await pipeline.run(tokens)
+        finally:
+            if self.pipeline is pipeline:
+                self.pipeline = None
+                self.is_speaking = False
+        return pipeline.text()
             
     async def _text_to_speech(self, text):
         """Convert text to speech using OpenAI's TTS API"""
@@ -170,50 +541,67 @@ class SpeechSystem:
             return
             
         try:
-            self.is_speaking = True
-            
-            # Get voice settings
-            voice_settings = self.voice_settings[self.current_npc_voice]
-            
-            # Generate speech
-            client = openai.OpenAI()
-            response = client.audio.speech.create(
-                model="tts-1",
-                voice=self.current_npc_voice,
-                input=text,
-                speed=voice_settings["speed"]
-            )
+            await self.speak_stream([text])
+        except Exception as e:
+            print(f"Error in text-to-speech: {e}")
             
-            # Save to temporary file
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-                temp_file.write(response.content)
-                temp_file_path = temp_file.name
-                
-            # Play the audio
-            data, samplerate = sf.read(temp_file_path)
-            sd.play(data, samplerate)
-            sd.wait()
+    def _synthesize(self, text, voice=None, speed=None):
+        """Yield one sentence as (samples, samplerate) chunks while the audio downloads
+
+        Runs in a worker thread. Raw PCM needs no decoding, so playback can start on the first chunk.
+        Lines already in the TTS cache are played from disk without a request.
+        """
+        voice = voice or self.current_npc_voice
+        if speed is None:
+            speed = self.voice_settings[voice]["speed"]
+        key = TTSCache.key(text, voice, speed, TTS_MODEL, self.tts_format)
+        cached = self.tts_cache.get(key)
+        if cached is not None:
+            yield from self._decode(cached)
+            return
+
+        chunks = llm_client.stream_speech(text, voice, speed, TTS_MODEL, self.tts_format, PCM_CHUNK_BYTES)
+        if self.tts_format == "pcm":
+            audio = bytearray()
+            for chunk in chunks:
+                audio += chunk
+                yield pcm_to_float(chunk), TTS_SAMPLERATE
+        else:
+            audio = b"".join(chunks)
+            yield decode_audio(audio)
+        # Only reached when the whole utterance was played, not when interrupted
+        self.tts_cache.put(key, bytes(audio))
             
-            # Clean up
-            os.unlink(temp_file_path)
-            self.is_speaking = False
+    def _decode(self, audio):
+        if self.tts_format == "pcm":
+            for start in range(0, len(audio), PCM_CHUNK_BYTES):
+                yield pcm_to_float(audio[start:start + PCM_CHUNK_BYTES]), TTS_SAMPLERATE
+        else:
+            yield decode_audio(audio)
             
-        except Exception as e:
-            print(f"Error in text-to-speech: {e}")
-            self.is_speaking = False
+    def prewarm(self, lines):
+        """Synthesize (text, voice, speed) lines that aren't cached yet (blocking, run in the background)"""
+        for text, voice, speed in lines:
+            splitter = SentenceSplitter()  # Cache the same sentences the pipeline will ask for
+            sentences = splitter.feed(text) + [splitter.flush()]
+            for sentence in filter(None, sentences):
+                if TTSCache.key(sentence, voice, speed, TTS_MODEL, self.tts_format) in self.tts_cache:
+                    continue
+                for _ in self._synthesize(sentence, voice, speed):
+                    pass
+        print(f"[TTSCache] Prewarmed {len(lines)} lines: {self.tts_cache.stats()}")
             
     def interrupt_speech(self):
         """Interrupt current speech output and clear any pending audio"""
         if self.is_speaking:
             try:
-                sd.stop()
+                if self.pipeline is not None:
+                    self.pipeline.cancel()
+                    self.pipeline = None
+                self.player.stop()
                 self.is_speaking = False
-                # Clear any pending audio in the queue
-                while not self.audio_queue.empty():
-                    try:
-                        self.audio_queue.get_nowait()
-                    except queue.Empty:
-                        break
+                # Cancel the utterance being answered and clear any pending audio
+                self.worker.loop.call_soon_threadsafe(self._cancel_pending)
                 print("Speech interrupted and queue cleared")
             except Exception as e:
                 print(f"Error during speech interruption: {e}")
@@ -223,23 +611,10 @@ class SpeechSystem:
         """Check if the system is currently speaking"""
         return self.is_speaking
 
-    def _process_audio_queue(self):
-        """Process audio from the queue"""
-        print("Starting audio queue processing...")
-        while self.is_listening:
-            try:
-                if not self.audio_queue.empty() and not self.is_speaking:
-                    print("Processing audio from queue...")
-                    audio = self.audio_queue.get()
-                    # Clear any remaining audio in queue to prevent buildup
-                    while not self.audio_queue.empty():
-                        try:
-                            self.audio_queue.get_nowait()
-                        except queue.Empty:
-                            break
-                    asyncio.run(self.process_speech(audio))
-            except Exception as e:
-                print(f"Error processing audio queue: {e}")
-                # Ensure we don't get stuck in an error state
-                self.is_speaking = False
-            time.sleep(0.1)  # Small delay to prevent CPU overuse 
\ No newline at end of file
+    def _cancel_pending(self):
+        """Runs on the speech loop"""
+        if self.current_task is not None:
+            self.current_task.cancel()
+        utterances = self._utterances()
+        while not utterances.empty():
+            utterances.get_nowait()
@@ -0,0 +1,121 @@
+# Startup timing and lazy subsystems: how long each import and init step takes, when the
+# first frame appears, and subsystems that load on first use or on a background thread
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+EAGER = os.getenv("GAME_EAGER_LOAD") == "1"  # Load every lazy subsystem up front, e.g. to compare startup times
+
+
+class StartupProfiler:
+    """Import and init time per subsystem, and time to the first frame"""
+
+    def __init__(self):
+        self.start = time.perf_counter()  # When app.py started importing
+        self.phases = []  # (name, kind, ms, background)
+        self.first_frame_ms = None
+        self.lock = threading.Lock()
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.start) * 1000
+
+    @contextmanager
+    def measure(self, name, kind="init"):
+        """Time the block as one startup phase of the given kind ("import" or "init")"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, kind, (time.perf_counter() - start) * 1000)
+
+    def record(self, name, kind, ms):
+        background = threading.current_thread() is not threading.main_thread()
+        with self.lock:
+            self.phases.append((name, kind, ms, background))
+        if self.first_frame_ms is not None:
+            # Too late for the first-frame report, so say it now
+            where = "in the background" if background else "on first use"
+            print(f"[Startup] {name} {kind} {ms:.0f} ms, {where}")
+
+    def first_frame(self):
+        """Call after the first frame is presented; prints the report once"""
+        if self.first_frame_ms is None:
+            self.first_frame_ms = self.elapsed_ms()
+            self.report()
+
+    def report(self):
+        with self.lock:
+            phases = list(self.phases)
+        for name, kind, ms, background in phases:
+            note = "  (background)" if background else ""
+            print(f"[Startup] {kind:<6} {name:<20} {ms:8.1f} ms{note}")
+        if self.first_frame_ms is not None:
+            print(f"[Startup] First frame after {self.first_frame_ms:.0f} ms")
+
+    def summary(self):
+        with self.lock:
+            phases = list(self.phases)
+        return {
+            "first_frame_ms": self.first_frame_ms,
+            "phases": [{"name": name, "kind": kind, "ms": ms, "background": background}
+                       for name, kind, ms, background in phases],
+        }
+
+
+profiler = StartupProfiler()
+
+
+class LazySubsystem:
+    """A subsystem built by factory() on first get(), or ahead of time by warm_up() on a thread"""
+
+    def __init__(self, name, factory):
+        self.name = name
+        self.factory = factory
+        self.value = None
+        self.error = None
+        self.lock = threading.Lock()
+        self.thread = None
+        if EAGER and not self.available():
+            # Same as a failed warm-up: the error is kept in self.error and the game starts without it
+            print(f"[Startup] {self.name} failed to load: {self.error}")
+
+    @property
+    def loaded(self):
+        return self.value is not None
+
+    def get(self):
+        """The subsystem, loading it now if needed (waits for a warm-up already in progress)"""
+        if self.value is None:
+            with self.lock:
+                if self.value is None:
+                    if self.error is not None:
+                        raise self.error
+                    try:
+                        with profiler.measure(self.name):
+                            self.value = self.factory()
+                    except Exception as e:
+                        self.error = e  # Don't retry a broken import every frame
+                        raise
+        return self.value
+
+    def available(self):
+        """Whether the subsystem loads, loading it now if needed; never raises (see error)"""
+        try:
+            self.get()
+        except Exception:
+            return False
+        return True
+
+    def warm_up(self):
+        """Start loading on a background thread; returns immediately"""
+        if self.loaded or self.thread is not None:
+            return
+        self.thread = threading.Thread(target=self._warm_up, name=f"warmup-{self.name}", daemon=True)
+        self.thread.start()
+
+    def _warm_up(self):
+        try:
+            self.get()
+        except Exception as e:
+            print(f"[Startup] {self.name} failed to load in the background: {e}")
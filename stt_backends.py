@@ -0,0 +1,123 @@
+# Speech-to-text backends behind one interface: audio frames go in as they are captured,
+# partial transcripts come out while the player talks and the final one at the end of speech
+import json
+import os
+import wave
+
+import numpy as np
+import speech_recognition as sr
+
+SAMPLE_RATE = 16000  # 16-bit mono PCM throughout
+FRAME_MS = 30
+FRAME_BYTES = SAMPLE_RATE * FRAME_MS // 1000 * 2
+VOSK_MODEL_PATH = os.getenv("VOSK_MODEL_PATH", "models/vosk-model-small-en-us-0.15")
+
+
+class GoogleBackend:
+    """Google Web Speech through speech_recognition: online, transcribes once the phrase is complete"""
+    name = "google"
+    streaming = False  # No partials, and no end-of-speech detection of its own
+
+    def __init__(self, recognizer=None):
+        self.recognizer = recognizer or sr.Recognizer()
+
+    def session(self):
+        return GoogleSession(self.recognizer)
+
+
+class GoogleSession:
+    def __init__(self, recognizer):
+        self.recognizer = recognizer
+        self.frames = []
+
+    def accept(self, frame):
+        """Buffer a frame; returns True when the engine has found the end of the utterance"""
+        self.frames.append(frame)
+        return False
+
+    def partial(self):
+        return ""
+
+    def final(self):
+        """Final transcript ("" if nothing was understood); may block on the network"""
+        audio = sr.AudioData(b"".join(self.frames), SAMPLE_RATE, 2)
+        try:
+            return self.recognizer.recognize_google(audio)
+        except sr.UnknownValueError:
+            return ""
+
+
+class VoskBackend:
+    """Vosk (Kaldi) running locally on the CPU: no network, partials while the player talks"""
+    name = "vosk"
+    streaming = True
+
+    def __init__(self, model_path=VOSK_MODEL_PATH):
+        try:
+            import vosk
+        except ImportError:
+            raise RuntimeError("Vosk is not installed (pip install vosk)")
+        if not os.path.isdir(model_path):
+            raise RuntimeError(f"Vosk model not found at {model_path} (download one from alphacephei.com/vosk/models)")
+        vosk.SetLogLevel(-1)
+        self.vosk = vosk
+        self.model = vosk.Model(model_path)
+
+    def session(self):
+        return VoskSession(self.vosk.KaldiRecognizer(self.model, SAMPLE_RATE))
+
+
+class VoskSession:
+    def __init__(self, recognizer):
+        self.recognizer = recognizer
+        self.result = None  # Set once Vosk reports the end of the utterance
+
+    def accept(self, frame):
+        if self.result is None and self.recognizer.AcceptWaveform(frame):
+            self.result = json.loads(self.recognizer.Result())["text"]
+        return self.result is not None
+
+    def partial(self):
+        if self.result is not None:
+            return self.result
+        return json.loads(self.recognizer.PartialResult())["partial"]
+
+    def final(self):
+        if self.result is None:
+            self.result = json.loads(self.recognizer.FinalResult())["text"]
+        return self.result
+
+
+BACKENDS = {
+    "google": GoogleBackend,
+    "vosk": VoskBackend,
+}
+
+
+def create_backend(name=None):
+    """Build the named backend (STT_BACKEND, default vosk), falling back to Google if it can't load"""
+    name = name or os.getenv("STT_BACKEND", "vosk")
+    try:
+        return BACKENDS[name]()
+    except (KeyError, RuntimeError) as e:
+        print(f"[STT] Backend {name!r} unavailable ({e}), using Google")
+        return GoogleBackend()
+
+
+def read_wav(path):
+    """Load a WAV file as 16 kHz 16-bit mono PCM bytes"""
+    with wave.open(path, "rb") as wav:
+        channels, width, rate = wav.getnchannels(), wav.getsampwidth(), wav.getframerate()
+        data = wav.readframes(wav.getnframes())
+    if width != 2:
+        raise ValueError(f"{path}: only 16-bit WAV files are supported")
+    samples = np.frombuffer(data, dtype="<i2").reshape(-1, channels).mean(axis=1)
+    if rate != SAMPLE_RATE:
+        positions = np.arange(0, len(samples), rate / SAMPLE_RATE)
+        samples = np.interp(positions, np.arange(len(samples)), samples)
+    return samples.astype("<i2").tobytes()
+
+
+def iter_frames(pcm, frame_bytes=FRAME_BYTES):
+    for start in range(0, len(pcm), frame_bytes):
+        yield pcm[start:start + frame_bytes]
@@ -0,0 +1,230 @@
+# Shared text subsystem: fonts loaded once, cached layouts and a glyph atlas texture
+from collections import OrderedDict
+
+import numpy as np
+import pygame
+from OpenGL.GL import *
+
+from texture_manager import textures
+
+ATLAS_SIZE = 512
+LAYOUT_CACHE_SIZE = 512
+
+_fonts = {}
+_renderers = {}
+
+
+def get_font(size):
+    """Load the default font at this size once and share it"""
+    font = _fonts.get(size)
+    if font is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        font = _fonts[size] = pygame.font.Font(None, size)
+    return font
+
+
+def get_text_renderer(size):
+    """Return the shared TextRenderer for the default font at this size"""
+    renderer = _renderers.get(size)
+    if renderer is None:
+        renderer = _renderers[size] = TextRenderer(get_font(size), f"glyphs_{size}")
+    return renderer
+
+
+class GlyphAtlas:
+    """Every glyph of one font rasterized once into a single texture"""
+
+    def __init__(self, font, name):
+        self.font = font
+        self.name = name  # Texture name in the texture manager
+        self.width = ATLAS_SIZE
+        self.height = ATLAS_SIZE
+        self.surface = None
+        self.texture = None
+        self.glyphs = {}  # char -> (x, y, w, h) in atlas pixels
+        self.pen_x = 0
+        self.pen_y = 0
+        self.row_height = 0
+        self.version = 0  # Bumped whenever texture coordinates change
+
+    def _create(self):
+        # White glyphs with coverage in alpha, so glColor tints them
+        self.surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+        self.surface.fill((255, 255, 255, 0))
+        self._upload_all()
+        for ch in map(chr, range(32, 127)):  # Printable ASCII up front
+            self.glyph(ch)
+
+    def _upload_all(self):
+        texture_data = pygame.image.tostring(self.surface, "RGBA", False)
+        self.texture = textures.allocate(self.name, self.width, self.height, texture_data)
+
+    def _grow(self):
+        old = self.surface
+        self.height *= 2
+        self.surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+        self.surface.fill((255, 255, 255, 0))
+        self.surface.blit(old, (0, 0))
+        self._upload_all()
+        self.version += 1
+
+    def glyph(self, ch):
+        """Return the atlas rectangle of a glyph, rasterizing it on first use"""
+        rect = self.glyphs.get(ch)
+        if rect is not None:
+            return rect
+        if self.texture is None:
+            self._create()
+            return self.glyph(ch)
+
+        width, height = self.font.size(ch)
+        if width == 0:
+            rect = self.glyphs[ch] = (0, 0, 0, 0)
+            return rect
+
+        # Simple shelf packing
+        if self.pen_x + width > self.width:
+            self.pen_x = 0
+            self.pen_y += self.row_height + 1
+            self.row_height = 0
+        while self.pen_y + height > self.height:
+            self._grow()
+
+        glyph_surface = self.font.render(ch, True, (255, 255, 255))
+        self.surface.blit(glyph_surface, (self.pen_x, self.pen_y), special_flags=pygame.BLEND_RGBA_MAX)
+        rect = self.glyphs[ch] = (self.pen_x, self.pen_y, width, height)
+
+        texture_data = pygame.image.tostring(self.surface.subsurface(rect), "RGBA", False)
+        textures.update(self.name, rect[0], rect[1], width, height, texture_data)
+
+        self.pen_x += width + 1
+        self.row_height = max(self.row_height, height)
+        return rect
+
+
+class TextRenderer:
+    def __init__(self, font, name):
+        self.font = font
+        self.line_height = font.get_linesize()
+        self.atlas = GlyphAtlas(font, name)
+        self.widths = {}  # Per-glyph widths
+        self.advances = {}  # (previous char, char) -> pen advance, so kerning matches font.render
+        self.layouts = OrderedDict()  # (text, width) -> wrapped lines
+        self.meshes = OrderedDict()  # text -> (atlas version, vertices, texcoords)
+
+    def glyph_width(self, ch):
+        width = self.widths.get(ch)
+        if width is None:
+            width = self.widths[ch] = self.font.size(ch)[0]
+        return width
+
+    def advance(self, prev, ch):
+        key = (prev, ch)
+        advance = self.advances.get(key)
+        if advance is None:
+            advance = self.advances[key] = self.font.size(prev + ch)[0] - self.glyph_width(ch)
+        return advance
+
+    def pen_positions(self, text):
+        """x offset of every character of text"""
+        positions = []
+        pen = 0
+        prev = None
+        for ch in text:
+            if prev is not None:
+                pen += self.advance(prev, ch)
+            positions.append(pen)
+            prev = ch
+        return positions
+
+    def measure(self, text):
+        """Width of text in pixels, from the cached glyph width tables"""
+        if not text:
+            return 0
+        return self.pen_positions(text)[-1] + self.glyph_width(text[-1])
+
+    def wrap(self, text, max_width):
+        """Split text into lines no wider than max_width (memoized)"""
+        key = (text, max_width)
+        lines = self.layouts.get(key)
+        if lines is not None:
+            self.layouts.move_to_end(key)
+            return lines
+
+        lines = []
+        current_line = []
+        current_width = 0
+        for word in text.split():
+            word_width = self.measure(word + ' ')
+            if current_width + word_width <= max_width or not current_line:
+                current_line.append(word)
+                current_width += word_width
+            else:
+                lines.append(' '.join(current_line))
+                current_line = [word]
+                current_width = word_width
+        if current_line:
+            lines.append(' '.join(current_line))
+
+        self.layouts[key] = lines
+        if len(self.layouts) > LAYOUT_CACHE_SIZE:
+            self.layouts.popitem(last=False)
+        return lines
+
+    def _mesh(self, text):
+        """Quad vertices and texture coordinates for a line of text (memoized)"""
+        mesh = self.meshes.get(text)
+        if mesh is not None and mesh[0] == self.atlas.version:
+            self.meshes.move_to_end(text)
+            return mesh
+
+        rects = [self.atlas.glyph(ch) for ch in text]  # May grow the atlas, so look these up first
+        vertices, texcoords = [], []
+        for (x, y, w, h), pen in zip(rects, self.pen_positions(text)):
+            if w:
+                u0, v0 = x / self.atlas.width, y / self.atlas.height
+                u1, v1 = (x + w) / self.atlas.width, (y + h) / self.atlas.height
+                vertices += [(pen, 0), (pen + w, 0), (pen + w, h), (pen, h)]
+                texcoords += [(u0, v0), (u1, v0), (u1, v1), (u0, v1)]
+
+        mesh = (
+            self.atlas.version,
+            np.array(vertices, dtype=np.float32).reshape(-1, 2),
+            np.array(texcoords, dtype=np.float32).reshape(-1, 2),
+        )
+        self.meshes[text] = mesh
+        if len(self.meshes) > LAYOUT_CACHE_SIZE:
+            self.meshes.popitem(last=False)
+        return mesh
+
+    def draw(self, text, x, y, color, alpha=255):
+        """Draw text with its top-left corner at (x, y) in a y-down 2D projection"""
+        if not text:
+            return
+        _, vertices, texcoords = self._mesh(text)
+        if not len(vertices):
+            return
+
+        glPushAttrib(GL_ENABLE_BIT | GL_CURRENT_BIT | GL_COLOR_BUFFER_BIT | GL_TEXTURE_BIT)
+        glPushClientAttrib(GL_CLIENT_VERTEX_ARRAY_BIT)
+        glDisable(GL_LIGHTING)
+        glDisable(GL_DEPTH_TEST)
+        glEnable(GL_BLEND)
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        glEnable(GL_TEXTURE_2D)
+        glBindTexture(GL_TEXTURE_2D, self.atlas.texture)
+        glColor4ub(color[0], color[1], color[2], alpha)
+
+        glMatrixMode(GL_MODELVIEW)
+        glPushMatrix()
+        glTranslatef(x, y, 0)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+        glVertexPointer(2, GL_FLOAT, 0, vertices)
+        glTexCoordPointer(2, GL_FLOAT, 0, texcoords)
+        glDrawArrays(GL_QUADS, 0, len(vertices))
+        glPopMatrix()
+
+        glPopClientAttrib()
+        glPopAttrib()
@@ -0,0 +1,58 @@
+# Owner of every long-lived GL texture, so allocations can be reused and counted
+from OpenGL.GL import *
+
+
+class TextureManager:
+    def __init__(self):
+        self.textures = {}  # name -> (texture id, width, height)
+
+    def allocate(self, name, width, height, data=None, filter=GL_LINEAR):
+        """Return the named RGBA texture, creating storage only when it is new or resized"""
+        entry = self.textures.get(name)
+        if entry is not None and entry[1:] == (width, height):
+            texture = entry[0]
+            glBindTexture(GL_TEXTURE_2D, texture)
+            if data is not None:
+                glTexSubImage2D(GL_TEXTURE_2D, 0, 0, 0, width, height, GL_RGBA, GL_UNSIGNED_BYTE, data)
+            return texture
+
+        texture = entry[0] if entry is not None else glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, texture)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, filter)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, filter)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, width, height, 0, GL_RGBA, GL_UNSIGNED_BYTE, data)
+        self.textures[name] = (texture, width, height)
+        return texture
+
+    def update(self, name, x, y, width, height, data):
+        """Upload a sub-rectangle of an existing texture"""
+        texture = self.textures[name][0]
+        glBindTexture(GL_TEXTURE_2D, texture)
+        glTexSubImage2D(GL_TEXTURE_2D, 0, x, y, width, height, GL_RGBA, GL_UNSIGNED_BYTE, data)
+
+    def get(self, name):
+        entry = self.textures.get(name)
+        return entry[0] if entry is not None else None
+
+    def delete(self, name):
+        entry = self.textures.pop(name, None)
+        if entry is not None:
+            glDeleteTextures(1, [entry[0]])
+
+    def delete_all(self):
+        for name in list(self.textures):
+            self.delete(name)
+
+    def live_count(self):
+        return len(self.textures)
+
+    def live_bytes(self):
+        return sum(width * height * 4 for _, width, height in self.textures.values())
+
+    def stats(self):
+        """Live texture count and bytes, for overlays and soak tests"""
+        return {"textures": self.live_count(), "bytes": self.live_bytes()}
+
+
+# Process-wide instance shared by every subsystem
+textures = TextureManager()
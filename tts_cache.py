@@ -0,0 +1,111 @@
+# Content-addressed cache of synthesized speech on disk, so repeated lines
+# (greetings, stock replies) play without a TTS request
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+CACHE_DIR = ".tts_cache"
+MAX_BYTES = 64 * 1024 * 1024
+
+
+class TTSCache:
+    """Audio files named by the hash of what was synthesized, evicted least recently used first"""
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()  # Lookups and stores come from the TTS worker threads
+        self.entries = OrderedDict()  # key -> size in bytes, least recently used first
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.bytes_served = 0
+        self.bytes_stored = 0
+        self.evictions = 0
+        self._load_index()
+
+    @staticmethod
+    def key(text, voice, speed, model, audio_format):
+        """Content address of one utterance: everything that changes the audio"""
+        data = "\0".join([text, voice, repr(float(speed)), model, audio_format])
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".audio")
+
+    def _load_index(self):
+        """Rebuild the LRU order from file modification times left by earlier runs"""
+        if not os.path.isdir(self.directory):
+            return
+        files = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".audio"):
+                stat = os.stat(os.path.join(self.directory, name))
+                files.append((stat.st_mtime, name[:-len(".audio")], stat.st_size))
+        for _, key, size in sorted(files):
+            self.entries[key] = size
+            self.size += size
+        self._evict()
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.entries
+
+    def get(self, key):
+        """Return the cached audio bytes, or None on a miss"""
+        with self.lock:
+            if key not in self.entries:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)  # Keep the LRU order across runs
+        except OSError:
+            with self.lock:
+                self.size -= self.entries.pop(key, 0)
+                self.misses += 1
+            return None
+        with self.lock:
+            self.hits += 1
+            self.bytes_served += len(data)
+        return data
+
+    def put(self, key, data):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)  # Readers never see a half-written file
+        with self.lock:
+            self.size += len(data) - self.entries.pop(key, 0)
+            self.entries[key] = len(data)
+            self.bytes_stored += len(data)
+            self._evict()
+
+    def _evict(self):
+        while self.size > self.max_bytes and len(self.entries) > 1:
+            key, size = self.entries.popitem(last=False)
+            self.size -= size
+            self.evictions += 1
+            try:
+                os.unlink(self._path(key))
+            except OSError:
+                pass
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "size_bytes": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "bytes_served": self.bytes_served,
+            "bytes_stored": self.bytes_stored,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,103 @@
+# Voice activity detection on raw microphone frames, and end-pointing that turns
+# per-frame decisions into utterances
+from collections import deque
+
+import numpy as np
+
+from stt_backends import FRAME_MS, SAMPLE_RATE
+
+SPEECH_START = "start"
+SPEECH_END = "end"
+
+
+class EnergyVAD:
+    """Speech per frame from energy over an adaptive noise floor, with the zero-crossing rate
+    rejecting hiss that is only a little louder than the background"""
+
+    def __init__(self, ratio=3.0, min_rms=150.0, max_zcr=0.35, rise=0.01, fall=0.1):
+        self.ratio = ratio  # Speech must be this many times louder than the noise floor (~10 dB)
+        self.min_rms = min_rms  # Absolute floor, so digital silence doesn't make every click speech
+        self.max_zcr = max_zcr  # Voiced speech crosses zero far less often than broadband noise
+        # The noise floor follows quiet frames quickly but rises slowly, so the soft parts of
+        # an utterance don't drag it up towards speech level
+        self.rise = rise
+        self.fall = fall
+        self.noise_rms = None
+
+    def is_speech(self, frame):
+        samples = np.frombuffer(frame, dtype="<i2").astype(np.float32)
+        if not len(samples):
+            return False
+        rms = float(np.sqrt(np.mean(samples * samples)))
+        zcr = float(np.mean(np.signbit(samples[1:]) != np.signbit(samples[:-1]))) if len(samples) > 1 else 0.0
+        if self.noise_rms is None:
+            self.noise_rms = rms  # Assume the stream starts with background noise
+
+        threshold = max(self.noise_rms * self.ratio, self.min_rms)
+        speech = rms > threshold and (zcr < self.max_zcr or rms > threshold * 2)
+        if not speech:
+            self.noise_rms += (rms - self.noise_rms) * (self.rise if rms > self.noise_rms else self.fall)
+        return speech
+
+
+class WebRTCVAD:
+    """The WebRTC voice activity detector (optional webrtcvad package)"""
+
+    def __init__(self, mode=2):
+        import webrtcvad
+        self.vad = webrtcvad.Vad(mode)  # 0 (permissive) to 3 (aggressive)
+
+    def is_speech(self, frame):
+        return self.vad.is_speech(frame, SAMPLE_RATE)
+
+
+def create_vad():
+    """WebRTC VAD when installed, the NumPy energy detector otherwise"""
+    try:
+        return WebRTCVAD()
+    except ImportError:
+        return EnergyVAD()
+
+
+class Endpointer:
+    """Segments a stream of frames into utterances: start after start_ms of speech, end after end_ms
+    of silence. The pre-roll before the onset is kept so the first syllable isn't clipped."""
+
+    def __init__(self, vad, start_ms=90, end_ms=300, preroll_ms=240, max_ms=15000):
+        self.vad = vad
+        self.start_frames = max(1, start_ms // FRAME_MS)
+        self.end_frames = max(1, end_ms // FRAME_MS)
+        self.max_frames = max_ms // FRAME_MS  # Force an end on endless noise
+        self.recent = deque(maxlen=max(1, preroll_ms // FRAME_MS) + self.start_frames)
+        self.onset = []  # Frames of the utterance up to and including the one that started it
+        self.reset()
+
+    def reset(self):
+        """Back to silence, e.g. after the STT engine ended the utterance itself"""
+        self.in_speech = False
+        self.speech_run = 0
+        self.silence_run = 0
+        self.length = 0
+        self.recent.clear()
+
+    def process(self, frame):
+        """Classify one frame; returns SPEECH_START, SPEECH_END or None"""
+        speech = self.vad.is_speech(frame)
+        if not self.in_speech:
+            self.recent.append(frame)
+            self.speech_run = self.speech_run + 1 if speech else 0
+            if self.speech_run >= self.start_frames:
+                self.in_speech = True
+                self.silence_run = 0
+                self.length = len(self.recent)
+                self.onset = list(self.recent)
+                self.recent.clear()
+                return SPEECH_START
+            return None
+
+        self.length += 1
+        self.silence_run = 0 if speech else self.silence_run + 1
+        if self.silence_run >= self.end_frames or self.length >= self.max_frames:
+            self.reset()
+            return SPEECH_END
+        return None